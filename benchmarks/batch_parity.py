@@ -0,0 +1,103 @@
+# benchmarks/batch_parity.py
+"""Сверка пакетного расчета (services/batch_scoring.py) с TestCalculator на случайных ответах
+
+    python -m benchmarks.batch_parity --rows 5000 --seed 1
+
+Для каждого теста генерируются случайные векторы ответов, считаются score_batch
+и TestCalculator по одному, и сравниваются баллы, проценты и уровни всех шкал.
+Печатается первое расхождение по каждому полю; если они есть, код выхода 1.
+"""
+import argparse
+import os
+import sys
+from typing import Any, Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from models.answers import BOYKO_ANSWER_LABELS, AnswerVector
+from models.questions import get_catalog
+from services.batch_scoring import score_batch
+from services.test_calculator import TestCalculator
+
+def _maslach(answers: AnswerVector) -> Dict[str, Any]:
+    result = TestCalculator.calculate_maslach(answers.as_dict())
+    expected = {'overall': result['interpretation']['overall']}
+    for scale in ('EE', 'DP', 'PA'):
+        expected[scale] = result['scores'][scale]
+        expected[f"{scale}_level"] = result['interpretation'][scale]['level']
+    return expected
+
+def _boyko(answers: AnswerVector) -> Dict[str, Any]:
+    result = TestCalculator.calculate_boyko_test(answers.as_dict(BOYKO_ANSWER_LABELS))
+    expected = {
+        'indicator_phase': result['indicator_phase'],
+        'total_percentage': result['total_percentage'],
+        'risk_level': result['risk_level'],
+    }
+    for phase, score in result['phases'].items():
+        expected[phase] = score
+        expected[f"{phase}_percentage"] = result['percentages'][phase]
+        expected[f"{phase}_level"] = result['phase_levels'][phase]['level']
+    return expected
+
+def _heck_hess(answers: AnswerVector) -> Dict[str, Any]:
+    result = TestCalculator.calculate_heck_hess_test(answers.as_dict())
+    expected = {
+        'total_score': result['total_score'],
+        'overall_level': result['overall_level'],
+        'burnout_risk': result['burnout_risk'],
+    }
+    for scale, value in result['scales'].items():
+        expected[scale] = value['score']
+        expected[f"{scale}_level"] = value['level']
+    return expected
+
+def _quick(answers: AnswerVector) -> Dict[str, Any]:
+    result = TestCalculator.calculate_quick_test(answers.as_list())
+    return {'total': result['scores']['total'], 'level': result['scores']['level']}
+
+# Тест -> результат TestCalculator в виде строки пакетного расчета
+REFERENCE: Dict[str, Callable[[AnswerVector], Dict[str, Any]]] = {
+    'maslach': _maslach,
+    'boyko': _boyko,
+    'heck_hess': _heck_hess,
+    'quick': _quick,
+}
+
+def _same(expected: Any, actual: Any) -> bool:
+    if isinstance(expected, float):
+        return abs(expected - float(actual)) < 1e-9
+    return expected == actual
+
+def check(test_type: str, rows: int, rng: np.random.Generator) -> List[str]:
+    """Расхождения пакетного расчета с TestCalculator (не больше одного на поле)"""
+    catalog = get_catalog(test_type)
+    matrix = rng.integers(0, catalog.max_answer + 1, size=(rows, catalog.count), dtype=np.uint8)
+    batch = score_batch(test_type, matrix)
+    
+    mismatches = {}
+    for row in range(rows):
+        answers = AnswerVector(matrix[row].tobytes())
+        for field, value in REFERENCE[test_type](answers).items():
+            if field not in mismatches and not _same(value, batch[field][row]):
+                mismatches[field] = f"{test_type}.{field}: {answers.as_list()} -> {value!r}, пакетно {batch[field][row]!r}"
+    return list(mismatches.values())
+
+def main(args: argparse.Namespace) -> int:
+    rng = np.random.default_rng(args.seed)
+    failed = False
+    for test_type in REFERENCE:
+        mismatches = check(test_type, args.rows, rng)
+        print(f"{test_type:>10}: {args.rows} векторов, расхождений по полям: {len(mismatches)}")
+        for line in mismatches:
+            print(f"  {line}")
+        failed = failed or bool(mismatches)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    sys.exit(main(parser.parse_args()))
\ No newline at end of file
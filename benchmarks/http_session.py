@@ -0,0 +1,76 @@
+# benchmarks/http_session.py
+"""Пропускная способность HTTP-сессии бота на локальном Bot API
+
+    python -m benchmarks.http_session --requests 5000 --concurrency 100 --latency 0.005
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+
+from benchmarks.mock_api import MockBotAPI
+from benchmarks.stub import STUB_TOKEN
+from config import BotConfig
+from keyboards.main_menu import get_main_keyboard
+from services.session import create_bot_session
+
+async def load(bot: Bot, requests: int, concurrency: int) -> dict:
+    """requests отправок сообщения с клавиатурой, не более concurrency одновременно"""
+    latencies: List[float] = []
+    counter = iter(range(requests))
+    markup = get_main_keyboard()
+    
+    async def worker() -> None:
+        for i in counter:
+            started = time.perf_counter()
+            await bot.send_message(i % 1000 + 1, "Возвращаю в главное меню:", reply_markup=markup)
+            latencies.append(time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'rps': requests / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+async def run(title: str, make_session, args: argparse.Namespace) -> None:
+    # Лимиты заглушки не мешают: проверяется только транспорт
+    api = MockBotAPI(chat_limit=10 ** 9, global_limit=10 ** 9, latency=args.latency)
+    server = await api.start()
+    session = make_session(server)
+    bot = Bot(token=STUB_TOKEN, session=session)
+    try:
+        await load(bot, min(args.requests, args.concurrency), args.concurrency)  # прогрев пула
+        result = await load(bot, args.requests, args.concurrency)
+    finally:
+        await session.close()
+        await api.stop()
+    print(f"{title:>26}: {result['rps']:8.0f} запр/с, p50 {result['p50_ms']:6.1f} мс, p99 {result['p99_ms']:6.1f} мс")
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"Запросов: {args.requests}, одновременно: {args.concurrency}, задержка API: {args.latency * 1000:.0f} мс")
+    await run("без keep-alive", lambda api: create_bot_session(BotConfig(keepalive_timeout=None), api), args)
+    await run("AiohttpSession по умолчанию", lambda api: AiohttpSession(api=api), args)
+    await run(
+        "create_bot_session",
+        lambda api: create_bot_session(BotConfig(pool_limit=args.concurrency), api),
+        args
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.005)
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
@@ -0,0 +1,211 @@
+# benchmarks/load.py
+"""Нагрузочный прогон: тысячи пользователей одновременно проходят все тесты
+
+    python -m benchmarks.load --users 2000 --save local
+    python -m benchmarks.load --users 2000 --compare local
+
+Апдейты подаются в dp.feed_update, Bot API заменен заглушкой. Отчет: апдейтов/с,
+p50/p99 обработки апдейта (всего и по тестам), память на незавершенный тест,
+время расчета каждого теста в TestCalculator и операций хранилища результатов.
+--save пишет результат в benchmarks/baselines/<имя>.json, --compare сравнивает
+с сохраненным и завершается с кодом 1, если что-то стало хуже больше допуска.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub import install_stub_bot, message_update, questionnaire_session
+
+bot = install_stub_bot()
+
+import main  # noqa: F401 - регистрирует хендлеры в диспетчере
+from aiogram.types import Update
+from bot_setup import dp
+from config import DatabaseConfig
+from handlers.questionnaire import TEST_SPECS
+from keyboards.main_menu import HISTORY_BUTTON
+from models.answers import AnswerVector
+from models.questions import get_catalog
+from services.storage import create_storage, storage
+
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Для каких метрик больше - лучше; остальные - время и память
+HIGHER_IS_BETTER = {'updates_per_s'}
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+async def _feed(update: dict) -> float:
+    started = time.perf_counter()
+    await dp.feed_update(bot, Update.model_validate(update, context={'bot': bot}))
+    return time.perf_counter() - started
+
+def user_updates(chat_id: int, test_type: str) -> List[dict]:
+    """Сценарий пользователя: /start, тест целиком, история"""
+    return [
+        message_update(chat_id, "/start"),
+        *questionnaire_session(chat_id, TEST_SPECS[test_type], random.Random(chat_id)),
+        message_update(chat_id, HISTORY_BUTTON),
+    ]
+
+async def run_users(users: int, think: float, first_chat: int) -> Dict[str, float]:
+    """Все пользователи одновременно, каждый отправляет апдейты по очереди"""
+    test_types = sorted(TEST_SPECS)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    
+    async def user(chat_id: int) -> None:
+        test_type = test_types[chat_id % len(test_types)]
+        rng = random.Random(chat_id)
+        for update in user_updates(chat_id, test_type):
+            latencies[test_type].append(await _feed(update))
+            # Пауза на чтение вопроса; sleep(0) дает поработать остальным пользователям
+            await asyncio.sleep(rng.uniform(0, think))
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(user(chat_id) for chat_id in range(first_chat, first_chat + users)))
+    elapsed = time.perf_counter() - started
+    
+    every = [value for values in latencies.values() for value in values]
+    result = {
+        'updates_per_s': len(every) / elapsed,
+        'update_p50_ms': statistics.median(every) * 1000,
+        'update_p99_ms': _percentile(every, 0.99) * 1000,
+    }
+    for test_type, values in sorted(latencies.items()):
+        result[f'{test_type}_p50_ms'] = statistics.median(values) * 1000
+        result[f'{test_type}_p99_ms'] = _percentile(values, 0.99) * 1000
+    return result
+
+async def session_memory(users: int, first_chat: int) -> float:
+    """Память на пользователя с незавершенным тестом (FSM, ответы, служебные структуры)"""
+    test_types = sorted(TEST_SPECS)
+    scenarios = []
+    for chat_id in range(first_chat, first_chat + users):
+        updates = user_updates(chat_id, test_types[chat_id % len(test_types)])
+        # /start, кнопка теста и половина ответов
+        scenarios.append(updates[:2 + (len(updates) - 3) // 2])
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for updates in scenarios:
+            for update in updates:
+                await _feed(update)
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    # Сами апдейты создаются до замера и в результат не входят
+    return (after - before) / users / 1024
+
+def _timed(func, repeat: int) -> float:
+    """Микросекунд на вызов"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+def calculator_timings(repeat: int) -> Tuple[Dict[str, float], List[dict]]:
+    """Расчет результата каждого теста (TestCalculator через scorer спецификации)"""
+    rng = random.Random(0)
+    timings = {}
+    results = []
+    for test_type, spec in sorted(TEST_SPECS.items()):
+        codes = list(spec.answer_codes.values())
+        answers = AnswerVector(bytes(rng.choice(codes) for _ in range(get_catalog(test_type).count)))
+        timings[f'score_{test_type}_us'] = _timed(lambda: spec.scorer(answers), repeat)
+        results.append(spec.scorer(answers))
+    return timings, results
+
+async def storage_timings(results: List[dict], users: int) -> Dict[str, float]:
+    """Операции хранилища результатов на отдельном экземпляре в памяти"""
+    backend = create_storage(DatabaseConfig())
+    timings = {}
+    started = time.perf_counter()
+    for chat_id in range(users):
+        for result in results:
+            await backend.save_test_result(chat_id, result)
+    timings['storage_save_us'] = (time.perf_counter() - started) / (users * len(results)) * 1e6
+    operations = (
+        ('history', backend.get_user_history),
+        ('history_page', lambda chat_id: backend.get_history_page(chat_id, 3)),
+        ('stats', backend.get_statistics),
+    )
+    for name, operation in operations:
+        started = time.perf_counter()
+        for chat_id in range(users):
+            await operation(chat_id)
+        timings[f'storage_{name}_us'] = (time.perf_counter() - started) / users * 1e6
+    await backend.close()
+    return timings
+
+def compare(result: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Метрики, которые стали хуже базовых больше чем на tolerance"""
+    regressions = []
+    for name, value in result.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        change = value / base - 1
+        worse = -change if name in HIGHER_IS_BETTER else change
+        if worse > tolerance:
+            regressions.append(f"{name}: {base:.2f} -> {value:.2f} ({change:+.0%})")
+    return regressions
+
+async def main_(args: argparse.Namespace) -> int:
+    # Прогрев: импорт ленивых частей и первые экземпляры кэшей
+    await run_users(len(TEST_SPECS), 0, first_chat=10 ** 6)
+    
+    result = await run_users(args.users, args.think, first_chat=1)
+    result['session_kb'] = await session_memory(args.memory_users, first_chat=2 * 10 ** 6)
+    calculator, results = calculator_timings(args.repeat)
+    result.update(calculator)
+    result.update(await storage_timings(results, args.users))
+    await storage.close()
+    
+    print(f"Пользователей: {args.users}, тестов: {', '.join(sorted(TEST_SPECS))}")
+    for name, value in result.items():
+        print(f"  {name:>24}: {value:10.2f}")
+    
+    if args.save:
+        os.makedirs(BASELINES_DIR, exist_ok=True)
+        path = os.path.join(BASELINES_DIR, f"{args.save}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"Базовые значения сохранены: {path}")
+    
+    if args.compare:
+        with open(os.path.join(BASELINES_DIR, f"{args.compare}.json"), encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print(f"Хуже базовых '{args.compare}' более чем на {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"Регрессий относительно '{args.compare}' нет")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--think", type=float, default=0.0, help="пауза пользователя между нажатиями, с")
+    parser.add_argument("--memory-users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=2000, help="повторов расчета каждого теста")
+    parser.add_argument("--save", metavar="NAME", help="сохранить результат как базовый")
+    parser.add_argument("--compare", metavar="NAME", help="сравнить с сохраненным базовым")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="допустимое ухудшение, доля")
+    sys.exit(asyncio.run(main_(parser.parse_args())))
\ No newline at end of file
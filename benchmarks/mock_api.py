@@ -0,0 +1,112 @@
+# benchmarks/mock_api.py
+"""Локальный сервер Bot API для проверок без сети
+
+Отвечает на методы, которыми пользуется бот, и отдает 429 с retry_after
+при превышении лимитов Telegram (на чат и на бота), как настоящий API.
+"""
+import asyncio
+import itertools
+import json
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from aiohttp import web
+from aiogram.client.telegram import TelegramAPIServer
+
+class MockBotAPI:
+    """Заглушка api.telegram.org на aiohttp"""
+    
+    def __init__(
+        self,
+        chat_limit: int = 3,
+        chat_window: float = 1.0,
+        global_limit: int = 30,
+        global_window: float = 1.0,
+        retry_after: int = 1,
+        latency: float = 0.0
+    ):
+        self.chat_limit = chat_limit
+        self.chat_window = chat_window
+        self.global_limit = global_limit
+        self.global_window = global_window
+        self.retry_after = retry_after
+        self.latency = latency
+        self.requests: List[Tuple[float, str, Optional[str]]] = []
+        self.flood_errors = 0
+        self._chat_sent: Dict[str, Deque[float]] = defaultdict(deque)
+        self._global_sent: Deque[float] = deque()
+        self._message_ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+    
+    @staticmethod
+    def _over_limit(sent: Deque[float], now: float, limit: int, window: float) -> bool:
+        while sent and now - sent[0] >= window:
+            sent.popleft()
+        return len(sent) >= limit
+    
+    def _flood_response(self) -> web.Response:
+        self.flood_errors += 1
+        return web.json_response({
+            'ok': False,
+            'error_code': 429,
+            'description': f"Too Many Requests: retry after {self.retry_after}",
+            'parameters': {'retry_after': self.retry_after},
+        })
+    
+    def _result(self, method: str, fields: Dict[str, Any]) -> Any:
+        if method in ('sendmessage', 'editmessagetext'):
+            chat_id = int(fields.get('chat_id') or 0)
+            return {
+                'message_id': int(fields.get('message_id') or next(self._message_ids)),
+                'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'group'},
+                'text': fields.get('text', ''),
+            }
+        if method == 'getme':
+            return {'id': 123456, 'is_bot': True, 'first_name': 'Mock'}
+        if method == 'getupdates':
+            return []
+        return True
+    
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method'].lower()
+        fields = dict(await request.post())
+        chat_id = fields.get('chat_id')
+        now = time.monotonic()
+        self.requests.append((now, method, chat_id))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        if method not in ('getme', 'getupdates', 'answercallbackquery'):
+            if self._over_limit(self._global_sent, now, self.global_limit, self.global_window):
+                return self._flood_response()
+            if chat_id is not None:
+                chat_sent = self._chat_sent[chat_id]
+                if self._over_limit(chat_sent, now, self.chat_limit, self.chat_window):
+                    return self._flood_response()
+                chat_sent.append(now)
+            self._global_sent.append(now)
+        
+        return web.json_response({'ok': True, 'result': self._result(method, fields)}, dumps=json.dumps)
+    
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        return app
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> TelegramAPIServer:
+        """Запуск сервера; возвращает адрес для AiohttpSession(api=...)"""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}"
+        return TelegramAPIServer.from_base(self.url)
+    
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
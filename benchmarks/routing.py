@@ -0,0 +1,67 @@
+# benchmarks/routing.py
+"""Стоимость маршрутизации апдейта: цепочка lambda-фильтров против RoutingTable
+
+    python -m benchmarks.routing --tests 4 16 64 256
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+from benchmarks.stub import STUB_TOKEN, StubSession, callback_update, message_update
+from services.routing import RoutingTable
+
+async def _noop(event, state) -> None:
+    pass
+
+def lambda_dispatcher(tests: int) -> Dispatcher:
+    """Регистрация как в исходных хендлерах: по фильтру на кнопку и на префикс"""
+    dp = Dispatcher()
+    for i in range(tests):
+        dp.message.register(_noop, lambda message, text=f"Тест {i}": message.text == text)
+        dp.callback_query.register(_noop, lambda c, prefix=f"test{i}_": c.data.startswith(prefix))
+    return dp
+
+def table_dispatcher(tests: int) -> Dispatcher:
+    dp = Dispatcher()
+    routes = RoutingTable()
+    for i in range(tests):
+        routes.message(f"Тест {i}")(_noop)
+        routes.callback(f"test{i}_")(_noop)
+    routes.install(dp)
+    return dp
+
+async def per_update_us(dp: Dispatcher, bot: Bot, updates: list, rounds: int) -> float:
+    for update in updates:
+        await dp.feed_update(bot, update)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for update in updates:
+            await dp.feed_update(bot, update)
+    return (time.perf_counter() - started) / (rounds * len(updates)) * 1e6
+
+async def main(args: argparse.Namespace) -> None:
+    bot = Bot(token=STUB_TOKEN, session=StubSession())
+    print(f"{'тестов':>7} {'lambda, мкс':>12} {'таблица, мкс':>13}")
+    for tests in args.tests:
+        # Худший случай для цепочки: апдейты последнего зарегистрированного теста
+        last = tests - 1
+        updates = [
+            Update.model_validate(message_update(1, f"Тест {last}")),
+            Update.model_validate(callback_update(1, f"test{last}_1")),
+        ]
+        chain = await per_update_us(lambda_dispatcher(tests), bot, updates, args.rounds)
+        table = await per_update_us(table_dispatcher(tests), bot, updates, args.rounds)
+        print(f"{tests:>7} {chain:>12.1f} {table:>13.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--rounds", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,101 @@
+# benchmarks/send_scheduler.py
+"""Всплеск отправок через локальный Bot API: без планировщика и с SendScheduler
+
+    python -m benchmarks.send_scheduler --chats 50 --messages 4 --shards 4
+
+С --shards чаты делятся между несколькими планировщиками, как между процессами
+шардирования: у каждого свое общее ведро, а лимит API - один на бота.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+
+from benchmarks.mock_api import MockBotAPI
+from benchmarks.stub import STUB_TOKEN
+from services.send_scheduler import SendScheduler
+from services.session import BotSession
+
+async def burst(bot_for: Callable[[int], Bot], chats: int, messages: int) -> dict:
+    """Каждый чат получает экран результата из нескольких сообщений, параллельно идут смены вопросов"""
+    failed = 0
+    edit_latency: List[float] = []
+    
+    async def result_screen(chat_id: int) -> None:
+        nonlocal failed
+        for i in range(messages):
+            try:
+                await bot_for(chat_id).send_message(chat_id, f"Часть результата {i + 1}")
+            except TelegramRetryAfter:
+                failed += 1
+    
+    async def question_edit(chat_id: int) -> None:
+        nonlocal failed
+        started = time.perf_counter()
+        try:
+            await bot_for(chat_id).edit_message_text("Следующий вопрос", chat_id=chat_id, message_id=1)
+        except TelegramRetryAfter:
+            failed += 1
+        edit_latency.append(time.perf_counter() - started)
+    
+    started = time.perf_counter()
+    bulk = [asyncio.create_task(result_screen(chat_id)) for chat_id in range(1, chats + 1)]
+    await asyncio.sleep(0.05)
+    # Другие пользователи в это время отвечают на вопросы
+    edits = [asyncio.create_task(question_edit(chat_id)) for chat_id in range(chats + 1, chats + 11)]
+    await asyncio.gather(*bulk, *edits)
+    return {
+        'elapsed': time.perf_counter() - started,
+        'failed': failed,
+        'edit_p50_ms': statistics.median(edit_latency) * 1000,
+    }
+
+async def run(chats: int, messages: int, scheduled: bool, shards: int = 1, shared: bool = True) -> None:
+    """Прогон всплеска; shards планировщиков, shared - каждому своя доля общего лимита"""
+    api = MockBotAPI()
+    server = await api.start()
+    sessions = [BotSession(api=server) for _ in range(shards)]
+    schedulers = []
+    if scheduled:
+        for session in sessions:
+            scheduler = SendScheduler(workers=shards if shared else 1)
+            session.middleware(scheduler)
+            schedulers.append(scheduler)
+    bots = [Bot(token=STUB_TOKEN, session=session) for session in sessions]
+    try:
+        result = await burst(lambda chat_id: bots[chat_id % shards], chats, messages)
+    finally:
+        for session in sessions:
+            await session.close()
+        await api.stop()
+    title = "SendScheduler" if scheduled else "без планировщика"
+    if shards > 1:
+        title += f", {shards} шарда, " + ("доля лимита" if shared else "полный лимит")
+    print(
+        f"{title:>17}: {result['elapsed']:6.2f} с, потеряно {result['failed']:4d}, "
+        f"429 от API {api.flood_errors:4d}, смена вопроса p50 {result['edit_p50_ms']:7.1f} мс"
+        + (f", повторов {sum(s.retries for s in schedulers)}" if schedulers else "")
+    )
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"Чатов: {args.chats}, сообщений на чат: {args.messages}")
+    await run(args.chats, args.messages, scheduled=False)
+    await run(args.chats, args.messages, scheduled=True)
+    if args.shards > 1:
+        await run(args.chats, args.messages, scheduled=True, shards=args.shards, shared=False)
+        await run(args.chats, args.messages, scheduled=True, shards=args.shards)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=4)
+    parser.add_argument("--shards", type=int, default=4, help="планировщиков в прогоне с шардированием")
+    asyncio.run(main(parser.parse_args()))
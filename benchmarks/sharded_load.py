@@ -0,0 +1,63 @@
+# benchmarks/sharded_load.py
+"""Нагрузочный прогон режима воркеров: пропускная способность от числа процессов
+
+    python -m benchmarks.sharded_load --workers 1 2 4 --users 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub import install_stub_bot, message_update, quick_test_session
+from services.sharding import ShardSupervisor
+
+def stub_worker() -> None:
+    """worker_init: воркер работает с заглушкой Bot API"""
+    install_stub_bot()
+
+async def _wait_processed(supervisor: ShardSupervisor, expected: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while supervisor.processed < expected:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Обработано {supervisor.processed} из {expected}")
+        await asyncio.sleep(0.01)
+
+async def measure(workers: int, users: int, timeout: float = 600.0) -> float:
+    """Апдейтов в секунду для заданного числа воркеров"""
+    supervisor = ShardSupervisor(workers, worker_init=stub_worker)
+    supervisor.start()
+    try:
+        # Прогрев: каждый воркер импортирует бота и обрабатывает первый апдейт
+        for shard in range(workers):
+            await supervisor.dispatch(message_update(shard, "/start"))
+        await _wait_processed(supervisor, workers, timeout)
+        
+        updates = [update for chat_id in range(users) for update in quick_test_session(chat_id)]
+        started = time.perf_counter()
+        for update in updates:
+            await supervisor.dispatch(update)
+        await _wait_processed(supervisor, workers + len(updates), timeout)
+        elapsed = time.perf_counter() - started
+        
+        for worker in supervisor.stats():
+            print(f"  воркер {worker['shard']}: обработано {worker['processed']}, ошибок {worker['failed']}")
+        return len(updates) / elapsed
+    finally:
+        await supervisor.stop()
+
+async def main(args: argparse.Namespace) -> None:
+    baseline = None
+    print(f"Ядер CPU: {os.cpu_count()}, пользователей: {args.users}")
+    for workers in args.workers:
+        rate = await measure(workers, args.users)
+        baseline = baseline or rate / workers
+        print(f"Воркеров: {workers:2d}  {rate:9.0f} апдейтов/с  масштабирование {rate / baseline:4.2f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--users", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
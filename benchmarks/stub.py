@@ -0,0 +1,108 @@
+# benchmarks/stub.py
+import datetime
+import itertools
+import random
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from aiogram import Bot, methods
+from aiogram.types import Chat, Message
+
+from models.questions import get_catalog
+from services.session import BotSession
+
+# Токен нужного формата: Bot не принимает пустой токен
+STUB_TOKEN = "123456:" + "A" * 35
+
+class StubSession(BotSession):
+    """Сессия без сети: форма запроса собирается как для Bot API, ответ - локально"""
+    
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.requests = 0
+        self._message_ids = itertools.count(1)
+    
+    async def make_request(self, bot: Bot, method: methods.TelegramMethod, timeout: Optional[int] = None) -> Any:
+        self.requests += 1
+        self.build_form_data(bot, method)
+        if isinstance(method, (methods.SendMessage, methods.EditMessageText)):
+            return Message(
+                message_id=next(self._message_ids),
+                date=datetime.datetime.now(),
+                chat=Chat(id=method.chat_id or 0, type='private'),
+                text=method.text
+            )
+        return True
+    
+    async def stream_content(self, url: str, headers: Optional[Dict[str, Any]] = None, timeout: int = 30,
+                             chunk_size: int = 65536, raise_for_status: bool = True) -> AsyncGenerator[bytes, None]:
+        yield b""
+    
+    async def close(self) -> None:
+        pass
+
+def install_stub_bot() -> Bot:
+    """Подмена токена и сессии бота (вызывать до импорта bot_setup в новом процессе)"""
+    import config
+    config.bot_config.token = STUB_TOKEN
+    from bot_setup import bot
+    bot.session = StubSession()
+    return bot
+
+# Синтетические апдейты в формате Bot API (как приходят во вебхук)
+_update_ids = itertools.count(1)
+
+def _user(chat_id: int) -> Dict[str, Any]:
+    return {'id': chat_id, 'is_bot': False, 'first_name': 'Load'}
+
+def message_update(chat_id: int, text: str) -> Dict[str, Any]:
+    update_id = next(_update_ids)
+    return {
+        'update_id': update_id,
+        'message': {
+            'message_id': update_id,
+            'date': int(datetime.datetime.now().timestamp()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': _user(chat_id),
+            'text': text,
+        },
+    }
+
+def callback_update(chat_id: int, data: str, message_id: int = 1) -> Dict[str, Any]:
+    update_id = next(_update_ids)
+    return {
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id),
+            'from': _user(chat_id),
+            'chat_instance': str(chat_id),
+            'data': data,
+            'message': {
+                'message_id': message_id,
+                'date': int(datetime.datetime.now().timestamp()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'from': {'id': 1, 'is_bot': True, 'first_name': 'Bot'},
+                'text': 'Вопрос',
+            },
+        },
+    }
+
+def quick_test_session(chat_id: int) -> List[Dict[str, Any]]:
+    """Апдейты одного пользователя: /start, быстрый тест целиком и история"""
+    updates = [
+        message_update(chat_id, "/start"),
+        message_update(chat_id, "⚡ Быстрый тест (10 вопросов)"),
+    ]
+    updates.extend(callback_update(chat_id, f"quick_{(chat_id + i) % 5}:{i + 1}") for i in range(10))
+    updates.append(message_update(chat_id, "📈 Мои результаты"))
+    return updates
+
+def questionnaire_session(chat_id: int, spec: Any, rng: Optional[random.Random] = None) -> List[Dict[str, Any]]:
+    """Апдейты прохождения теста по TestSpec: кнопка меню и ответы на все вопросы"""
+    rng = rng or random.Random(chat_id)
+    codes = list(spec.answer_codes)
+    updates = [message_update(chat_id, spec.button)]
+    updates.extend(
+        callback_update(chat_id, f"{spec.callback_prefix}{rng.choice(codes)}:{question.id}")
+        for question in get_catalog(spec.test_type).questions
+    )
+    return updates
\ No newline at end of file
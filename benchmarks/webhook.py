@@ -0,0 +1,134 @@
+# benchmarks/webhook.py
+"""Вебхук на синтетических апдейтах: проверки BoundedRequestHandler и пропускная способность
+
+    python -m benchmarks.webhook --users 200 --max-concurrent 50
+
+Сначала на отдельном диспетчере с блокирующимся хендлером проверяются отказ
+без секрета и с чужим секретом, ответ на битый JSON, ограничение max_concurrent
+и /health. Затем сценарии пользователей с быстрым тестом идут через вебхук в
+диспетчер бота (Bot API заменен заглушкой), отчет - апдейтов/с. Любая
+не пройденная проверка дает код выхода 1.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub import STUB_TOKEN, StubSession, install_stub_bot, message_update, quick_test_session
+
+bot = install_stub_bot()
+
+import main  # noqa: F401 - регистрирует хендлеры в диспетчере
+from aiogram import Bot, Dispatcher
+from aiohttp.test_utils import TestClient, TestServer
+from bot_setup import dp
+from config import WebhookConfig
+from services.webhook import create_webhook_app
+
+SECRET = "benchmark-secret"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+def _client(dispatcher: Dispatcher, webhook_bot: Bot, config: WebhookConfig) -> TestClient:
+    return TestClient(TestServer(create_webhook_app(dispatcher, webhook_bot, config)))
+
+async def _post(client: TestClient, config: WebhookConfig, update: Dict[str, Any], secret: str = SECRET) -> int:
+    headers = {SECRET_HEADER: secret} if secret else {}
+    async with client.post(config.path, json=update, headers=headers) as response:
+        return response.status
+
+async def check_handler(max_concurrent: int, extra: int) -> List[str]:
+    """Проверки на отдельном диспетчере; результат - список проваленных"""
+    failures = []
+    gate = asyncio.Event()
+    entered = 0
+    
+    dispatcher = Dispatcher()
+    
+    @dispatcher.message()
+    async def blocked(message: Any) -> None:
+        nonlocal entered
+        entered += 1
+        await gate.wait()
+    
+    config = WebhookConfig(secret=SECRET, max_concurrent=max_concurrent)
+    client = _client(dispatcher, Bot(token=STUB_TOKEN, session=StubSession()), config)
+    await client.start_server()
+    handler = client.server.app["webhook_handler"]
+    try:
+        for secret in ("", "wrong"):
+            status = await _post(client, config, message_update(1, "/start"), secret)
+            if status != 401:
+                failures.append(f"секрет {secret!r}: ответ {status}, ожидался 401")
+        async with client.post(config.path, data=b"{", headers={SECRET_HEADER: SECRET}) as response:
+            if response.status != 400:
+                failures.append(f"битый JSON: ответ {response.status}, ожидался 400")
+        
+        # Апдейтов больше, чем слотов: лишние ждут ответа, пока слоты не освободятся
+        total = max_concurrent + extra
+        posts = [asyncio.create_task(_post(client, config, message_update(chat_id, "текст")))
+                 for chat_id in range(1, total + 1)]
+        deadline = time.monotonic() + 10
+        while entered < max_concurrent and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.1)
+        answered = sum(post.done() for post in posts)
+        if entered != max_concurrent or answered != max_concurrent:
+            failures.append(f"max_concurrent={max_concurrent}: в обработке {entered}, отвечено {answered}")
+        
+        async with client.get(config.health_path) as response:
+            health = await response.json()
+        if response.status != 200 or health.get('in_flight') != max_concurrent:
+            failures.append(f"/health при заполненных слотах: {response.status} {health}")
+        
+        gate.set()
+        statuses = await asyncio.gather(*posts)
+        if any(status != 200 for status in statuses):
+            failures.append(f"ответы вебхука: {sorted(set(statuses))}")
+        await handler.close()
+        if handler.processed != total or handler.failed:
+            failures.append(f"обработано {handler.processed} из {total}, ошибок {handler.failed}")
+    finally:
+        await client.close()
+    return failures
+
+async def throughput(users: int, max_concurrent: int) -> float:
+    """Апдейтов в секунду через вебхук в диспетчер бота"""
+    config = WebhookConfig(secret=SECRET, max_concurrent=max_concurrent)
+    client = _client(dp, bot, config)
+    await client.start_server()
+    handler = client.server.app["webhook_handler"]
+    sessions = [quick_test_session(chat_id) for chat_id in range(1, users + 1)]
+    
+    async def user(updates: List[Dict[str, Any]]) -> None:
+        for update in updates:
+            await _post(client, config, update)
+    
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(updates) for updates in sessions))
+        await handler.close()
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.close()
+    return sum(len(updates) for updates in sessions) / elapsed
+
+async def main_(args: argparse.Namespace) -> int:
+    failures = await check_handler(args.max_concurrent, args.extra)
+    for line in failures:
+        print(f"  ПРОВАЛ: {line}")
+    print(f"Проверки вебхука: {'провалены' if failures else 'пройдены'}")
+    
+    rate = await throughput(args.users, args.max_concurrent)
+    print(f"Пользователей: {args.users}, max_concurrent: {args.max_concurrent}, апдейтов/с: {rate:.0f}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--max-concurrent", type=int, default=50)
+    parser.add_argument("--extra", type=int, default=10, help="апдейтов сверх max_concurrent в проверке")
+    sys.exit(asyncio.run(main_(parser.parse_args())))
\ No newline at end of file
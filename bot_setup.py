@@ -1,12 +1,29 @@
 # bot_setup.py
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
-from config import bot_config
+from config import bot_config, fsm_config, metrics_config, rate_limit_config
+from services.fsm_storage import create_fsm_storage
+from services.metrics import TimedFSMStorage, install_metrics, metrics
+from services.routing import RoutingTable
+from services.send_scheduler import SendScheduler
+from services.session import create_bot_session
 
 # Инициализация бота и диспетчера
-bot = Bot(token=bot_config.token)
-storage = MemoryStorage()
+bot = Bot(token=bot_config.token, session=create_bot_session(bot_config))
+scheduler = SendScheduler.from_config(rate_limit_config) if rate_limit_config.enabled else None
+if scheduler is not None:
+    bot.session.middleware(scheduler)
+storage = create_fsm_storage(fsm_config)
+if metrics_config.enabled:
+    storage = TimedFSMStorage(storage, metrics.fsm)
 dp = Dispatcher(storage=storage)
 
+# Кнопки меню и callback-и по префиксу разбираются одним поиском в словаре
+routes = RoutingTable()
+routes.install(dp)
+
+# Метрики подключаются после планировщика отправки: время API - без ожидания в очереди
+if metrics_config.enabled:
+    install_metrics(dp, bot, metrics, routes.separator)
+
 # Импортируем обработчики (будет инициализировано позже)
-__all__ = ['bot', 'dp', 'setup_handlers']
\ No newline at end of file
+__all__ = ['bot', 'dp', 'routes', 'scheduler', 'setup_handlers']
\ No newline at end of file
@@ -13,7 +13,7 @@ try:
     from bot_setup import bot, dp
     print("✅ bot_setup.py импортирован")
     
-    from models.states import MaslachTestStates, QuickTestStates
+    from models.states import questionnaire_state
     print("✅ models.states импортирован")
     
     from models.questions import MaslachQuestions, QuickTestQuestions
@@ -9,13 +9,29 @@ class BotConfig:
     token: str = ""
     admin_ids: list = None
     
+    # HTTP-сессия Bot API (одна на процесс, соединения переиспользуются)
+    api_url: Optional[str] = None  # локальный Bot API server вместо api.telegram.org
+    pool_limit: int = 100  # одновременных соединений
+    pool_limit_per_host: int = 0  # 0 - без отдельного ограничения на хост
+    keepalive_timeout: Optional[float] = 30.0  # простой соединения в пуле; None - без keep-alive
+    dns_cache_ttl: Optional[int] = 3600
+    request_timeout: float = 60.0  # секунды на весь запрос
+    connect_timeout: Optional[float] = 10.0
+    fast_json: bool = True  # orjson, если установлен
+    
     def __post_init__(self):
         if self.admin_ids is None:
             self.admin_ids = []
 
 @dataclass
 class DatabaseConfig:
-    """Конфигурация БД (задел на будущее)"""
+    """Конфигурация хранилища результатов"""
+    backend: str = "memory"  # memory | sqlite | postgresql
+    sqlite_path: str = "data/results.db"
+    pool_size: int = 5
+    history_limit: int = 20  # последних результатов на пользователя в памяти
+    memory_budget: Optional[int] = 64 * 1024 * 1024  # байт на историю в памяти; сверх - вытеснение неактивных чатов в SQL (memory_tier)
+    memory_tier: bool = True  # для SQL: история активных чатов кэшируется в памяти
     host: Optional[str] = None
     port: Optional[int] = None
     name: Optional[str] = None
@@ -29,6 +45,90 @@ class DatabaseConfig:
             return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.name}"
         return None
 
+@dataclass
+class WriteBehindConfig:
+    """Отложенная пакетная запись результатов в хранилище"""
+    enabled: bool = True
+    batch_size: int = 50
+    flush_interval: float = 0.5  # секунды
+    max_pending: int = 1000  # предел очереди, дальше хендлеры ждут
+    spill_path: Optional[str] = "data/pending_results.jsonl"
+
+@dataclass
+class FSMConfig:
+    """Хранилище состояний FSM (незавершенные тесты)"""
+    backend: str = "memory"  # memory | redis
+    redis_url: str = "redis://localhost:6379/0"
+    state_ttl: Optional[int] = 24 * 60 * 60  # брошенные тесты удаляются через сутки
+    data_ttl: Optional[int] = 24 * 60 * 60
+
+@dataclass
+class ScoringConfig:
+    """Нормы интерпретации результатов"""
+    norms_path: Optional[str] = None  # JSON с нормами поверх встроенных, перечитывается /reload_norms
+
+@dataclass
+class WebhookConfig:
+    """Прием апдейтов через вебхук (иначе - long polling)"""
+    enabled: bool = False
+    base_url: Optional[str] = None  # публичный адрес, если задан - вебхук регистрируется при старте
+    path: str = "/webhook"
+    secret: Optional[str] = None  # X-Telegram-Bot-Api-Secret-Token
+    host: str = "0.0.0.0"
+    port: int = 8080
+    max_concurrent: int = 100  # апдейтов в обработке одновременно
+    health_path: str = "/health"
+
+@dataclass
+class ShardingConfig:
+    """Обработка апдейтов в нескольких процессах, шардирование по chat_id"""
+    enabled: bool = False
+    workers: int = os.cpu_count() or 1
+    max_concurrent: int = 100  # апдейтов в обработке на воркер
+    queue_size: int = 10000  # очередь апдейтов на воркер
+    restart_timeout: float = 30.0  # секунды на плавную остановку воркера
+    metrics_interval: Optional[float] = 60.0  # период записи метрик воркеров в лог
+
+@dataclass
+class RateLimitConfig:
+    """Лимиты исходящих запросов к Bot API"""
+    enabled: bool = True
+    global_rate: float = 25.0  # сообщений в секунду на бота, с запасом до лимита Telegram в 30
+    global_burst: float = 5.0
+    chat_rate: float = 1.0  # сообщений в секунду в личный чат
+    chat_burst: float = 3.0  # несколько сообщений подряд (результат + меню) уходят сразу
+    group_rate: float = 20 / 60  # в группах - около 20 в минуту
+    max_retries: int = 3  # повторов после 429 Too Many Requests
+
+@dataclass
+class CallbackGuardConfig:
+    """Защита от двойных нажатий и повторной доставки callback"""
+    ttl: float = 600.0  # секунды, после которых данные неактивного чата удаляются
+    recent_ids: int = 16  # сколько последних callback id чата помнить
+
+@dataclass
+class MetricsConfig:
+    """Метрики обработки апдейтов в формате Prometheus"""
+    enabled: bool = False
+    host: str = "127.0.0.1"  # эндпоинт только для локального сборщика
+    port: int = 9188  # 9100 обычно занят node_exporter; воркеры шардирования слушают port + 1 + номер шарда
+    path: str = "/metrics"
+
+@dataclass
+class ExportConfig:
+    """Выгрузка всех результатов для аналитики (/export и python -m services.export)"""
+    batch_size: int = 1000  # результатов на запрос к хранилищу и на блок выгрузки
+    directory: str = "data/exports"  # куда /export пишет файл перед отправкой
+
 # Создаем конфигурацию
 bot_config = BotConfig()
-db_config = DatabaseConfig()  # Пока пустая, заполним позже
\ No newline at end of file
+db_config = DatabaseConfig()  # По умолчанию - хранилище в памяти
+write_behind_config = WriteBehindConfig()
+fsm_config = FSMConfig()
+scoring_config = ScoringConfig()
+webhook_config = WebhookConfig()
+sharding_config = ShardingConfig()
+rate_limit_config = RateLimitConfig()
+callback_guard_config = CallbackGuardConfig()
+metrics_config = MetricsConfig()
+export_config = ExportConfig()
\ No newline at end of file
@@ -1,99 +1,20 @@
 # handlers/boyko_test.py
 from typing import Dict
-from aiogram import types
-from aiogram.fsm.context import FSMContext
 
-from bot_setup import dp
-from models.states import BoykoTestStates
+from handlers.questionnaire import TestSpec, register_test
+from models.answers import BOYKO_ANSWER_CODES, BOYKO_ANSWER_LABELS, AnswerVector
 from models.questions import BoykoTestQuestions
-from keyboards.boyko_keyboard import get_boyko_keyboard
+from services.message_composer import MessageComposer
+from services.result_codec import make_result
 from services.test_calculator import TestCalculator
-from services.storage import storage
 from services.recommendations import get_boyko_recommendations
-from keyboards.main_menu import get_test_cancel_keyboard, get_main_keyboard
+from keyboards.main_menu import BOYKO_TEST_BUTTON
 
-@dp.message(lambda message: message.text == "🧠 Тест Бойко (20 вопросов)")
-async def start_boyko_test(message: types.Message, state: FSMContext):
-    """Начало теста Бойко для ИТ-специалистов"""
-    await state.set_state(BoykoTestStates.questions)
-    await state.update_data(
-        current_question=1,
-        answers={},
-        test_started=True
-    )
-    
-    question_text = BoykoTestQuestions.get_question_text(1)
-    await message.answer(
-        f"💻 **Тест Бойко для ИТ-специалистов**\n\n"
-        f"Вопрос 1 из {len(BoykoTestQuestions.get_all())}\n\n"
-        f"**{question_text}**",
-        reply_markup=get_boyko_keyboard(),
-        parse_mode="Markdown"
-    )
-    await message.answer(
-        "Вы можете отменить тест в любой момент:",
-        reply_markup=get_test_cancel_keyboard()
-    )
-
-@dp.callback_query(lambda c: c.data.startswith("boyko_"))
-async def process_boyko_answer(callback: types.CallbackQuery, state: FSMContext):
-    """Обработка ответов теста Бойко"""
-    data = await state.get_data()
-    current = data.get('current_question', 1)
-    answers = data.get('answers', {})
-    
-    # Извлекаем ответ (boyko_yes -> "yes")
-    answer = callback.data.split('_')[1]
-    answers[current] = answer
-    
-    # Сохраняем ответ
-    await state.update_data(answers=answers)
-    
-    total_questions = len(BoykoTestQuestions.get_all())
-    
-    # Если вопросы закончились
-    if current >= total_questions:
-        # Рассчитываем результаты
-        results = TestCalculator.calculate_boyko_test(answers)
-        full_result = {
-            'test_type': 'boyko',
-            'scores': results,
-            'phases': results['phases'],
-            'percentages': results['percentages']
-        }
-        
-        # Сохраняем
-        await storage.save_test_result(callback.message.chat.id, full_result)
-        
-        # Показываем результаты
-        await show_boyko_results(callback.message, full_result)
-        
-        # Сбрасываем состояние
-        await state.clear()
-        await callback.message.answer(
-            "Возвращаю в главное меню:",
-            reply_markup=get_main_keyboard()
-        )
-        await callback.answer()
-        return
-    
-    # Следующий вопрос
-    next_q = current + 1
-    await state.update_data(current_question=next_q)
-    
-    question_text = BoykoTestQuestions.get_question_text(next_q)
-    
-    await callback.message.edit_text(
-        f"💻 **Тест Бойко для ИТ-специалистов**\n\n"
-        f"Вопрос {next_q} из {total_questions}\n\n"
-        f"**{question_text}**",
-        reply_markup=get_boyko_keyboard(),
-        parse_mode="Markdown"
-    )
-    
-    await callback.answer()
+def score_boyko(answers: AnswerVector) -> Dict:
+    """Результат теста Бойко для сохранения"""
+    return make_result('boyko', TestCalculator.boyko_scores(answers.as_dict(BOYKO_ANSWER_LABELS)), answers)
 
-async def show_boyko_results(message: types.Message, results: Dict):
+async def show_boyko_results(message: MessageComposer, results: Dict):
     """Показ результатов теста Бойко для ИТ-специалистов"""
     scores = results['scores']
     
@@ -165,4 +86,13 @@ async def show_boyko_results(message: types.Message, results: Dict):
             "3. Взять отпуск для полного отдыха от компьютера\n"
             "4. Обратиться к психологу, специализирующемуся на IT-профессионалах",
             parse_mode="Markdown"
-        )
\ No newline at end of file
+        )
+
+register_test(TestSpec(
+    test_type='boyko',
+    button=BOYKO_TEST_BUTTON,
+    callback_prefix='boyko_',
+    scorer=score_boyko,
+    renderer=show_boyko_results,
+    answer_codes=BOYKO_ANSWER_CODES
+))
\ No newline at end of file
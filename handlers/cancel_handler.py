@@ -2,10 +2,10 @@
 from aiogram import types
 from aiogram.fsm.context import FSMContext
 
-from bot_setup import dp
-from keyboards.main_menu import get_main_keyboard
+from bot_setup import routes
+from keyboards.main_menu import CANCEL_TEST_BUTTON, get_main_keyboard
 
-@dp.message(lambda message: message.text == "❌ Отменить тест")
+@routes.message(CANCEL_TEST_BUTTON)
 async def cancel_test(message: types.Message, state: FSMContext):
     """Отмена текущего теста"""
     current_state = await state.get_state()
@@ -1,8 +1,18 @@
 # handlers/start_handler.py
+import os
+from datetime import datetime
+
 from aiogram import types
-from aiogram.filters import Command
+from aiogram.filters import Command, CommandObject
 from bot_setup import dp
+from config import bot_config, export_config, scoring_config
 from keyboards.main_menu import get_main_keyboard
+from services.export import EXPORT_FORMATS, export_to_file
+from services.storage import storage
+from services.thresholds import thresholds
+
+# Больше бот отправить не может: файл остается на сервере
+TELEGRAM_DOCUMENT_LIMIT = 50 * 1024 * 1024
 
 @dp.message(Command("start"))
 async def start_command(message: types.Message):
@@ -19,4 +29,52 @@ async def start_command(message: types.Message):
         "Выберите тест для начала:"
     )
     
-    await message.answer(welcome_text, parse_mode="Markdown", reply_markup=get_main_keyboard())
\ No newline at end of file
+    await message.answer(welcome_text, parse_mode="Markdown", reply_markup=get_main_keyboard())
+
+@dp.message(Command("reload_norms"))
+async def reload_norms_command(message: types.Message):
+    """Перечитать нормы интерпретации без перезапуска (только для администраторов)"""
+    if message.from_user.id not in bot_config.admin_ids:
+        return
+    if not scoring_config.norms_path:
+        await message.answer("Файл норм не задан в конфигурации")
+        return
+    try:
+        count = thresholds.load_file(scoring_config.norms_path)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        await message.answer(f"❌ Нормы не обновлены: {e}")
+        return
+    await message.answer(f"✅ Обновлено шкал: {count}")
+
+@dp.message(Command("export"))
+async def export_command(message: types.Message, command: CommandObject):
+    """Выгрузка всех результатов файлом (только для администраторов): /export [формат] [курсор]"""
+    if message.from_user.id not in bot_config.admin_ids:
+        return
+    args = (command.args or "").split()
+    fmt = args[0] if args else "jsonl"
+    if fmt not in EXPORT_FORMATS:
+        await message.answer(f"Формат выгрузки: {', '.join(EXPORT_FORMATS)}")
+        return
+    after = args[1] if len(args) > 1 else None
+    
+    os.makedirs(export_config.directory, exist_ok=True)
+    path = os.path.join(export_config.directory, f"results-{datetime.now():%Y%m%d-%H%M%S}.{EXPORT_FORMATS[fmt][1]}")
+    try:
+        rows, cursor = await export_to_file(storage, fmt, path, after)
+    except ValueError:
+        os.remove(path)
+        await message.answer(f"Неверный курсор: {after}")
+        return
+    if not rows:
+        os.remove(path)
+        await message.answer("Новых результатов нет")
+        return
+    
+    # Курсор последнего результата: со следующей выгрузкой придут только новые
+    caption = f"Результатов: {rows}\nСледующая выгрузка: /export {fmt} {cursor}"
+    if os.path.getsize(path) > TELEGRAM_DOCUMENT_LIMIT:
+        await message.answer(f"{caption}\nФайл больше 50 МБ, он сохранен на сервере: {path}")
+        return
+    await message.answer_document(types.FSInputFile(path), caption=caption)
+    os.remove(path)
\ No newline at end of file
@@ -1,112 +1,20 @@
 # handlers/heck_hess_test.py
 from typing import Dict
-from aiogram import types
-from aiogram.fsm.context import FSMContext
 
-from bot_setup import dp
-from models.states import HeckHessTestStates
+from handlers.questionnaire import TestSpec, register_test
+from models.answers import AnswerVector
 from models.questions import HeckHessTestQuestions
-from keyboards.heck_hess_keyboard import get_heck_hess_keyboard
+from services.message_composer import MessageComposer
+from services.result_codec import make_result
 from services.test_calculator import TestCalculator
-from services.storage import storage
 from services.recommendations import get_heck_hess_recommendations
-from keyboards.main_menu import get_test_cancel_keyboard, get_main_keyboard
+from keyboards.main_menu import HECK_HESS_TEST_BUTTON
 
-@dp.message(lambda message: message.text == "🏥 Тест Хека-Хесса (21 вопрос)")
-async def start_heck_hess_test(message: types.Message, state: FSMContext):
-    """Начало теста Хека-Хесса"""
-    await state.set_state(HeckHessTestStates.questions)
-    await state.update_data(
-        current_question=1,
-        answers={},
-        test_started=True
-    )
-    
-    # Получаем текст вопроса
-    question_obj = HeckHessTestQuestions.get_question(1)
-    question_text = question_obj.text
-    
-    await message.answer(
-        f"🏥 **Тест Хека-Хесса для ИТ-специалистов**\n\n"
-        f"Вопрос 1 из {len(HeckHessTestQuestions.get_all())}\n\n"
-        f"**{question_text}**\n\n"
-        f"Оцените от 0 до 3, где:\n"
-        f"0 - нет/никогда\n"
-        f"1 - иногда\n"
-        f"2 - часто\n"
-        f"3 - постоянно/всегда",
-        reply_markup=get_heck_hess_keyboard(),
-        parse_mode="Markdown"
-    )
-    await message.answer(
-        "Вы можете отменить тест в любой момент:",
-        reply_markup=get_test_cancel_keyboard()
-    )
-
-@dp.callback_query(lambda c: c.data.startswith("heck_"))
-async def process_heck_hess_answer(callback: types.CallbackQuery, state: FSMContext):
-    """Обработка ответов теста Хека-Хесса"""
-    data = await state.get_data()
-    current = data.get('current_question', 1)
-    answers = data.get('answers', {})
-    
-    # Извлекаем оценку (heck_0 -> 0)
-    rating = int(callback.data.split('_')[1])
-    answers[current] = rating
-    
-    # Сохраняем ответ
-    await state.update_data(answers=answers)
-    
-    total_questions = len(HeckHessTestQuestions.get_all())
-    
-    # Если вопросы закончились
-    if current >= total_questions:
-        # Рассчитываем результаты
-        results = TestCalculator.calculate_heck_hess_test(answers)
-        full_result = {
-            'test_type': 'heck_hess',
-            'scores': results
-        }
-        
-        # Сохраняем
-        await storage.save_test_result(callback.message.chat.id, full_result)
-        
-        # Показываем результаты
-        await show_heck_hess_results(callback.message, results)
-        
-        # Сбрасываем состояние
-        await state.clear()
-        await callback.message.answer(
-            "Возвращаю в главное меню:",
-            reply_markup=get_main_keyboard()
-        )
-        await callback.answer()
-        return
-    
-    # Следующий вопрос
-    next_q = current + 1
-    await state.update_data(current_question=next_q)
-    
-    # Получаем текст вопроса
-    question_obj = HeckHessTestQuestions.get_question(next_q)
-    question_text = question_obj.text
-    
-    await callback.message.edit_text(
-        f"🏥 **Тест Хека-Хесса для ИТ-специалистов**\n\n"
-        f"Вопрос {next_q} из {total_questions}\n\n"
-        f"**{question_text}**\n\n"
-        f"Оцените от 0 до 3, где:\n"
-        f"0 - нет/никогда\n"
-        f"1 - иногда\n"
-        f"2 - часто\n"
-        f"3 - постоянно/всегда",
-        reply_markup=get_heck_hess_keyboard(),
-        parse_mode="Markdown"
-    )
-    
-    await callback.answer()
+def score_heck_hess(answers: AnswerVector) -> Dict:
+    """Результат теста Хека-Хесса для сохранения"""
+    return make_result('heck_hess', TestCalculator.heck_hess_scores(answers.as_dict()), answers)
 
-async def show_heck_hess_results(message: types.Message, results: Dict):
+async def show_heck_hess_results(message: MessageComposer, results: Dict):
     """Показ результатов теста Хека-Хесса"""
     total_score = results.get('total_score', 0)
     overall_level = results.get('overall_level', 'не определено')
@@ -166,4 +74,12 @@ async def show_heck_hess_results(message: types.Message, results: Dict):
             "4. Регулярно делайте перерывы для глаз и осанки\n"
             "5. Рассмотрите работу с психотерапевтом, специализирующимся на IT",
             parse_mode="Markdown"
-        )
\ No newline at end of file
+        )
+
+register_test(TestSpec(
+    test_type='heck_hess',
+    button=HECK_HESS_TEST_BUTTON,
+    callback_prefix='heck_',
+    scorer=score_heck_hess,
+    renderer=lambda message, result: show_heck_hess_results(message, result['scores'])
+))
\ No newline at end of file
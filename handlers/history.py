@@ -1,31 +1,150 @@
 # handlers/history.py
-from typing import Dict, List
+from typing import Callable, Dict, List
 from aiogram import types
-from aiogram.fsm.context import FSMContext
+from aiogram.exceptions import TelegramBadRequest
 
-from bot_setup import dp
+from bot_setup import routes
+from models.history import HistoryPage
 from services.storage import storage
-from keyboards.main_menu import get_main_keyboard
-from services.recommendations import get_general_prevention_tips
+from keyboards.history_keyboard import HISTORY_CALLBACK_PREFIX, OLDER, get_history_keyboard
+from keyboards.main_menu import ABOUT_BUTTON, HISTORY_BUTTON, get_main_keyboard
+from services.message_composer import MessageComposer
+from services.recommendations import get_general_prevention_text
 
 # Словарь для преобразования типов тестов в читаемые названия
 TEST_TYPE_NAMES = {
     "maslach": "📊 Опросник Маслач",
     "quick": "⚡ Быстрый тест",
     "boyko": "📋 Тест Бойко",
-    "psm": "🧠 PSM-опросник",
-    "sppb": "🔥 Тест СППБ",
     "heck_hess": "📝 Тест Хекка-Хесса",
     "unknown": "❓ Неизвестный тест"
 }
 
-@dp.message(lambda message: message.text == "📈 Мои результаты")
+# Сколько результатов на одной странице истории
+HISTORY_PAGE_SIZE = 3
+
+# Форматтеры результата по типу теста: результат -> строки под заголовком записи
+HISTORY_FORMATTERS: Dict[str, Callable[[Dict], List[str]]] = {}
+
+def history_formatter(test_type: str) -> Callable:
+    """Регистрация форматтера результата теста в истории"""
+    def decorator(formatter: Callable[[Dict], List[str]]) -> Callable[[Dict], List[str]]:
+        HISTORY_FORMATTERS[test_type] = formatter
+        return formatter
+    return decorator
+
+@history_formatter('maslach')
+def format_maslach(test: Dict) -> List[str]:
+    scores = test.get('scores', {})
+    lines = [f"ЭИ: {scores.get('EE', 0)} | ДП: {scores.get('DP', 0)} | ПД: {scores.get('PA', 0)}"]
+    overall = test.get('interpretation', {}).get('overall')
+    if overall:
+        lines.append(overall)
+    return lines
+
+@history_formatter('quick')
+def format_quick(test: Dict) -> List[str]:
+    scores = test.get('scores', {}).get('scores', {})
+    level = scores.get('level', '')
+    risk = scores.get('risk', '')
+    lines = [f"Баллы: {scores.get('total', 0)}/{scores.get('max', 40)}"]
+    if level:
+        lines.append(f"Уровень: {level}")
+    if risk and risk != level:
+        lines.append(risk)
+    return lines
+
+# Читаемые названия фаз теста Бойко
+BOYKO_PHASE_NAMES = {
+    'фаза1': 'Напряжение',
+    'фаза2': 'Резистенция',
+    'фаза3': 'Истощение',
+    'фаза4': 'Деформация'
+}
+
+@history_formatter('boyko')
+def format_boyko(test: Dict) -> List[str]:
+    scores = test.get('scores', {})
+    lines = [f"Общий балл: {sum(scores.get('phases', {}).values())}"]
+    if scores.get('risk_level'):
+        lines.append(f"Уровень риска: {scores['risk_level']}")
+    dominant_phase = scores.get('dominant_phase')
+    if dominant_phase:
+        lines.append(f"Доминирующая фаза: {BOYKO_PHASE_NAMES.get(dominant_phase, dominant_phase)}")
+    return lines
+
+@history_formatter('heck_hess')
+def format_heck_hess(test: Dict) -> List[str]:
+    scores = test.get('scores', {})
+    lines = [f"Баллы: {scores.get('total_score', 0)}/63"]
+    if scores.get('overall_level'):
+        lines.append(f"Уровень: {scores['overall_level']}")
+    if scores.get('interpretation'):
+        lines.append(scores['interpretation'])
+    if scores.get('burnout_risk'):
+        lines.append(f"Риск выгорания: {scores['burnout_risk']}")
+    return lines
+
+# Подписи полей для тестов без своего форматтера, в порядке приоритета
+GENERIC_FIELDS = {
+    'level': 'Уровень',
+    'phase': 'Фаза',
+    'overall': 'Результат',
+    'risk_level': 'Уровень риска',
+    'risk': 'Риск',
+    'interpretation': 'Интерпретация',
+    'result': 'Результат'
+}
+
+def format_generic(test: Dict) -> List[str]:
+    """Тест без форматтера: общий балл и первое найденное поле результата"""
+    scores = test.get('scores', {})
+    lines = []
+    total_score = scores.get('total_score') or scores.get('total') or scores.get('score')
+    if total_score:
+        lines.append(f"Общий балл: {total_score}")
+    for key, title in GENERIC_FIELDS.items():
+        if scores.get(key):
+            lines.append(f"{title}: {scores[key]}")
+            break
+    return lines
+
+def history_text(stats: Dict, page: HistoryPage) -> str:
+    """Экран истории: статистика, страница результатов и совет"""
+    text = "📊 ВАША СТАТИСТИКА\n\n"
+    text += f"• Всего тестов: {stats.get('total_tests', 0)}\n"
+    if stats.get('last_test_date'):
+        text += f"• Последний тест: {stats['last_test_date'][:10]}\n"
+    if stats.get('trend') and stats['trend'] != 'недостаточно данных':
+        text += f"• Тренд: {stats['trend']}\n"
+    
+    # Распределение по типам тестов уже посчитано в статистике
+    text += "\nРаспределение по тестам:\n"
+    for test_type, count in stats.get('test_types', {}).items():
+        text += f"• {TEST_TYPE_NAMES.get(test_type, f'Тест: {test_type}')}: {count}\n"
+    
+    text += "\n📝 ПОСЛЕДНИЕ РЕЗУЛЬТАТЫ:\n\n" if page.newer is None else "\n📝 БОЛЕЕ РАННИЕ РЕЗУЛЬТАТЫ:\n\n"
+    for test in page.records:
+        test_type = test.get('test_type', 'unknown')
+        date = test['timestamp'][:10] if test.get('timestamp') else 'дата неизвестна'
+        text += f"• {TEST_TYPE_NAMES.get(test_type, f'Тест: {test_type}')} ({date})\n"
+        for line in HISTORY_FORMATTERS.get(test_type, format_generic)(test):
+            text += f"   {line}\n"
+        text += "\n"
+    
+    text += (
+        "💡 СОВЕТ: Регулярное тестирование (раз в 1-2 месяца) "
+        "помогает отслеживать динамику и вовремя принимать меры.\n\n"
+        "Рекомендуется проходить разные тесты для комплексной оценки."
+    )
+    return text
+
+@routes.message(HISTORY_BUTTON)
 async def show_user_history(message: types.Message):
-    """Показ истории тестов пользователя"""
-    history = await storage.get_user_history(message.chat.id)
-    stats = await storage.get_statistics(message.chat.id)
+    """Показ истории тестов пользователя (первая страница)"""
+    page = await storage.get_history_page(message.chat.id, HISTORY_PAGE_SIZE)
     
-    if not history:
+    if not page.records:
         await message.answer(
             "📭 У вас пока нет сохраненных тестов.\n\n"
             "Пройдите хотя бы один тест для отслеживания динамики:",
@@ -33,188 +152,33 @@ async def show_user_history(message: types.Message):
         )
         return
     
-    # Формируем сообщение со статистикой
-    stats_text = "📊 ВАША СТАТИСТИКА\n\n"
-    stats_text += f"• Всего тестов: {stats.get('total_tests', 0)}\n"
-    if stats.get('last_test_date'):
-        stats_text += f"• Последний тест: {stats['last_test_date'][:10]}\n"
-    if stats.get('trend') and stats['trend'] != 'недостаточно данных':
-        stats_text += f"• Тренд: {stats['trend']}\n"
-    stats_text += "\n"
-    
-    # Группируем по типам тестов
-    test_counts = {}
-    for test in history:
-        test_type = test.get('test_type', 'unknown')
-        test_counts[test_type] = test_counts.get(test_type, 0) + 1
-    
-    stats_text += "Распределение по тестам:\n"
-    for test_type, count in test_counts.items():
-        name = TEST_TYPE_NAMES.get(test_type, f"Тест: {test_type}")
-        stats_text += f"• {name}: {count}\n"
-    
-    await message.answer(stats_text)
+    stats = await storage.get_statistics(message.chat.id) or {}
+    await message.answer(history_text(stats, page), reply_markup=get_history_keyboard(page.older, page.newer))
+
+@routes.callback(HISTORY_CALLBACK_PREFIX)
+async def page_user_history(callback: types.CallbackQuery):
+    """Листание истории: то же сообщение переписывается следующей страницей"""
+    direction, _, cursor = callback.data[len(HISTORY_CALLBACK_PREFIX):].partition(":")
+    chat_id = callback.message.chat.id
+    if direction == OLDER:
+        page = await storage.get_history_page(chat_id, HISTORY_PAGE_SIZE, before=cursor)
+    else:
+        page = await storage.get_history_page(chat_id, HISTORY_PAGE_SIZE, after=cursor)
     
-    # Показываем последние 3 теста подробнее
-    if history:
-        last_tests_text = "\n📝 ПОСЛЕДНИЕ РЕЗУЛЬТАТЫ:\n\n"
-        
-        for i, test in enumerate(history[:3], 1):
-            test_type = test.get('test_type', 'unknown')
-            date = test.get('timestamp', '')[:10] if test.get('timestamp') else 'дата неизвестна'
-            name = TEST_TYPE_NAMES.get(test_type, f"Тест: {test_type}")
-            
-            last_tests_text += f"{i}. {name} ({date})\n"
-            
-            # Получаем scores из теста
-            scores = test.get('scores', {})
-            
-            # Форматирование результатов для каждого типа теста
-            if test_type == 'maslach':
-                # Для Маслач
-                if 'interpretation' in scores:
-                    interpretation = scores.get('interpretation', {})
-                    ee = interpretation.get('EE', {}).get('score', 0)
-                    dp = interpretation.get('DP', {}).get('score', 0)
-                    pa = interpretation.get('PA', {}).get('score', 0)
-                    overall = interpretation.get('overall', '')
-                else:
-                    ee = scores.get('EE', 0)
-                    dp = scores.get('DP', 0)
-                    pa = scores.get('PA', 0)
-                    overall = scores.get('overall', '')
-                
-                last_tests_text += f"   ЭИ: {ee} | ДП: {dp} | ПД: {pa}\n"
-                if overall:
-                    last_tests_text += f"   {overall}\n"
-                    
-            elif test_type == 'quick':
-                # Для быстрого теста - есть вложенная структура
-                inner_scores = scores.get('scores', {})
-                if inner_scores:
-                    # Берем данные из вложенного scores
-                    total = inner_scores.get('total', 0)
-                    max_score = inner_scores.get('max', 40)
-                    level = inner_scores.get('level', '')
-                    risk = inner_scores.get('risk', '')
-                else:
-                    # Если нет вложенной структуры, берем из корня scores
-                    total = scores.get('total', 0)
-                    max_score = scores.get('max', 40)
-                    level = scores.get('level', '')
-                    risk = scores.get('risk', '')
-                
-                last_tests_text += f"   Баллы: {total}/{max_score}\n"
-                if level:
-                    last_tests_text += f"   Уровень: {level}\n"
-                if risk and risk != level:  # Если risk отличается от level
-                    last_tests_text += f"   {risk}\n"
-                
-            elif test_type == 'boyko':
-                # Для теста Бойко
-                phases = scores.get('phases', {})
-                overall = scores.get('overall', '')
-                risk_level = scores.get('risk_level', '')
-                dominant_phase = scores.get('dominant_phase', '')
-                
-                # Суммируем баллы из всех фаз
-                total_score = sum(phases.values()) if phases else 0
-                
-                last_tests_text += f"   Общий балл: {total_score}\n"
-                if risk_level:
-                    last_tests_text += f"   Уровень риска: {risk_level}\n"
-                
-                if dominant_phase:
-                    # Преобразуем номер фазы в читаемый вид
-                    phase_names = {
-                        'фаза1': 'Напряжение',
-                        'фаза2': 'Резистенция', 
-                        'фаза3': 'Истощение',
-                        'фаза4': 'Деформация'
-                    }
-                    phase_name = phase_names.get(dominant_phase, dominant_phase)
-                    last_tests_text += f"   Доминирующая фаза: {phase_name}\n"
-                
-            elif test_type == 'heck_hess':
-                # Для теста Хекка-Хесса
-                total_score = scores.get('total_score', 0)
-                overall_level = scores.get('overall_level', '')
-                interpretation = scores.get('interpretation', '')
-                burnout_risk = scores.get('burnout_risk', '')
-                
-                last_tests_text += f"   Баллы: {total_score}/63\n"
-                if overall_level:
-                    last_tests_text += f"   Уровень: {overall_level}\n"
-                if interpretation:
-                    last_tests_text += f"   {interpretation}\n"
-                if burnout_risk:
-                    last_tests_text += f"   Риск выгорания: {burnout_risk}\n"
-                
-            elif test_type == 'psm':
-                # Для PSM-опросника
-                total_score = scores.get('total_score', 0)
-                level = scores.get('level', '')
-                interpretation = scores.get('interpretation', '')
-                
-                last_tests_text += f"   Баллы: {total_score}\n"
-                if level:
-                    last_tests_text += f"   Уровень стресса: {level}\n"
-                if interpretation:
-                    last_tests_text += f"   {interpretation}\n"
-                    
-            elif test_type == 'sppb':
-                # Для теста СППБ
-                total_score = scores.get('total_score', 0)
-                stage = scores.get('stage', '')
-                level = scores.get('level', '')
-                
-                last_tests_text += f"   Баллы: {total_score}\n"
-                if stage:
-                    last_tests_text += f"   Стадия: {stage}\n"
-                if level:
-                    last_tests_text += f"   Уровень: {level}\n"
-                
-            else:
-                # Для неизвестных типов тестов
-                # Пробуем найти общий балл в разных местах
-                total_score = (
-                    scores.get('total_score') or 
-                    scores.get('total') or 
-                    scores.get('score') or 
-                    0
-                )
-                
-                if total_score:
-                    last_tests_text += f"   Общий балл: {total_score}\n"
-                
-                # Показываем основные результаты
-                for key in ['level', 'phase', 'overall', 'risk_level', 'risk', 'interpretation', 'result']:
-                    value = scores.get(key)
-                    if value:
-                        key_display = {
-                            'level': 'Уровень',
-                            'phase': 'Фаза',
-                            'overall': 'Результат',
-                            'risk_level': 'Уровень риска',
-                            'risk': 'Риск',
-                            'interpretation': 'Интерпретация',
-                            'result': 'Результат'
-                        }.get(key, key)
-                        last_tests_text += f"   {key_display}: {value}\n"
-                        break
-            
-            last_tests_text += "\n"
-        
-        await message.answer(last_tests_text)
+    if not page.records:
+        await callback.answer("Других результатов нет")
+        return
     
-    # Совет по профилактике
-    await message.answer(
-        "💡 СОВЕТ: Регулярное тестирование (раз в 1-2 месяца) "
-        "помогает отслеживать динамику и вовремя принимать меры.\n\n"
-        "Рекомендуется проходить разные тесты для комплексной оценки."
-    )
+    stats = await storage.get_statistics(chat_id) or {}
+    try:
+        await callback.message.edit_text(history_text(stats, page), reply_markup=get_history_keyboard(page.older, page.newer))
+    except TelegramBadRequest as e:
+        # Двойное нажатие: страница уже показана
+        if "message is not modified" not in str(e):
+            raise
+    await callback.answer()
 
-@dp.message(lambda message: message.text == "ℹ️ О выгорании в IT")
+@routes.message(ABOUT_BUTTON)
 async def show_about(message: types.Message):
     """Информация о проекте"""
     about_text = (
@@ -241,8 +205,6 @@ async def show_about(message: types.Message):
         "• 📊 Опросник Маслач - оценка трех компонентов выгорания\n"
         "• ⚡ Быстрый тест - экспресс-оценка состояния\n"
         "• 📋 Тест Бойко - определение фазы выгорания\n"
-        "• 🧠 PSM-опросник - оценка профессионального стресса\n"
-        "• 🔥 Тест СППБ - диагностика психического выгорания\n"
         "• 📝 Тест Хекка-Хесса - оценка уровня тревоги\n\n"
         "Профилактика для IT-специалистов:\n"
         "• Установите границы рабочего времени\n"
@@ -255,12 +217,9 @@ async def show_about(message: types.Message):
         "При серьезных симптомах обратитесь к специалисту!"
     )
     
-    await message.answer(about_text)
+    out = MessageComposer(message)
+    await out.answer(about_text)
     
-    # Показываем советы по профилактике
-    prevention_tips = get_general_prevention_tips()
-    if isinstance(prevention_tips, list):
-        tips_text = "\n".join(prevention_tips[:8])  # Показываем первые 8 советов
-        await message.answer(tips_text)
-    else:
-        await message.answer(prevention_tips[:500])  # Первые 500 символов
\ No newline at end of file
+    # Показываем первые 8 советов по профилактике (текст собран один раз)
+    await out.answer(get_general_prevention_text(8))
+    await out.flush()
\ No newline at end of file
@@ -0,0 +1,144 @@
+# handlers/questionnaire.py
+from contextlib import suppress
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Mapping, Optional
+
+from aiogram import types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State
+
+from bot_setup import routes
+from keyboards.main_menu import get_main_keyboard, get_test_cancel_keyboard
+from models.answers import AnswerVector
+from models.questions import get_catalog
+from models.states import questionnaire_state
+from services.answer_state import start_answers, load_answers, save_answer
+from services.callback_guard import callback_guard
+from services.message_composer import MessageComposer
+from services.question_templates import QUESTION_TAG, question_message
+from services.storage import storage
+
+@dataclass(frozen=True)
+class TestSpec:
+    """Описание теста для общего движка опросников"""
+    test_type: str
+    button: str  # текст кнопки главного меню
+    callback_prefix: str  # префикс callback_data ответов, например "maslach_"
+    scorer: Callable[[AnswerVector], Dict]  # ответы -> результат для сохранения
+    renderer: Callable[[MessageComposer, Dict], Awaitable]  # показ результата, склеивается в одно сообщение
+    answer_codes: Optional[Mapping[str, int]] = None  # суффикс callback_data -> код ответа
+    state: State = field(init=False)
+    
+    def __post_init__(self):
+        if self.answer_codes is None:
+            # По умолчанию ответ - число от 0 до максимального балла каталога
+            max_answer = get_catalog(self.test_type).max_answer
+            object.__setattr__(self, 'answer_codes', {str(code): code for code in range(max_answer + 1)})
+        object.__setattr__(self, 'state', questionnaire_state(self.test_type))
+
+TEST_SPECS: Dict[str, TestSpec] = {}
+_SPECS_BY_BUTTON: Dict[str, TestSpec] = {}
+_SPECS_BY_PREFIX: Dict[str, TestSpec] = {}
+
+def register_test(spec: TestSpec) -> TestSpec:
+    """Подключение теста: кнопка меню и callback-и ответов ведут в общие хендлеры"""
+    TEST_SPECS[spec.test_type] = spec
+    _SPECS_BY_BUTTON[spec.button] = spec
+    _SPECS_BY_PREFIX[spec.callback_prefix] = spec
+    routes.message(spec.button)(start_test)
+    routes.callback(spec.callback_prefix)(process_answer)
+    return spec
+
+async def start_test(message: types.Message, state: FSMContext):
+    """Начало любого теста"""
+    spec = _SPECS_BY_BUTTON[message.text]
+    await state.set_state(spec.state)
+    await start_answers(state, get_catalog(spec.test_type).count)
+    
+    page = question_message(spec.test_type, 1)
+    await message.answer(page.text, reply_markup=page.reply_markup, parse_mode=page.parse_mode)
+    await message.answer(
+        "Вы можете отменить тест в любой момент:",
+        reply_markup=get_test_cancel_keyboard()
+    )
+
+async def answer_callback(callback: types.CallbackQuery) -> None:
+    """Снятие часов загрузки с кнопки; повтор того же нажатия мог уже ответить на callback"""
+    with suppress(TelegramBadRequest):
+        await callback.answer()
+
+async def restart_test(callback: types.CallbackQuery, state: FSMContext, spec: TestSpec):
+    """Тест с первого вопроса, если вектор ответов пропал из хранилища (истек TTL)"""
+    await start_answers(state, get_catalog(spec.test_type).count)
+    page = question_message(spec.test_type, 1)
+    await callback.message.edit_text(page.text, reply_markup=page.reply_markup, parse_mode=page.parse_mode)
+    await callback.answer("Ответы не сохранились, тест начат заново")
+
+async def process_answer(callback: types.CallbackQuery, state: FSMContext, raw_state: Optional[str] = None):
+    """Обработка ответа на вопрос любого теста"""
+    prefix, _, value = callback.data.partition(routes.separator)
+    spec = _SPECS_BY_PREFIX[prefix + routes.separator]
+    # Кнопки вопросов несут его номер; у старых клавиатур номера нет
+    value, _, tag = value.partition(QUESTION_TAG)
+    question_id = int(tag) if tag.isdigit() else None
+    code = spec.answer_codes.get(value)
+    
+    # Состояние уже прочитано middleware FSM: нажатия на клавиатуру другого
+    # или завершенного теста отсекаются без обращения к хранилищу
+    if code is None or raw_state != spec.state.state:
+        await callback.answer()
+        return
+    
+    # Повторная доставка того же нажатия не обрабатывается заново: только ответ
+    # на callback, иначе кнопка крутится до таймаута
+    chat_id = callback.message.chat.id
+    if callback_guard.is_duplicate(chat_id, callback.id):
+        await answer_callback(callback)
+        return
+    
+    # Нажатия одного чата обрабатываются по очереди: второе быстрое нажатие
+    # видит уже сдвинутый курсор и не записывает ответ на следующий вопрос
+    async with callback_guard.serialized(chat_id):
+        answers = await load_answers(state)
+        if len(answers) != get_catalog(spec.test_type).count:
+            # Состояние теста осталось, а вектор ответов истек или удален
+            await restart_test(callback, state, spec)
+            return
+        if answers.is_complete:
+            callback_guard.mark_stale()
+            await callback.answer()
+            return
+        current = answers.cursor
+        if question_id is not None and question_id != current:
+            callback_guard.mark_stale()
+            await callback.answer()
+            return
+        
+        # Сохраняем ответ (в хранилище уходит только изменившийся байт)
+        if not await save_answer(state, answers, current, code):
+            await restart_test(callback, state, spec)
+            return
+        
+        # Если вопросы закончились
+        if answers.is_complete:
+            result = spec.scorer(answers)
+            await storage.save_test_result(chat_id, result)
+            
+            # Результат, рекомендации и возврат в меню уходят одним сообщением
+            async with MessageComposer(callback.message) as out:
+                await spec.renderer(out, result)
+                
+                # Сбрасываем состояние
+                await state.clear()
+                await out.answer(
+                    "Возвращаю в главное меню:",
+                    reply_markup=get_main_keyboard()
+                )
+            await answer_callback(callback)
+            return
+        
+        # Следующий вопрос - готовое сообщение из кэша шаблонов
+        page = question_message(spec.test_type, current + 1)
+        await callback.message.edit_text(page.text, reply_markup=page.reply_markup, parse_mode=page.parse_mode)
+    await answer_callback(callback)
\ No newline at end of file
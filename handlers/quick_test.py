@@ -1,104 +1,18 @@
 # handlers/quick_test.py
 from typing import Dict
-from aiogram import types
-from aiogram.fsm.context import FSMContext
-from aiogram.filters import StateFilter
 
-from bot_setup import dp
-from models.states import QuickTestStates
-from models.questions import QuickTestQuestions
+from handlers.questionnaire import TestSpec, register_test
+from models.answers import AnswerVector
+from services.message_composer import MessageComposer
+from services.result_codec import make_result
 from services.test_calculator import TestCalculator
-from services.storage import storage
-from keyboards.main_menu import get_main_keyboard, get_test_cancel_keyboard
+from keyboards.main_menu import QUICK_TEST_BUTTON
 
-@dp.message(lambda message: message.text == "⚡ Быстрый тест (10 вопросов)")
-async def start_quick_test(message: types.Message, state: FSMContext):
-    """Начало быстрого теста для ИТ"""
-    await state.set_state(QuickTestStates.questions)
-    await state.update_data(
-        current_question=1,
-        answers=[],
-        test_started=True
-    )
-    
-    question = QuickTestQuestions.get_question(1)
-    await message.answer(
-        f"⚡ **Быстрый тест на выгорание для ИТ-специалистов**\n\n"
-        f"Вопрос 1 из 10\n\n"
-        f"{question}\n\n"
-        f"Оцените от 0 до 4, где:\n"
-        f"0 - никогда\n"
-        f"1 - редко\n"
-        f"2 - иногда\n"
-        f"3 - часто\n"
-        f"4 - всегда",
-        reply_markup=get_quick_keyboard()
-    )
-    await message.answer(
-        "Вы можете отменить тест в любой момент:",
-        reply_markup=get_test_cancel_keyboard()
-    )
-
-@dp.callback_query(lambda c: c.data.startswith("quick_"), StateFilter(QuickTestStates.questions))
-async def process_quick_answer(callback: types.CallbackQuery, state: FSMContext):
-    """Обработка ответов быстрого теста"""
-    data = await state.get_data()
-    current = data.get('current_question', 1)
-    answers = data.get('answers', [])
-    
-    # Извлекаем оценку (quick_3 -> 3)
-    rating = int(callback.data.split('_')[1])
-    answers.append(rating)
-    
-    # Сохраняем ответ
-    await state.update_data(answers=answers)
-    
-    # Если вопросы закончились
-    if current >= 10:
-        # Рассчитываем результаты
-        results = TestCalculator.calculate_quick_test(answers)
-        full_result = {
-            'test_type': 'quick',
-            'scores': results
-        }
-        
-        # Сохраняем
-        await storage.save_test_result(callback.message.chat.id, full_result)
-        
-        # Показываем результаты
-        await show_quick_results(callback.message, results)
-        
-        # Сбрасываем состояние
-        await state.clear()
-        await callback.message.answer(
-            "Возвращаю в главное меню:",
-            reply_markup=get_main_keyboard()
-        )
-        await callback.answer()
-        return
-    
-    # Следующий вопрос
-    next_q = current + 1
-    await state.update_data(current_question=next_q)
-    
-    question = QuickTestQuestions.get_question(next_q)
-    
-    await callback.message.edit_text(
-        f"⚡ **Быстрый тест на выгорание для ИТ-специалистов**\n\n"
-        f"Вопрос {next_q} из 10\n\n"
-        f"{question}\n\n"
-        f"Оцените от 0 до 4, где:\n"
-        f"0 - никогда\n"
-        f"1 - редко\n"
-        f"2 - иногда\n"
-        f"3 - часто\n"
-        f"4 - всегда",
-        reply_markup=get_quick_keyboard()
-    )
-    
-    await callback.answer()
+def score_quick(answers: AnswerVector) -> Dict:
+    """Результат быстрого теста для сохранения"""
+    return make_result('quick', TestCalculator.quick_scores(answers.as_list()), answers)
 
-async def show_quick_results(message: types.Message, results: Dict):
+async def show_quick_results(message: MessageComposer, results: Dict):
     """Показ результатов быстрого теста"""
     scores = results.get('scores', {})
     recommendations = results.get('recommendations', [])
@@ -134,15 +48,10 @@ async def show_quick_results(message: types.Message, results: Dict):
             parse_mode="Markdown"
         )
 
-def get_quick_keyboard():
-    """Клавиатура для быстрого теста"""
-    buttons = [
-        [
-            types.InlineKeyboardButton(text="0", callback_data="quick_0"),
-            types.InlineKeyboardButton(text="1", callback_data="quick_1"),
-            types.InlineKeyboardButton(text="2", callback_data="quick_2"),
-            types.InlineKeyboardButton(text="3", callback_data="quick_3"),
-            types.InlineKeyboardButton(text="4", callback_data="quick_4"),
-        ]
-    ]
-    return types.InlineKeyboardMarkup(inline_keyboard=buttons)
\ No newline at end of file
+register_test(TestSpec(
+    test_type='quick',
+    button=QUICK_TEST_BUTTON,
+    callback_prefix='quick_',
+    scorer=score_quick,
+    renderer=lambda message, result: show_quick_results(message, result['scores'])
+))
\ No newline at end of file
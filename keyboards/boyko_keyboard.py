@@ -1,6 +1,9 @@
 # keyboards/boyko_keyboard.py
 from aiogram import types
 
+from keyboards.registry import cached_markup
+
+@cached_markup
 def get_boyko_keyboard():
     """Клавиатура для теста Бойко"""
     buttons = [
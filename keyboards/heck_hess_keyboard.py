@@ -1,6 +1,9 @@
 # keyboards/heck_hess_keyboard.py
 from aiogram import types
 
+from keyboards.registry import cached_markup
+
+@cached_markup
 def get_heck_hess_keyboard():
     """Клавиатура для теста Хека-Хесса"""
     buttons = [
@@ -0,0 +1,20 @@
+# keyboards/history_keyboard.py
+from typing import Optional
+
+from aiogram import types
+
+# callback_data листания истории: "history_<направление>:<курсор>"
+HISTORY_CALLBACK_PREFIX = "history_"
+OLDER = "older"
+NEWER = "newer"
+
+def get_history_keyboard(older: Optional[str], newer: Optional[str]) -> Optional[types.InlineKeyboardMarkup]:
+    """Кнопки листания истории (курсоры у каждой страницы свои, клавиатура не кэшируется)"""
+    buttons = []
+    if newer:
+        buttons.append(types.InlineKeyboardButton(text="⬅️ Новее", callback_data=f"{HISTORY_CALLBACK_PREFIX}{NEWER}:{newer}"))
+    if older:
+        buttons.append(types.InlineKeyboardButton(text="Раньше ➡️", callback_data=f"{HISTORY_CALLBACK_PREFIX}{OLDER}:{older}"))
+    if not buttons:
+        return None
+    return types.InlineKeyboardMarkup(inline_keyboard=[buttons])
\ No newline at end of file
@@ -1,25 +1,39 @@
 # keyboards/main_menu.py
 from aiogram import types
 
+from keyboards.registry import cached_markup
+
+# Тексты кнопок - они же ключи маршрутов хендлеров
+QUICK_TEST_BUTTON = "⚡ Быстрый тест (10 вопросов)"
+MASLACH_TEST_BUTTON = "📊 Опросник Маслач (10 вопросов)"
+BOYKO_TEST_BUTTON = "🧠 Тест Бойко (20 вопросов)"
+HECK_HESS_TEST_BUTTON = "🏥 Тест Хека-Хесса (21 вопрос)"
+HISTORY_BUTTON = "📈 Мои результаты"
+ABOUT_BUTTON = "ℹ️ О выгорании в IT"
+CANCEL_TEST_BUTTON = "❌ Отменить тест"
+
+@cached_markup
 def get_main_keyboard():
     """Главное меню с тестами для ИТ-специалистов"""
     buttons = [
-        [types.KeyboardButton(text="⚡ Быстрый тест (10 вопросов)")],
-        [types.KeyboardButton(text="📊 Опросник Маслач (10 вопросов)")],
-        [types.KeyboardButton(text="🧠 Тест Бойко (20 вопросов)")],
-        [types.KeyboardButton(text="🏥 Тест Хека-Хесса (21 вопрос)")],
-        [types.KeyboardButton(text="📈 Мои результаты")],
-        [types.KeyboardButton(text="ℹ️ О выгорании в IT")],
+        [types.KeyboardButton(text=QUICK_TEST_BUTTON)],
+        [types.KeyboardButton(text=MASLACH_TEST_BUTTON)],
+        [types.KeyboardButton(text=BOYKO_TEST_BUTTON)],
+        [types.KeyboardButton(text=HECK_HESS_TEST_BUTTON)],
+        [types.KeyboardButton(text=HISTORY_BUTTON)],
+        [types.KeyboardButton(text=ABOUT_BUTTON)],
     ]
     return types.ReplyKeyboardMarkup(keyboard=buttons, resize_keyboard=True)
 
+@cached_markup
 def get_test_cancel_keyboard():
     """Клавиатура для отмены теста"""
     buttons = [
-        [types.KeyboardButton(text="❌ Отменить тест")]
+        [types.KeyboardButton(text=CANCEL_TEST_BUTTON)]
     ]
     return types.ReplyKeyboardMarkup(keyboard=buttons, resize_keyboard=True)
 
+@cached_markup
 def get_back_to_main_keyboard():
     """Кнопка возврата в главное меню"""
     buttons = [
@@ -1,6 +1,9 @@
 # keyboards/maslach_keyboard.py
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
+from keyboards.registry import cached_markup
+
+@cached_markup
 def get_maslach_keyboard() -> InlineKeyboardMarkup:
     """Клавиатура для ответов по шкале Маслач (0-6)"""
     buttons = []
@@ -26,6 +29,7 @@ def get_maslach_keyboard() -> InlineKeyboardMarkup:
     
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
+@cached_markup
 def get_quick_test_keyboard() -> InlineKeyboardMarkup:
     """Клавиатура для быстрого теста (0-4)"""
     buttons = []
@@ -0,0 +1,18 @@
+# keyboards/quick_keyboard.py
+from aiogram import types
+
+from keyboards.registry import cached_markup
+
+@cached_markup
+def get_quick_keyboard():
+    """Клавиатура для быстрого теста"""
+    buttons = [
+        [
+            types.InlineKeyboardButton(text="0", callback_data="quick_0"),
+            types.InlineKeyboardButton(text="1", callback_data="quick_1"),
+            types.InlineKeyboardButton(text="2", callback_data="quick_2"),
+            types.InlineKeyboardButton(text="3", callback_data="quick_3"),
+            types.InlineKeyboardButton(text="4", callback_data="quick_4"),
+        ]
+    ]
+    return types.InlineKeyboardMarkup(inline_keyboard=buttons)
\ No newline at end of file
@@ -0,0 +1,48 @@
+# keyboards/registry.py
+import json
+from functools import wraps
+from typing import Callable, Dict, Optional, Union
+
+from aiogram import types
+
+Markup = Union[types.InlineKeyboardMarkup, types.ReplyKeyboardMarkup]
+
+class KeyboardRegistry:
+    """Готовые клавиатуры: каждая собирается и сериализуется один раз"""
+    
+    # Разметки aiogram неизменяемы, поэтому один экземпляр безопасно отдавать
+    # всем пользователям. Сессия бота находит JSON по id(разметки) и не
+    # сериализует клавиатуру при каждой отправке вопроса.
+    
+    def __init__(self):
+        self._markups: Dict[str, Markup] = {}
+        self._serialized: Dict[int, str] = {}
+    
+    def register(self, name: str, markup: Markup) -> Markup:
+        self._markups[name] = markup
+        self._serialized[id(markup)] = json.dumps(markup.model_dump(mode="json", exclude_none=True))
+        return markup
+    
+    def get(self, name: str) -> Optional[Markup]:
+        return self._markups.get(name)
+    
+    def serialized(self, markup: object) -> Optional[str]:
+        """Готовый JSON для reply_markup или None, если клавиатура не из реестра"""
+        return self._serialized.get(id(markup))
+    
+    def __len__(self) -> int:
+        return len(self._markups)
+
+keyboards = KeyboardRegistry()
+
+def cached_markup(factory: Callable[[], Markup]) -> Callable[[], Markup]:
+    """Фабрика клавиатуры строит разметку при первом вызове, дальше - из реестра"""
+    name = f"{factory.__module__}.{factory.__qualname__}"
+    
+    @wraps(factory)
+    def wrapper() -> Markup:
+        markup = keyboards.get(name)
+        if markup is None:
+            markup = keyboards.register(name, factory())
+        return markup
+    return wrapper
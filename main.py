@@ -3,6 +3,12 @@ import asyncio
 import logging
 
 from bot_setup import dp, bot
+from config import metrics_config, scoring_config, sharding_config, webhook_config
+from services.metrics import metrics, start_metrics_server
+from services.sharding import run_sharded
+from services.storage import storage
+from services.thresholds import thresholds
+from services.webhook import run_webhook
 import handlers.commands
 import handlers.maslach_test
 import handlers.quick_test
@@ -21,8 +27,30 @@ async def main():
     logger = logging.getLogger(__name__)
     logger.info("Запуск бота для диагностики выгорания...")
     
+    if scoring_config.norms_path:
+        thresholds.load_file(scoring_config.norms_path)
+    
+    metrics_runner = None
+    if metrics_config.enabled and not sharding_config.enabled:
+        # Занятый порт не должен мешать запуску бота
+        try:
+            metrics_runner = await start_metrics_server(metrics, metrics_config)
+            logger.info("Метрики: http://%s:%s%s", metrics_config.host, metrics_config.port, metrics_config.path)
+        except OSError as e:
+            logger.warning("Эндпоинт метрик не запущен: %s", e)
+    
     # Запускаем бота
-    await dp.start_polling(bot)
+    try:
+        if sharding_config.enabled:
+            await run_sharded(dp, bot, sharding_config, webhook_config)
+        elif webhook_config.enabled:
+            await run_webhook(dp, bot, webhook_config)
+        else:
+            await dp.start_polling(bot)
+    finally:
+        await storage.close()
+        if metrics_runner is not None:
+            await metrics_runner.cleanup()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -1,11 +1,12 @@
 # models/__init__.py
-from .states import MaslachTestStates, QuickTestStates
-from .questions import MaslachQuestions, QuickTestQuestions, TestQuestion
+from .states import questionnaire_state
+from .questions import MaslachQuestions, QuickTestQuestions, TestQuestion, QuestionCatalog, get_catalog
 
 __all__ = [
-    'MaslachTestStates',
-    'QuickTestStates', 
+    'questionnaire_state',
     'MaslachQuestions',
     'QuickTestQuestions',
-    'TestQuestion'
+    'TestQuestion',
+    'QuestionCatalog',
+    'get_catalog'
 ]
\ No newline at end of file
@@ -0,0 +1,56 @@
+# models/answers.py
+from typing import Dict, List, Mapping, Optional, Union
+
+UNANSWERED = 0xFF
+
+# Коды ответов теста Бойко (код совпадает с баллом)
+BOYKO_ANSWER_CODES = {"no": 0, "sometimes": 1, "yes": 2}
+BOYKO_ANSWER_LABELS = {code: label for label, code in BOYKO_ANSWER_CODES.items()}
+
+class AnswerVector:
+    """Ответы теста фиксированной ширины: один байт на вопрос, 0xFF - нет ответа"""
+    __slots__ = ('_buf',)
+    
+    def __init__(self, buf: Union[bytes, bytearray]):
+        self._buf = bytearray(buf)
+    
+    @classmethod
+    def empty(cls, size: int) -> 'AnswerVector':
+        return cls(bytes([UNANSWERED]) * size)
+    
+    def __len__(self) -> int:
+        return len(self._buf)
+    
+    @property
+    def cursor(self) -> int:
+        """Номер текущего вопроса (первого без ответа), len + 1 если ответы закончились"""
+        index = self._buf.find(UNANSWERED)
+        return index + 1 if index >= 0 else len(self._buf) + 1
+    
+    @property
+    def is_complete(self) -> bool:
+        return UNANSWERED not in self._buf
+    
+    def get(self, question_id: int) -> Optional[int]:
+        code = self._buf[question_id - 1]
+        return None if code == UNANSWERED else code
+    
+    def set(self, question_id: int, code: int) -> None:
+        """Запись одного ответа на месте"""
+        if not 0 <= code < UNANSWERED:
+            raise ValueError(f"Недопустимый код ответа: {code}")
+        self._buf[question_id - 1] = code
+    
+    def as_dict(self, labels: Optional[Mapping[int, str]] = None) -> Dict[int, Union[int, str]]:
+        """Ответы в формате TestCalculator: {номер_вопроса: ответ}"""
+        return {
+            i: (labels[code] if labels else code)
+            for i, code in enumerate(self._buf, 1)
+            if code != UNANSWERED
+        }
+    
+    def as_list(self) -> List[int]:
+        return [code for code in self._buf if code != UNANSWERED]
+    
+    def to_bytes(self) -> bytes:
+        return bytes(self._buf)
@@ -0,0 +1,113 @@
+# models/history.py
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+class HistoryRecord:
+    """Запись истории: тип и время отдельно, результат - упакованные байты (services/result_codec.py)"""
+    __slots__ = ('test_type', 'timestamp', 'payload', 'seq')
+    
+    def __init__(self, test_type: str, timestamp: str, payload: bytes, seq: int = 0):
+        self.test_type = sys.intern(test_type)
+        self.timestamp = timestamp
+        self.payload = payload
+        self.seq = seq  # порядковый номер сохранения в процессе (ключ курсоров выгрузки и истории)
+    
+    @property
+    def nbytes(self) -> int:
+        """Память записи (тип теста общий для всех записей и не учитывается)"""
+        return _RECORD_OVERHEAD + sys.getsizeof(self.timestamp) + sys.getsizeof(self.payload) + sys.getsizeof(self.seq)
+
+_RECORD_OVERHEAD = sys.getsizeof(HistoryRecord('', '', b''))
+
+class HistoryRing(Generic[T]):
+    """Кольцевой буфер фиксированной емкости: новая запись вытесняет самую старую"""
+    __slots__ = ('_items', '_next', '_size')
+    
+    def __init__(self, capacity: int):
+        self._items: List[Optional[T]] = [None] * capacity
+        self._next = 0
+        self._size = 0
+    
+    @property
+    def capacity(self) -> int:
+        return len(self._items)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def append(self, item: T) -> Optional[T]:
+        """Добавление за O(1) без копирования; возвращает вытесненную запись"""
+        evicted = self._items[self._next]
+        self._items[self._next] = item
+        self._next = (self._next + 1) % len(self._items)
+        if self._size < len(self._items):
+            self._size += 1
+            return None
+        return evicted
+    
+    def latest(self, limit: int) -> List[T]:
+        """Последние limit записей, от старых к новым"""
+        count = min(limit, self._size)
+        start = self._next - count
+        if start >= 0:
+            return self._items[start:self._next]
+        return self._items[start:] + self._items[:self._next]
+    
+    def __iter__(self) -> Iterator[T]:
+        return iter(self.latest(self._size))
+    
+    def unordered(self) -> Iterator[T]:
+        """Записи без копирования буфера, в порядке ячеек (не по времени)"""
+        return (item for item in self._items if item is not None)
+    
+    @property
+    def nbytes(self) -> int:
+        return sys.getsizeof(self._items)
+
+# Курсор страницы - время записи и ее ключ (id строки в SQL, номер сохранения в памяти)
+CURSOR_SEPARATOR = "/"
+# Ключ для курсора без ключа (кнопки, отправленные до составного курсора): граница
+# проходит за всеми записями этого времени, как раньше при сравнении только по времени
+_KEY_MIN = 0
+_KEY_MAX = 2 ** 63 - 1
+
+def history_cursor(timestamp: str, key: int) -> str:
+    return f"{timestamp}{CURSOR_SEPARATOR}{key}"
+
+def parse_history_cursor(cursor: str, newer: bool = False) -> Tuple[str, int]:
+    """(время, ключ) курсора; newer - курсор after, иначе before"""
+    timestamp, separator, key = cursor.rpartition(CURSOR_SEPARATOR)
+    if separator and key.isdigit():
+        return timestamp, int(key)
+    return cursor, _KEY_MAX if newer else _KEY_MIN
+
+@dataclass(frozen=True)
+class HistoryPage:
+    """Страница истории: записи от новых к старым и курсоры соседних страниц"""
+    records: List[Dict] = field(default_factory=list)
+    older: Optional[str] = None  # курсор более старой страницы (before), None - это последняя
+    newer: Optional[str] = None  # курсор более новой страницы (after), None - это первая
+    
+    # Записи упорядочены по (timestamp, ключ), курсор - та же пара (keyset без OFFSET).
+    # Время одного чата может совпасть (пакетная запись, повтор из spill-файла), и
+    # ключ не дает потерять записи с тем же временем, что у записи на границе страницы.
+    
+    @classmethod
+    def from_window(cls, rows: List[Tuple[int, Dict]], limit: int, before: Optional[str] = None,
+                    after: Optional[str] = None) -> 'HistoryPage':
+        """Страница из окна в limit + 1 пар (ключ, запись): от новых к старым, а для after - от старых к новым"""
+        window = rows[:limit]
+        more = len(rows) > limit
+        if after is not None:
+            window.reverse()
+        if not window:
+            return cls()
+        records = [record for _, record in window]
+        first = history_cursor(records[0]['timestamp'], window[0][0])
+        last = history_cursor(records[-1]['timestamp'], window[-1][0])
+        if after is not None:
+            return cls(records, older=last, newer=first if more else None)
+        return cls(records, older=last if more else None, newer=first if before is not None else None)
\ No newline at end of file
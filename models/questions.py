@@ -1,8 +1,9 @@
 # models/questions.py
 from dataclasses import dataclass
-from typing import List, Dict
+from types import MappingProxyType
+from typing import List, Dict, Mapping, Sequence, Tuple
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TestQuestion:
     """Базовый класс вопроса теста"""
     id: int
@@ -10,103 +11,147 @@ class TestQuestion:
     scale: str = None
     reversed: bool = False
 
+@dataclass(frozen=True, slots=True)
+class QuestionCatalog:
+    """Неизменяемый каталог вопросов теста, собирается один раз при импорте"""
+    test_type: str
+    questions: Tuple[TestQuestion, ...]
+    max_answer: int
+    by_id: Mapping[int, TestQuestion]
+    scales: Tuple[str, ...]
+    scale_counts: Mapping[str, int]
+    reversed_flags: Tuple[bool, ...]
+    max_scores: Mapping[str, int]
+    
+    @classmethod
+    def build(cls, test_type: str, questions: Sequence[TestQuestion], max_answer: int) -> 'QuestionCatalog':
+        """Предрасчет индексов, счетчиков по шкалам и максимальных баллов"""
+        questions = tuple(questions)
+        scale_counts: Dict[str, int] = {}
+        for question in questions:
+            scale_counts[question.scale] = scale_counts.get(question.scale, 0) + 1
+        
+        return cls(
+            test_type=test_type,
+            questions=questions,
+            max_answer=max_answer,
+            by_id=MappingProxyType({q.id: q for q in questions}),
+            scales=tuple(scale_counts),
+            scale_counts=MappingProxyType(scale_counts),
+            reversed_flags=tuple(q.reversed for q in questions),
+            max_scores=MappingProxyType({scale: count * max_answer for scale, count in scale_counts.items()})
+        )
+    
+    @property
+    def count(self) -> int:
+        return len(self.questions)
+    
+    def get(self, question_id: int) -> TestQuestion:
+        question = self.by_id.get(question_id)
+        if question is None:
+            raise ValueError(f"Вопрос с ID {question_id} не найден")
+        return question
+
 class MaslachQuestions:
     """Вопросы опросника Маслач (адаптированные для IT)"""
     
+    TEST_TYPE = 'maslach'
+    
     SCALES = {
         'EE': 'Эмоциональное истощение',
         'DP': 'Деперсонализация', 
         'PA': 'Редукция достижений'
     }
     
+    QUESTIONS = (
+        TestQuestion(1, "Я чувствую себя эмоционально опустошенным(ой) после рабочего дня с большим количеством обращений", "EE"),
+        TestQuestion(2, "Работа с постоянным потоком тикетов и звонков от пользователей меня эмоционально истощает", "EE"),
+        TestQuestion(3, "Я легко понимаю, что чувствуют пользователи, когда обращаются за помощью", "DP", True),
+        TestQuestion(4, "Я отношусь к некоторым пользователям как к 'номерам тикетов', а не как к людям с проблемами", "DP"),
+        TestQuestion(5, "Я эффективно решаю технические проблемы пользователей, даже самые сложные", "PA", True),
+        TestQuestion(6, "Я чувствую себя 'выжатым(ой)' после рабочего дня с постоянными переключениями между задачами", "EE"),
+        TestQuestion(7, "Я положительно влияю на работу коллег из других отделов, быстро решая их технические проблемы", "PA", True),
+        TestQuestion(8, "Я стал(а) более безразличным(ой) к проблемам и жалобам пользователей", "DP"),
+        TestQuestion(9, "Постоянные звонки, чаты и необходимость работать в рамках SLA вызывают у меня стресс", "EE"),
+        TestQuestion(10, "Я чувствую удовлетворение, когда могу быстро и качественно помочь пользователю решить его проблему", "PA", True),
+    )
+    
     @classmethod
-    def get_all(cls) -> List[TestQuestion]:
-        return [
-            TestQuestion(1, "Я чувствую себя эмоционально опустошенным(ой) после рабочего дня с большим количеством обращений", "EE"),
-            TestQuestion(2, "Работа с постоянным потоком тикетов и звонков от пользователей меня эмоционально истощает", "EE"),
-            TestQuestion(3, "Я легко понимаю, что чувствуют пользователи, когда обращаются за помощью", "DP", True),
-            TestQuestion(4, "Я отношусь к некоторым пользователям как к 'номерам тикетов', а не как к людям с проблемами", "DP"),
-            TestQuestion(5, "Я эффективно решаю технические проблемы пользователей, даже самые сложные", "PA", True),
-            TestQuestion(6, "Я чувствую себя 'выжатым(ой)' после рабочего дня с постоянными переключениями между задачами", "EE"),
-            TestQuestion(7, "Я положительно влияю на работу коллег из других отделов, быстро решая их технические проблемы", "PA", True),
-            TestQuestion(8, "Я стал(а) более безразличным(ой) к проблемам и жалобам пользователей", "DP"),
-            TestQuestion(9, "Постоянные звонки, чаты и необходимость работать в рамках SLA вызывают у меня стресс", "EE"),
-            TestQuestion(10, "Я чувствую удовлетворение, когда могу быстро и качественно помочь пользователю решить его проблему", "PA", True),
-        ]
+    def get_all(cls) -> Tuple[TestQuestion, ...]:
+        return get_catalog(cls.TEST_TYPE).questions
     
     @classmethod
     def get_question(cls, question_id: int) -> TestQuestion:
-        questions = cls.get_all()
-        if 1 <= question_id <= len(questions):
-            return questions[question_id - 1]
-        raise ValueError(f"Вопрос с ID {question_id} не найден")
+        return get_catalog(cls.TEST_TYPE).get(question_id)
 
 class QuickTestQuestions:
     """Вопросы быстрого теста для IT-специалистов"""
     
+    TEST_TYPE = 'quick'
+    
+    QUESTIONS = (
+        "Часто ли вы чувствуете усталость даже после выходных?",
+        "Раздражают ли вас постоянные митинги и совещания?",
+        "Трудно ли концентрироваться на написании кода?",
+        "Снизился ли интерес к новым технологиям и фреймворкам?",
+        "Беспокоят ли боли в спине или глазах от работы за компьютером?",
+        "Стали ли вы более циничным в отношении работы?",
+        "Чувствуете ли, что ваш код теряет качество?",
+        "Избегаете ли общения с командой?",
+        "Работаете ли на автомате, без творческого подхода?",
+        "Думали ли о смене компании или профессии?"
+    )
+    
     @classmethod
-    def get_all(cls) -> List[str]:
-        return [
-            "Часто ли вы чувствуете усталость даже после выходных?",
-            "Раздражают ли вас постоянные митинги и совещания?",
-            "Трудно ли концентрироваться на написании кода?",
-            "Снизился ли интерес к новым технологиям и фреймворкам?",
-            "Беспокоят ли боли в спине или глазах от работы за компьютером?",
-            "Стали ли вы более циничным в отношении работы?",
-            "Чувствуете ли, что ваш код теряет качество?",
-            "Избегаете ли общения с командой?",
-            "Работаете ли на автомате, без творческого подхода?",
-            "Думали ли о смене компании или профессии?"
-        ]
+    def get_all(cls) -> Tuple[str, ...]:
+        return cls.QUESTIONS
     
     @classmethod
     def get_question(cls, question_id: int) -> str:
-        questions = cls.get_all()
-        if 1 <= question_id <= len(questions):
-            return questions[question_id - 1]
-        raise ValueError(f"Вопрос с ID {question_id} не найден")
+        return get_catalog(cls.TEST_TYPE).get(question_id).text
 
 class BoykoTestQuestions:
     """Опросник эмоционального выгорания Бойко (адаптированный для ИТ-специалистов)"""
     
+    TEST_TYPE = 'boyko'
+    
+    QUESTIONS = (
+        # Фаза 1: Напряжение (первые признаки выгорания)
+        TestQuestion(1, "Я чувствую себя эмоционально истощенным к концу рабочей недели/спринта", "фаза1"),
+        TestQuestion(2, "Мне становится все труднее сосредоточиться на сложных задачах, требующих глубокой концентрации", "фаза1"),
+        TestQuestion(3, "Я испытываю раздражение или тревогу при мысли о накопившихся тикетах, задачах в бэклоге или предстоящих дедлайнах", "фаза1"),
+        TestQuestion(4, "Я часто ловлю себя на мысли о работе в нерабочее время, по выходным или перед сном", "фаза1"),
+        TestQuestion(5, "У меня возникает физическое напряжение (в шее, спине, глазах) от долгой работы за компьютером, которое не проходит после отдыха", "фаза1"),
+        
+        # Фаза 2: Резистенция (сопротивление, цинизм)
+        TestQuestion(6, "Я стал(а) более цинично относиться к целям проекта, новым корпоративным инициативам или постоянным изменениям в процессах", "фаза2"),
+        TestQuestion(7, "Меня раздражают просьбы пользователей, коллег из других отделов или членов команды, которые 'отвлекают' от моей основной работы", "фаза2"),
+        TestQuestion(8, "Я стал(а) воспринимать коллег или клиентов скорее как источник проблем, чем как часть общей цели", "фаза2"),
+        TestQuestion(9, "Я избегаю необязательных митингов, корпоративных мероприятий или неформального общения с командой", "фаза2"),
+        TestQuestion(10, "Мне кажется, что мои усилия и expertise не получают должного признания или влияют на результат меньше, чем хотелось бы", "фаза2"),
+        
+        # Фаза 3: Истощение (эмоциональное и физическое)
+        TestQuestion(11, "Я чувствую себя 'выжатым(ой)' и опустошенным(ой) после стандартного рабочего дня, даже если не было авралов", "фаза3"),
+        TestQuestion(12, "Меня не радуют успешно завершенные задачи или рабочие победы, которые раньше приносили удовлетворение", "фаза3"),
+        TestQuestion(13, "Я выполняю задачи механически, 'на автопилоте', без прежнего интереса к решению нетривиальных проблем", "фаза3"),
+        TestQuestion(14, "Я стал(а) чаще допускать досадные ошибки, опечатки или упускать важные детали в своей работе", "фаза3"),
+        TestQuestion(15, "У меня пропало желание изучать новые инструменты, технологии или улучшать свои профессиональные навыки", "фаза3"),
+        
+        # Фаза 4: Деформация (профессиональная деградация)
+        TestQuestion(16, "Я ощущаю, что мой профессиональный рост остановился, и я отстаю от трендов в индустрии", "фаза4"),
+        TestQuestion(17, "Я сомневаюсь в своей профессиональной компетентности и ценности как специалиста на рынке", "фаза4"),
+        TestQuestion(18, "У меня всерьез возникают мысли о том, чтобы уйти из текущей компании, сменить роль внутри ИТ или покинуть индустрию вообще", "фаза4"),
+        TestQuestion(19, "Мне кажется, что моя работа потеряла смысл и не приносит реальной пользы", "фаза4"),
+        TestQuestion(20, "Я сознательно откладываю или саботирую планы по обучению и профессиональному развитию", "фаза4"),
+    )
+    
     @classmethod
-    def get_all(cls) -> List[TestQuestion]:
-        return [
-            # Фаза 1: Напряжение (первые признаки выгорания)
-            TestQuestion(1, "Я чувствую себя эмоционально истощенным к концу рабочей недели/спринта", "фаза1"),
-            TestQuestion(2, "Мне становится все труднее сосредоточиться на сложных задачах, требующих глубокой концентрации", "фаза1"),
-            TestQuestion(3, "Я испытываю раздражение или тревогу при мысли о накопившихся тикетах, задачах в бэклоге или предстоящих дедлайнах", "фаза1"),
-            TestQuestion(4, "Я часто ловлю себя на мысли о работе в нерабочее время, по выходным или перед сном", "фаза1"),
-            TestQuestion(5, "У меня возникает физическое напряжение (в шее, спине, глазах) от долгой работы за компьютером, которое не проходит после отдыха", "фаза1"),
-            
-            # Фаза 2: Резистенция (сопротивление, цинизм)
-            TestQuestion(6, "Я стал(а) более цинично относиться к целям проекта, новым корпоративным инициативам или постоянным изменениям в процессах", "фаза2"),
-            TestQuestion(7, "Меня раздражают просьбы пользователей, коллег из других отделов или членов команды, которые 'отвлекают' от моей основной работы", "фаза2"),
-            TestQuestion(8, "Я стал(а) воспринимать коллег или клиентов скорее как источник проблем, чем как часть общей цели", "фаза2"),
-            TestQuestion(9, "Я избегаю необязательных митингов, корпоративных мероприятий или неформального общения с командой", "фаза2"),
-            TestQuestion(10, "Мне кажется, что мои усилия и expertise не получают должного признания или влияют на результат меньше, чем хотелось бы", "фаза2"),
-            
-            # Фаза 3: Истощение (эмоциональное и физическое)
-            TestQuestion(11, "Я чувствую себя 'выжатым(ой)' и опустошенным(ой) после стандартного рабочего дня, даже если не было авралов", "фаза3"),
-            TestQuestion(12, "Меня не радуют успешно завершенные задачи или рабочие победы, которые раньше приносили удовлетворение", "фаза3"),
-            TestQuestion(13, "Я выполняю задачи механически, 'на автопилоте', без прежнего интереса к решению нетривиальных проблем", "фаза3"),
-            TestQuestion(14, "Я стал(а) чаще допускать досадные ошибки, опечатки или упускать важные детали в своей работе", "фаза3"),
-            TestQuestion(15, "У меня пропало желание изучать новые инструменты, технологии или улучшать свои профессиональные навыки", "фаза3"),
-            
-            # Фаза 4: Деформация (профессиональная деградация)
-            TestQuestion(16, "Я ощущаю, что мой профессиональный рост остановился, и я отстаю от трендов в индустрии", "фаза4"),
-            TestQuestion(17, "Я сомневаюсь в своей профессиональной компетентности и ценности как специалиста на рынке", "фаза4"),
-            TestQuestion(18, "У меня всерьез возникают мысли о том, чтобы уйти из текущей компании, сменить роль внутри ИТ или покинуть индустрию вообще", "фаза4"),
-            TestQuestion(19, "Мне кажется, что моя работа потеряла смысл и не приносит реальной пользы", "фаза4"),
-            TestQuestion(20, "Я сознательно откладываю или саботирую планы по обучению и профессиональному развитию", "фаза4"),
-        ]
+    def get_all(cls) -> Tuple[TestQuestion, ...]:
+        return get_catalog(cls.TEST_TYPE).questions
     
     @classmethod
     def get_question(cls, question_id: int) -> TestQuestion:
-        questions = cls.get_all()
-        if 1 <= question_id <= len(questions):
-            return questions[question_id - 1]
-        raise ValueError(f"Вопрос с ID {question_id} не найден")
+        return get_catalog(cls.TEST_TYPE).get(question_id)
     
     @classmethod
     def get_phase_description(cls, phase: str) -> str:
@@ -194,58 +239,56 @@ class BoykoTestQuestions:
     @classmethod
     def get_questions_count_by_phase(cls) -> Dict[str, int]:
         """Количество вопросов по фазам"""
-        counts = {"фаза1": 0, "фаза2": 0, "фаза3": 0, "фаза4": 0}
-        for question in cls.get_all():
-            counts[question.scale] += 1
-        return counts
+        return dict(get_catalog(cls.TEST_TYPE).scale_counts)
 
 class HeckHessTestQuestions:
     """Тест Хека-Хесса для диагностики депрессивных состояний (адаптированный для ИТ)"""
     
+    TEST_TYPE = 'heck_hess'
+    
     SCALES = {
         'depression': 'Депрессивные симптомы',
         'burnout': 'Риск выгорания',
         'anxiety': 'Тревожность'
     }
     
+    QUESTIONS = (
+        # Вопросы депрессивного состояния (1-7)
+        TestQuestion(1, "Чувствуете ли вы подавленное настроение большую часть дня?", "depression"),
+        TestQuestion(2, "Испытываете ли вы снижение интереса к программированию или технологиям?", "depression"),
+        TestQuestion(3, "Чувствуете ли вы постоянную усталость и недостаток энергии для работы?", "depression"),
+        TestQuestion(4, "Есть ли у вас чувство вины за несделанные задачи или баги в коде?", "depression"),
+        TestQuestion(5, "Трудно ли вам концентрироваться на написании кода?", "depression"),
+        TestQuestion(6, "Бывают ли у вас мысли о бессмысленности работы в ИТ?", "depression"),
+        TestQuestion(7, "Испытываете ли вы беспокойство из-за постоянных изменений в технологиях?", "depression"),
+        
+        # Вопросы риска выгорания (8-14)
+        TestQuestion(8, "Чувствуете ли вы эмоциональное истощение после рабочего дня с кодом?", "burnout"),
+        TestQuestion(9, "Стали ли вы более циничным или безразличным к качеству своего кода?", "burnout"),
+        TestQuestion(10, "Ощущаете ли вы снижение профессиональной эффективности в работе?", "burnout"),
+        TestQuestion(11, "Избегаете ли вы общения с коллегами и командой?", "burnout"),
+        TestQuestion(12, "Есть ли у вас физические симптомы (головные боли, проблемы со сном)?", "burnout"),
+        TestQuestion(13, "Чувствуете ли вы, что работа не приносит удовлетворения?", "burnout"),
+        TestQuestion(14, "Думали ли вы о смене работы или профессии в ИТ?", "burnout"),
+        
+        # Вопросы тревожности (15-21)
+        TestQuestion(15, "Испытываете ли вы напряжение или нервозность перед дедлайнами?", "anxiety"),
+        TestQuestion(16, "Беспокоитесь ли вы о качестве кода и возможных багах?", "anxiety"),
+        TestQuestion(17, "Трудно ли вам расслабиться после решения сложных технических задач?", "anxiety"),
+        TestQuestion(18, "Чувствуете ли вы внутреннее беспокойство о карьерном росте в ИТ?", "anxiety"),
+        TestQuestion(19, "Есть ли у вас трудности с засыпанием из-за мыслей о работе?", "anxiety"),
+        TestQuestion(20, "Ощущаете ли вы мышечное напряжение от долгой работы за компьютером?", "anxiety"),
+        TestQuestion(21, "Чувствуете ли вы, что не успеваете за технологическими изменениями в индустрии?", "anxiety"),
+    )
+    
     @classmethod
-    def get_all(cls) -> List[TestQuestion]:
+    def get_all(cls) -> Tuple[TestQuestion, ...]:
         """21 вопрос теста Хека-Хесса (с адаптацией для ИТ)"""
-        return [
-            # Вопросы депрессивного состояния (1-7)
-            TestQuestion(1, "Чувствуете ли вы подавленное настроение большую часть дня?", "depression"),
-            TestQuestion(2, "Испытываете ли вы снижение интереса к программированию или технологиям?", "depression"),
-            TestQuestion(3, "Чувствуете ли вы постоянную усталость и недостаток энергии для работы?", "depression"),
-            TestQuestion(4, "Есть ли у вас чувство вины за несделанные задачи или баги в коде?", "depression"),
-            TestQuestion(5, "Трудно ли вам концентрироваться на написании кода?", "depression"),
-            TestQuestion(6, "Бывают ли у вас мысли о бессмысленности работы в ИТ?", "depression"),
-            TestQuestion(7, "Испытываете ли вы беспокойство из-за постоянных изменений в технологиях?", "depression"),
-            
-            # Вопросы риска выгорания (8-14)
-            TestQuestion(8, "Чувствуете ли вы эмоциональное истощение после рабочего дня с кодом?", "burnout"),
-            TestQuestion(9, "Стали ли вы более циничным или безразличным к качеству своего кода?", "burnout"),
-            TestQuestion(10, "Ощущаете ли вы снижение профессиональной эффективности в работе?", "burnout"),
-            TestQuestion(11, "Избегаете ли вы общения с коллегами и командой?", "burnout"),
-            TestQuestion(12, "Есть ли у вас физические симптомы (головные боли, проблемы со сном)?", "burnout"),
-            TestQuestion(13, "Чувствуете ли вы, что работа не приносит удовлетворения?", "burnout"),
-            TestQuestion(14, "Думали ли вы о смене работы или профессии в ИТ?", "burnout"),
-            
-            # Вопросы тревожности (15-21)
-            TestQuestion(15, "Испытываете ли вы напряжение или нервозность перед дедлайнами?", "anxiety"),
-            TestQuestion(16, "Беспокоитесь ли вы о качестве кода и возможных багах?", "anxiety"),
-            TestQuestion(17, "Трудно ли вам расслабиться после решения сложных технических задач?", "anxiety"),
-            TestQuestion(18, "Чувствуете ли вы внутреннее беспокойство о карьерном росте в ИТ?", "anxiety"),
-            TestQuestion(19, "Есть ли у вас трудности с засыпанием из-за мыслей о работе?", "anxiety"),
-            TestQuestion(20, "Ощущаете ли вы мышечное напряжение от долгой работы за компьютером?", "anxiety"),
-            TestQuestion(21, "Чувствуете ли вы, что не успеваете за технологическими изменениями в индустрии?", "anxiety"),
-        ]
+        return get_catalog(cls.TEST_TYPE).questions
     
     @classmethod
     def get_question(cls, question_id: int) -> TestQuestion:
-        questions = cls.get_all()
-        if 1 <= question_id <= len(questions):
-            return questions[question_id - 1]
-        raise ValueError(f"Вопрос с ID {question_id} не найден")
+        return get_catalog(cls.TEST_TYPE).get(question_id)
     
     @classmethod
     def get_question_text(cls, question_id: int) -> str:
@@ -285,4 +328,20 @@ class HeckHessTestQuestions:
                 'high': (18, 25, "Высокая тревожность"),
                 'severe': (26, 34, "Тяжелая тревожность")
             }
-        }
\ No newline at end of file
+        }
+
+# Реестр каталогов: строится один раз при импорте модуля
+CATALOGS: Dict[str, QuestionCatalog] = {
+    MaslachQuestions.TEST_TYPE: QuestionCatalog.build(MaslachQuestions.TEST_TYPE, MaslachQuestions.QUESTIONS, max_answer=6),
+    QuickTestQuestions.TEST_TYPE: QuestionCatalog.build(
+        QuickTestQuestions.TEST_TYPE,
+        [TestQuestion(i, text, "total") for i, text in enumerate(QuickTestQuestions.QUESTIONS, 1)],
+        max_answer=4
+    ),
+    BoykoTestQuestions.TEST_TYPE: QuestionCatalog.build(BoykoTestQuestions.TEST_TYPE, BoykoTestQuestions.QUESTIONS, max_answer=2),
+    HeckHessTestQuestions.TEST_TYPE: QuestionCatalog.build(HeckHessTestQuestions.TEST_TYPE, HeckHessTestQuestions.QUESTIONS, max_answer=3),
+}
+
+def get_catalog(test_type: str) -> QuestionCatalog:
+    """Получение каталога вопросов по типу теста"""
+    return CATALOGS[test_type]
\ No newline at end of file
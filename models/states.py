@@ -1,14 +1,10 @@
 # models/states.py
-from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.state import State
 
-class QuickTestStates(StatesGroup):
-    questions = State()
+# Все тесты проходят через общий движок опросников (handlers/questionnaire.py).
+# Состояние теста - "Questionnaire:<тип теста>", отдельный StatesGroup на тест не нужен.
+QUESTIONNAIRE_GROUP = "Questionnaire"
 
-class MaslachTestStates(StatesGroup):
-    questions = State()
-
-class BoykoTestStates(StatesGroup):
-    questions = State()
-
-class HeckHessTestStates(StatesGroup):
-    questions = State()
\ No newline at end of file
+def questionnaire_state(test_type: str) -> State:
+    """Состояние прохождения теста test_type"""
+    return State(test_type, group_name=QUESTIONNAIRE_GROUP)
\ No newline at end of file
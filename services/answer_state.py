@@ -0,0 +1,32 @@
+# services/answer_state.py
+from aiogram.fsm.context import FSMContext
+
+from models.answers import AnswerVector
+
+# Если хранилище FSM умеет работать с вектором ответов отдельно (KeyValueFSMStorage),
+# каждый ответ записывается одной дельтой в 1 байт. Иначе вектор лежит в данных FSM.
+
+async def start_answers(state: FSMContext, size: int) -> AnswerVector:
+    """Пустой вектор ответов для нового теста"""
+    vector = AnswerVector.empty(size)
+    if hasattr(state.storage, "set_answers"):
+        await state.storage.set_answers(state.key, vector.to_bytes())
+    else:
+        await state.update_data(answers=vector.to_bytes())
+    return vector
+
+async def load_answers(state: FSMContext) -> AnswerVector:
+    """Текущий вектор ответов (курсор - номер текущего вопроса)"""
+    if hasattr(state.storage, "get_answers"):
+        raw = await state.storage.get_answers(state.key)
+    else:
+        raw = await state.get_value("answers")
+    return AnswerVector(raw or b"")
+
+async def save_answer(state: FSMContext, vector: AnswerVector, question_id: int, code: int) -> bool:
+    """Запись одного ответа в вектор и в хранилище; False - вектор в хранилище пропал"""
+    vector.set(question_id, code)
+    if hasattr(state.storage, "set_answer"):
+        return await state.storage.set_answer(state.key, question_id, code)
+    await state.update_data(answers=vector.to_bytes())
+    return True
@@ -0,0 +1,127 @@
+# services/batch_scoring.py
+from functools import lru_cache
+from typing import Dict, Iterable, Tuple, Union
+
+from models.answers import AnswerVector
+from models.questions import get_catalog
+from services.thresholds import thresholds
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+AnswerRows = Union["np.ndarray", Iterable[Union[bytes, AnswerVector]]]
+
+def _require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("Для пакетного расчета установите пакет numpy: pip install numpy")
+
+def _levels(test_type: str, scale: str, scores: "np.ndarray") -> "np.ndarray":
+    """Уровни для массива баллов: searchsorted по той же таблице, что и в TestCalculator"""
+    table = thresholds.get(test_type, scale)
+    index = np.searchsorted(np.asarray(table.bounds), scores, side=table.side)
+    return np.asarray(table.levels, dtype=object)[index]
+
+def answers_matrix(test_type: str, rows: AnswerRows) -> "np.ndarray":
+    """Матрица ответов (записи x вопросы) из векторов ответов или готового массива"""
+    _require_numpy()
+    count = get_catalog(test_type).count
+    if isinstance(rows, np.ndarray):
+        matrix = rows
+    else:
+        raw = b"".join(row.to_bytes() if isinstance(row, AnswerVector) else bytes(row) for row in rows)
+        matrix = np.frombuffer(raw, dtype=np.uint8).reshape(-1, count)
+    if matrix.ndim != 2 or matrix.shape[1] != count:
+        raise ValueError(f"Ожидается матрица N x {count} для теста {test_type}")
+    return matrix.astype(np.int32)
+
+@lru_cache(maxsize=None)
+def _scale_matrix(test_type: str) -> Tuple[Tuple[str, ...], "np.ndarray"]:
+    """Матрица весов вопрос -> шкала из каталога"""
+    catalog = get_catalog(test_type)
+    weights = np.zeros((catalog.count, len(catalog.scales)), dtype=np.int32)
+    for row, question in enumerate(catalog.questions):
+        weights[row, catalog.scales.index(question.scale)] = 1
+    return catalog.scales, weights
+
+def score_maslach(rows: AnswerRows) -> Dict[str, "np.ndarray"]:
+    """Пакетный расчет опросника Маслач"""
+    answers = answers_matrix('maslach', rows)
+    catalog = get_catalog('maslach')
+    reverse = np.asarray(catalog.reversed_flags)
+    adjusted = np.where(reverse, 6 - answers, answers)
+    scales, weights = _scale_matrix('maslach')
+    totals = adjusted @ weights
+    
+    result = {}
+    for column, scale in enumerate(scales):
+        result[scale] = totals[:, column]
+        result[f"{scale}_level"] = _levels('maslach', scale, totals[:, column])
+    
+    ee_high = result['EE_level'] == "высокий"
+    dp_high = result['DP_level'] == "высокий"
+    result['overall'] = np.where(
+        ee_high & dp_high, "критический уровень выгорания в ИТ",
+        np.where(ee_high | dp_high, "повышенный риск выгорания", "нормальный уровень, риски минимальны")
+    ).astype(object)
+    return result
+
+def score_boyko(rows: AnswerRows) -> Dict[str, "np.ndarray"]:
+    """Пакетный расчет теста Бойко (коды ответов 0/1/2 совпадают с баллами)"""
+    answers = answers_matrix('boyko', rows)
+    catalog = get_catalog('boyko')
+    scales, weights = _scale_matrix('boyko')
+    phases = answers @ weights
+    max_scores = np.asarray([catalog.max_scores[scale] for scale in scales])
+    percentages = np.round(phases / max_scores * 100, 1)
+    
+    active = percentages > 0
+    active_count = active.sum(axis=1)
+    total_percentage = np.divide(
+        np.where(active, percentages, 0).sum(axis=1), active_count,
+        out=np.zeros(len(percentages)), where=active_count > 0
+    )
+    
+    result = {'indicator_phase': np.asarray(scales, dtype=object)[percentages.argmax(axis=1)]}
+    for column, scale in enumerate(scales):
+        result[scale] = phases[:, column]
+        result[f"{scale}_percentage"] = percentages[:, column]
+        result[f"{scale}_level"] = _levels('boyko', 'phase', percentages[:, column])
+    result['total_percentage'] = np.round(total_percentage, 1)
+    result['risk_level'] = _levels('boyko', 'total', total_percentage)
+    return result
+
+def score_heck_hess(rows: AnswerRows) -> Dict[str, "np.ndarray"]:
+    """Пакетный расчет теста Хека-Хесса"""
+    answers = answers_matrix('heck_hess', rows)
+    scales, weights = _scale_matrix('heck_hess')
+    totals = answers @ weights
+    total_score = totals.sum(axis=1)
+    
+    result = {
+        'total_score': total_score,
+        'overall_level': _levels('heck_hess', 'total', total_score),
+    }
+    for column, scale in enumerate(scales):
+        result[scale] = totals[:, column]
+        result[f"{scale}_level"] = _levels('heck_hess', scale, totals[:, column])
+    result['burnout_risk'] = _levels('heck_hess', 'burnout_risk', result['burnout'])
+    return result
+
+def score_quick(rows: AnswerRows) -> Dict[str, "np.ndarray"]:
+    """Пакетный расчет быстрого теста"""
+    answers = answers_matrix('quick', rows)
+    total = answers.sum(axis=1)
+    return {'total': total, 'level': _levels('quick', 'total', total)}
+
+BATCH_SCORERS = {
+    'maslach': score_maslach,
+    'boyko': score_boyko,
+    'heck_hess': score_heck_hess,
+    'quick': score_quick,
+}
+
+def score_batch(test_type: str, rows: AnswerRows) -> Dict[str, "np.ndarray"]:
+    """Баллы и уровни по всем шкалам для множества ответов одного теста"""
+    return BATCH_SCORERS[test_type](rows)
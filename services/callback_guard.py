@@ -0,0 +1,88 @@
+# services/callback_guard.py
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Hashable
+
+from config import CallbackGuardConfig, callback_guard_config
+
+class _ChatSlot:
+    __slots__ = ('lock', 'recent', 'used')
+    
+    def __init__(self, recent: int, now: float):
+        self.lock = asyncio.Lock()
+        self.recent: Deque[str] = deque(maxlen=recent)
+        self.used = now
+
+class CallbackGuard:
+    """Последовательная обработка нажатий одного чата и отсев повторов"""
+    
+    # Lock на чат не дает двум быстрым нажатиям одновременно прочитать один и тот же
+    # текущий вопрос. Недавние callback id чата хранятся в очереди фиксированной
+    # длины, поэтому повторная доставка того же нажатия отбрасывается, а память
+    # на чат постоянна. Чаты без нажатий дольше ttl удаляются.
+    # При шардировании все апдейты чата попадают в один воркер, так что
+    # блокировки внутри процесса достаточно.
+    
+    def __init__(self, ttl: float = 600.0, recent: int = 16, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.recent = recent
+        self._clock = clock
+        self._slots: Dict[Hashable, _ChatSlot] = {}
+        self._swept = clock()
+        self.duplicates = 0
+        self.stale = 0
+    
+    @classmethod
+    def from_config(cls, config: CallbackGuardConfig) -> "CallbackGuard":
+        return cls(ttl=config.ttl, recent=config.recent_ids)
+    
+    def _slot(self, chat_id: Hashable) -> _ChatSlot:
+        now = self._clock()
+        if now - self._swept >= self.ttl:
+            self._sweep(now)
+        slot = self._slots.get(chat_id)
+        if slot is None:
+            slot = self._slots[chat_id] = _ChatSlot(self.recent, now)
+        slot.used = now
+        return slot
+    
+    def _sweep(self, now: float) -> None:
+        self._swept = now
+        expired = [
+            chat_id for chat_id, slot in self._slots.items()
+            if now - slot.used >= self.ttl and not slot.lock.locked()
+        ]
+        for chat_id in expired:
+            del self._slots[chat_id]
+    
+    def is_duplicate(self, chat_id: Hashable, callback_id: str) -> bool:
+        """Нажатие уже обрабатывалось (повторная доставка того же callback)"""
+        slot = self._slot(chat_id)
+        if callback_id in slot.recent:
+            self.duplicates += 1
+            return True
+        slot.recent.append(callback_id)
+        return False
+    
+    def mark_stale(self) -> None:
+        """Учет нажатия на уже отвеченный вопрос"""
+        self.stale += 1
+    
+    @asynccontextmanager
+    async def serialized(self, chat_id: Hashable) -> AsyncIterator[None]:
+        """Обработка нажатий чата по одному"""
+        slot = self._slot(chat_id)
+        async with slot.lock:
+            yield
+        slot.used = self._clock()
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def stats(self) -> Dict[str, int]:
+        return {'chats': len(self._slots), 'duplicates': self.duplicates, 'stale': self.stale}
+
+# Один страж на процесс: все хендлеры ответов делят блокировки чатов
+callback_guard = CallbackGuard.from_config(callback_guard_config)
\ No newline at end of file
@@ -0,0 +1,163 @@
+# services/export.py
+"""Потоковая выгрузка всех результатов для аналитики: JSONL, CSV или колоночные блоки
+
+    python -m services.export --format csv --output results.csv --checkpoint results.ckpt
+
+Результаты читаются из хранилища пачками (IStorage.iter_results) и пишутся блоками,
+в памяти одновременно один блок. После каждого блока в --checkpoint сохраняются
+курсор и длина файла: повторный запуск с тем же файлом продолжает выгрузку, а
+недописанный при обрыве хвост обрезается.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import sys
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from config import db_config, export_config
+from services.result_codec import RESULT_SCHEMAS
+
+# Баллы всех тестов - отдельные колонки; у результата заполнены только шкалы его теста
+SCALE_COLUMNS = tuple(dict.fromkeys(scale for schema in RESULT_SCHEMAS.values() for scale in schema.scales))
+COLUMNS = ('chat_id', 'test_type', 'timestamp', 'answers') + SCALE_COLUMNS
+
+def export_row(chat_id: int, result: Dict) -> Dict[str, Any]:
+    """Плоская строка выгрузки: без интерпретации, она строится из баллов"""
+    row = {
+        'chat_id': chat_id,
+        'test_type': result.get('test_type'),
+        'timestamp': result.get('timestamp'),
+        'answers': list(result.get('answers', b'')),
+    }
+    schema = RESULT_SCHEMAS.get(row['test_type'])
+    if schema is not None:
+        row.update(schema.scores_of(result))
+    return row
+
+def _encode_jsonl(rows: List[Dict[str, Any]]) -> str:
+    return ''.join(json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n' for row in rows)
+
+def _encode_csv(rows: List[Dict[str, Any]]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, COLUMNS, restval='', lineterminator='\n')
+    for row in rows:
+        writer.writerow(dict(row, answers=' '.join(map(str, row['answers']))))
+    return buffer.getvalue()
+
+def _encode_columns(rows: List[Dict[str, Any]]) -> str:
+    # Блок - строка JSON с массивом на колонку (вместо Parquet: pyarrow не в зависимостях)
+    return json.dumps({column: [row.get(column) for row in rows] for column in COLUMNS},
+                      ensure_ascii=False, separators=(',', ':')) + '\n'
+
+def _csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerow(COLUMNS)
+    return buffer.getvalue()
+
+# Формат -> (кодирование блока строк, расширение файла, заголовок файла)
+EXPORT_FORMATS: Dict[str, Tuple[Callable[[List[Dict[str, Any]]], str], str, Callable[[], str]]] = {
+    'jsonl': (_encode_jsonl, 'jsonl', str),
+    'csv': (_encode_csv, 'csv', _csv_header),
+    'columns': (_encode_columns, 'columns.jsonl', str),
+}
+
+class ExportChunk(NamedTuple):
+    """Блок выгрузки и курсор его последнего результата"""
+    text: str
+    cursor: str
+    rows: int
+
+async def export_chunks(storage, fmt: str, after: Optional[str] = None,
+                        batch_size: int = export_config.batch_size) -> AsyncIterator[ExportChunk]:
+    """Все результаты после курсора after блоками по batch_size строк"""
+    encode = EXPORT_FORMATS[fmt][0]
+    batch: List[Dict[str, Any]] = []
+    cursor = after
+    async for cursor, chat_id, result in storage.iter_results(after, batch_size):
+        batch.append(export_row(chat_id, result))
+        if len(batch) >= batch_size:
+            yield ExportChunk(encode(batch), cursor, len(batch))
+            batch = []
+    if batch:
+        yield ExportChunk(encode(batch), cursor, len(batch))
+
+def _read_checkpoint(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def _write_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    # Через временный файл: при обрыве остается либо старая, либо новая отметка
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def _append(f, data: bytes) -> None:
+    f.write(data)
+    f.flush()
+    os.fsync(f.fileno())
+
+async def export_to_file(storage, fmt: str, path: str, after: Optional[str] = None,
+                         checkpoint: Optional[str] = None,
+                         batch_size: int = export_config.batch_size) -> Tuple[int, Optional[str]]:
+    """Выгрузка в файл: (число результатов, курсор последнего); с checkpoint - с места обрыва"""
+    state = _read_checkpoint(checkpoint) if checkpoint else None
+    if state is not None and state['format'] != fmt:
+        raise ValueError(f"Отметка {checkpoint} сделана для формата {state['format']}, а не {fmt}")
+    if state is not None:
+        size = os.path.getsize(path) if os.path.exists(path) else None
+        if size is None or size < state['offset']:
+            raise ValueError(f"Файл {path} не совпадает с отметкой {checkpoint}: нужен файл прерванной выгрузки")
+        after = state['cursor']
+    header = EXPORT_FORMATS[fmt][2]
+    
+    rows = 0
+    with open(path, 'ab' if state is not None else 'wb') as f:
+        if state is not None:
+            # Блок, записанный после последней отметки, будет выгружен заново
+            f.truncate(state['offset'])
+        else:
+            await asyncio.to_thread(_append, f, header().encode())
+        async for chunk in export_chunks(storage, fmt, after, batch_size):
+            await asyncio.to_thread(_append, f, chunk.text.encode())
+            rows += chunk.rows
+            after = chunk.cursor
+            if checkpoint:
+                state = {'format': fmt, 'cursor': after, 'offset': f.tell()}
+                await asyncio.to_thread(_write_checkpoint, checkpoint, state)
+    return rows, after
+
+async def main(args: argparse.Namespace) -> int:
+    # Отдельный процесс не видит память бота: выгрузка из пустого хранилища
+    # молча дала бы пустой файл
+    if db_config.backend == "memory":
+        print("Хранилище в памяти (db_config.backend = \"memory\") доступно только процессу бота: "
+              "используйте команду /export или SQL-хранилище", file=sys.stderr)
+        return 2
+    from services.storage import storage
+    
+    try:
+        rows, cursor = await export_to_file(storage, args.format, args.output, args.after,
+                                            args.checkpoint, args.batch_size)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    finally:
+        await storage.close()
+    print(f"Выгружено результатов: {rows}, курсор: {cursor}")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="jsonl")
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--after", metavar="CURSOR", help="выгрузить только результаты после курсора")
+    parser.add_argument("--checkpoint", metavar="PATH", help="файл отметки для продолжения после обрыва")
+    parser.add_argument("--batch-size", type=int, default=export_config.batch_size)
+    sys.exit(asyncio.run(main(parser.parse_args())))
\ No newline at end of file
@@ -0,0 +1,246 @@
+# services/fsm_storage.py
+import base64
+import heapq
+import json
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StorageKey
+
+from config import FSMConfig
+
+try:
+    from redis.asyncio import Redis
+except ImportError:
+    Redis = None
+
+ExpiryT = Optional[Union[int, timedelta]]
+
+def _seconds(ttl: ExpiryT) -> Optional[float]:
+    if isinstance(ttl, timedelta):
+        return ttl.total_seconds()
+    return ttl
+
+class InMemoryRedis:
+    """Замена Redis внутри процесса: то же подмножество команд и TTL, без сети"""
+    
+    COMPACT_MIN = 64  # маленькую кучу пересобирать не стоит
+    
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._data: Dict[str, bytes] = {}
+        self._expires: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+    
+    def _evict_expired(self) -> None:
+        """Активное удаление просроченных ключей (амортизированно O(log n))"""
+        now = self._clock()
+        while self._heap and self._heap[0][0] <= now:
+            expire_at, key = heapq.heappop(self._heap)
+            if self._expires.get(key) == expire_at:
+                del self._expires[key]
+                self._data.pop(key, None)
+    
+    def _set_expiry(self, name: str, ex: ExpiryT) -> None:
+        seconds = _seconds(ex)
+        if seconds is None:
+            self._expires.pop(name, None)
+            return
+        expire_at = self._clock() + seconds
+        self._expires[name] = expire_at
+        heapq.heappush(self._heap, (expire_at, name))
+        # Состояние перезаписывается на каждом ответе, и старые сроки остаются в куче
+        # до своего времени. Когда устаревших больше половины, куча пересобирается
+        # из живых сроков: размер пропорционален числу ключей, а не числу записей
+        if len(self._heap) > 2 * len(self._expires) + self.COMPACT_MIN:
+            self._heap = [(at, key) for key, at in self._expires.items()]
+            heapq.heapify(self._heap)
+    
+    async def get(self, name: str) -> Optional[bytes]:
+        self._evict_expired()
+        return self._data.get(name)
+    
+    async def set(self, name: str, value: Union[str, bytes], ex: ExpiryT = None) -> bool:
+        self._evict_expired()
+        self._data[name] = value.encode() if isinstance(value, str) else bytes(value)
+        self._set_expiry(name, ex)
+        return True
+    
+    async def setrange(self, name: str, offset: int, value: bytes) -> int:
+        """Запись байтов по смещению на месте (TTL ключа сохраняется, как в Redis)"""
+        self._evict_expired()
+        current = bytearray(self._data.get(name, b""))
+        if len(current) < offset:
+            current.extend(b"\x00" * (offset - len(current)))
+        current[offset:offset + len(value)] = value
+        self._data[name] = bytes(current)
+        return len(current)
+    
+    async def expire(self, name: str, ttl: ExpiryT) -> bool:
+        self._evict_expired()
+        if name not in self._data:
+            return False
+        self._set_expiry(name, ttl)
+        return True
+    
+    async def exists(self, *names: str) -> int:
+        self._evict_expired()
+        return sum(name in self._data for name in names)
+    
+    def pipeline(self, transaction: bool = True) -> "InMemoryPipeline":
+        return InMemoryPipeline(self)
+    
+    async def delete(self, *names: str) -> int:
+        deleted = 0
+        for name in names:
+            if self._data.pop(name, None) is not None:
+                deleted += 1
+            self._expires.pop(name, None)
+        return deleted
+    
+    async def dbsize(self) -> int:
+        self._evict_expired()
+        return len(self._data)
+    
+    async def aclose(self) -> None:
+        self._data.clear()
+        self._expires.clear()
+        self._heap.clear()
+
+class InMemoryPipeline:
+    """Пачка команд InMemoryRedis: выполняются подряд без переключения задач, как MULTI/EXEC"""
+    
+    def __init__(self, redis: InMemoryRedis):
+        self._redis = redis
+        self._commands: List[Tuple[str, tuple]] = []
+    
+    def __getattr__(self, name: str) -> Callable[..., "InMemoryPipeline"]:
+        getattr(self._redis, name)  # неизвестная команда - AttributeError сразу
+        
+        def queue(*args: Any) -> "InMemoryPipeline":
+            self._commands.append((name, args))
+            return self
+        return queue
+    
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._redis, name)(*args) for name, args in commands]
+    
+    async def __aenter__(self) -> "InMemoryPipeline":
+        return self
+    
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._commands = []
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, dict):
+        # JSON превращает int-ключи в строки, а ответы тестов хранятся как {номер_вопроса: ответ}
+        if value and all(isinstance(k, int) for k in value):
+            return {"#i": [item for k, v in value.items() for item in (k, _encode(v))]}
+        return {k: _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, (bytes, bytearray)):
+        return {"#b": base64.b64encode(value).decode()}
+    return value
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "#i" in value and len(value) == 1:
+            flat = value["#i"]
+            return {flat[i]: _decode(flat[i + 1]) for i in range(0, len(flat), 2)}
+        if "#b" in value and len(value) == 1:
+            return base64.b64decode(value["#b"])
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+def pack_data(data: Mapping[str, Any]) -> bytes:
+    """Компактная сериализация данных FSM (JSON без пробелов, int-ключи сохраняются)"""
+    return json.dumps(_encode(dict(data)), ensure_ascii=False, separators=(",", ":")).encode()
+
+def unpack_data(raw: Optional[bytes]) -> Dict[str, Any]:
+    if not raw:
+        return {}
+    return _decode(json.loads(raw))
+
+class KeyValueFSMStorage(BaseStorage):
+    """Хранилище состояний FSM поверх Redis-совместимого клиента с TTL на ключи"""
+    
+    def __init__(
+        self,
+        redis: Any,
+        key_builder: Optional[KeyBuilder] = None,
+        state_ttl: ExpiryT = None,
+        data_ttl: ExpiryT = None
+    ):
+        self.redis = redis
+        self.key_builder = key_builder or DefaultKeyBuilder()
+        self.state_ttl = state_ttl
+        self.data_ttl = data_ttl
+    
+    async def set_state(self, key: StorageKey, state: Union[str, State, None] = None) -> None:
+        redis_key = self.key_builder.build(key, "state")
+        if state is None:
+            await self.redis.delete(redis_key)
+            return
+        value = state.state if isinstance(state, State) else state
+        await self.redis.set(redis_key, value, ex=self.state_ttl)
+    
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        value = await self.redis.get(self.key_builder.build(key, "state"))
+        if isinstance(value, bytes):
+            return value.decode()
+        return value
+    
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        redis_key = self.key_builder.build(key, "data")
+        if not data:
+            # Очистка состояния (state.clear()) удаляет и вектор ответов
+            await self.redis.delete(redis_key, self.key_builder.build(key, "answers"))
+            return
+        await self.redis.set(redis_key, pack_data(data), ex=self.data_ttl)
+    
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return unpack_data(await self.redis.get(self.key_builder.build(key, "data")))
+    
+    # Вектор ответов хранится отдельным ключом, чтобы каждый ответ был дельтой в 1 байт
+    async def set_answers(self, key: StorageKey, answers: bytes) -> None:
+        await self.redis.set(self.key_builder.build(key, "answers"), answers, ex=self.data_ttl)
+    
+    async def get_answers(self, key: StorageKey) -> bytes:
+        return await self.redis.get(self.key_builder.build(key, "answers")) or b""
+    
+    async def set_answer(self, key: StorageKey, question_id: int, code: int) -> bool:
+        """Запись одного ответа; False - вектора нет (истек или удален), ответ не записан"""
+        redis_key = self.key_builder.build(key, "answers")
+        # SETRANGE на отсутствующем ключе создал бы вектор без TTL, дополненный нулями
+        # (нулевой код - допустимый ответ), поэтому проверка и продление TTL - в той же транзакции
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.exists(redis_key)
+            pipe.setrange(redis_key, question_id - 1, bytes([code]))
+            if self.data_ttl is not None:
+                pipe.expire(redis_key, self.data_ttl)
+            existed = (await pipe.execute())[0]
+        if not existed:
+            await self.redis.delete(redis_key)
+        return bool(existed)
+    
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+def create_fsm_storage(config: FSMConfig) -> BaseStorage:
+    """Выбор хранилища FSM по конфигурации"""
+    if config.backend == "memory":
+        redis = InMemoryRedis()
+    elif config.backend == "redis":
+        if Redis is None:
+            raise RuntimeError("Для хранения состояний в Redis установите пакет redis: pip install redis")
+        redis = Redis.from_url(config.redis_url)
+    else:
+        raise ValueError(f"Неизвестное хранилище FSM: {config.backend}")
+    
+    return KeyValueFSMStorage(redis, state_ttl=config.state_ttl, data_ttl=config.data_ttl)
@@ -0,0 +1,131 @@
+# services/message_composer.py
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from aiogram import types
+from aiogram.utils.text_decorations import html_decoration, markdown_decoration
+
+from keyboards.registry import Markup
+
+# Ограничение Telegram на длину текста сообщения (в единицах UTF-16)
+TELEGRAM_TEXT_LIMIT = 4096
+
+PART_SEPARATOR = "\n\n"
+
+_MARKDOWN_SPECIAL = re.compile(r"([_*`\[])")
+
+# Экранирование обычного текста при склейке с размеченным
+_ESCAPERS = {
+    "Markdown": lambda text: _MARKDOWN_SPECIAL.sub(r"\\\1", text),
+    "MarkdownV2": markdown_decoration.quote,
+    "HTML": html_decoration.quote,
+}
+
+def text_length(text: str) -> int:
+    """Длина текста так, как ее считает Telegram"""
+    return len(text.encode("utf-16-le")) // 2
+
+def _split_point(text: str, limit: int) -> Tuple[str, str]:
+    end = limit
+    while text_length(text[:end]) > limit:
+        end -= (text_length(text[:end]) - limit + 1) // 2 or 1
+    # Режем по абзацу, строке или пробелу, чтобы не разрывать разметку
+    for separator in ("\n\n", "\n", " "):
+        position = text.rfind(separator, 0, end)
+        if position > 0:
+            return text[:position], text[position + len(separator):]
+    if text[end - 1] == "\\":
+        end -= 1
+    return text[:end], text[end:]
+
+def split_text(text: str, limit: int = TELEGRAM_TEXT_LIMIT) -> List[str]:
+    """Разбиение длинного текста на части не длиннее limit"""
+    chunks = []
+    while text_length(text) > limit:
+        head, text = _split_point(text, limit)
+        if head.strip():
+            chunks.append(head)
+    if text.strip():
+        chunks.append(text)
+    return chunks
+
+@dataclass(slots=True)
+class _Part:
+    text: str
+    parse_mode: Optional[str] = None
+
+@dataclass(slots=True)
+class _Group:
+    """Последовательные части, которые уйдут одним сообщением"""
+    parts: List[_Part]
+    parse_mode: Optional[str] = None
+    reply_markup: Optional[Markup] = None
+    
+    def accepts(self, parse_mode: Optional[str]) -> bool:
+        if self.reply_markup is not None:
+            return False
+        if parse_mode == self.parse_mode:
+            return True
+        # Обычный текст можно вставить в размеченный только с экранированием
+        return (parse_mode or self.parse_mode) in _ESCAPERS and None in (parse_mode, self.parse_mode)
+    
+    def render(self) -> str:
+        escape = _ESCAPERS.get(self.parse_mode)
+        return PART_SEPARATOR.join(
+            (escape(part.text) if escape is not None and part.parse_mode is None else part.text).strip("\n")
+            for part in self.parts
+        )
+
+class MessageComposer:
+    """Сборка нескольких ответов в чат в минимальное число сообщений"""
+    
+    # Повторяет message.answer, но только копит текст: подряд идущие части
+    # склеиваются, пока режим разметки совместим и не встретилась клавиатура
+    # (она прикрепляется к последнему сообщению группы). Слишком длинный
+    # текст делится по абзацам в пределах лимита Telegram.
+    
+    def __init__(self, message: types.Message, limit: int = TELEGRAM_TEXT_LIMIT):
+        self.message = message
+        self.limit = limit
+        self._groups: List[_Group] = []
+    
+    async def answer(
+        self,
+        text: str,
+        parse_mode: Optional[str] = None,
+        reply_markup: Optional[Markup] = None
+    ) -> None:
+        if not text.strip():
+            return
+        group = self._groups[-1] if self._groups else None
+        if group is None or not group.accepts(parse_mode):
+            group = _Group([])
+            self._groups.append(group)
+        group.parts.append(_Part(text, parse_mode))
+        if parse_mode is not None:
+            group.parse_mode = parse_mode
+        if reply_markup is not None:
+            group.reply_markup = reply_markup
+    
+    async def flush(self) -> List[types.Message]:
+        """Отправка накопленного; возвращает отправленные сообщения"""
+        groups, self._groups = self._groups, []
+        sent = []
+        for group in groups:
+            chunks = split_text(group.render(), self.limit)
+            for i, chunk in enumerate(chunks):
+                last = i == len(chunks) - 1
+                sent.append(await self.message.answer(
+                    chunk,
+                    parse_mode=group.parse_mode,
+                    reply_markup=group.reply_markup if last else None
+                ))
+        return sent
+    
+    async def __aenter__(self) -> "MessageComposer":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.flush()
\ No newline at end of file
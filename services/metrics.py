@@ -0,0 +1,363 @@
+# services/metrics.py
+import asyncio
+import bisect
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiogram import BaseMiddleware, Bot, Dispatcher, methods
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from aiogram.types import CallbackQuery, Message, TelegramObject, Update
+from aiohttp import web
+
+from config import MetricsConfig
+
+# Границы корзин гистограмм в секундах: от миллисекунды до десятков секунд
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+class _Metric:
+    kind = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+    
+    def labels(self, *values: str) -> Any:
+        """Серия метрики для значений меток (создается при первом обращении)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: ожидаются метки {self.labelnames}, получено {values}")
+            child = self._children[values] = self._new_child()
+        return child
+    
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+    
+    def _samples(self, values: Tuple[str, ...], child: Any) -> List[str]:
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._samples(values, child))
+        return lines
+
+class _Value:
+    __slots__ = ('value',)
+    
+    def __init__(self):
+        self.value = 0.0
+    
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+    
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+    
+    def set(self, value: float) -> None:
+        self.value = value
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def _new_child(self) -> _Value:
+        return _Value()
+    
+    def _samples(self, values: Tuple[str, ...], child: _Value) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_number(child.value)}"]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+class _HistogramSeries:
+    __slots__ = ('bounds', 'counts', 'sum')
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # последняя корзина - +Inf
+        self.sum = 0.0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def _new_child(self) -> _HistogramSeries:
+        return _HistogramSeries(self.buckets)
+    
+    def _samples(self, values: Tuple[str, ...], child: _HistogramSeries) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _format_number(bound)
+            bucket_labels = _format_labels(self.labelnames, values, 'le="%s"' % le)
+            lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_number(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Collected(_Metric):
+    """Метрика, значения которой читаются при каждом выводе (счетчики чужих кэшей и т.п.)"""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], kind: str,
+                 collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._collect = collect
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, value in self._collect().items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_number(value)}")
+        return lines
+
+class MetricsRegistry:
+    """Метрики процесса в текстовом формате Prometheus"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def collected(self, name: str, documentation: str, labelnames: Sequence[str], kind: str,
+                  collect: Callable[[], Dict[Tuple[str, ...], float]]) -> Collected:
+        """Метрика из функции collect: {значения меток: значение}"""
+        return self._register(Collected(name, documentation, labelnames, kind, collect))
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+class BotMetrics:
+    """Метрики конвейера обработки апдейтов"""
+    
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        self.in_flight = self.registry.gauge("bot_updates_in_flight", "Апдейты в обработке").labels()
+        self.updates = self.registry.histogram(
+            "bot_update_seconds", "Полное время обработки апдейта", ["event"])
+        self.handlers = self.registry.histogram(
+            "bot_handler_seconds", "Время работы хендлера", ["handler", "route"])
+        self.handler_errors = self.registry.counter(
+            "bot_handler_errors_total", "Исключения в хендлерах", ["handler", "route"])
+        self.fsm = self.registry.histogram(
+            "bot_fsm_seconds", "Обращения к хранилищу состояний FSM", ["method"])
+        self.storage = self.registry.histogram(
+            "bot_storage_seconds", "Обращения к хранилищу результатов", ["method"])
+        self.api = self.registry.histogram(
+            "bot_api_request_seconds", "Запросы к Bot API (без ожидания в планировщике)", ["method"])
+        self.api_errors = self.registry.counter(
+            "bot_api_errors_total", "Ошибки запросов к Bot API", ["method", "error"])
+    
+    def render(self) -> str:
+        return self.registry.render()
+
+class TimedProxy:
+    """Обертка над объектом: время каждого async-метода пишется в гистограмму"""
+    
+    # Обертки кэшируются в __dict__, поэтому __getattr__ срабатывает один раз на метод,
+    # а hasattr() для необязательных методов (get_answers и т.п.) ведет себя как у оригинала.
+    
+    def __init__(self, target: Any, histogram: Histogram):
+        self.__dict__['_target'] = target
+        self.__dict__['_histogram'] = histogram
+    
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        if not asyncio.iscoroutinefunction(value):
+            return value
+        series = self._histogram.labels(name)
+        
+        @functools.wraps(value)
+        async def timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await value(*args, **kwargs)
+            finally:
+                series.observe(time.perf_counter() - started)
+        
+        self.__dict__[name] = timed
+        return timed
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._target, name, value)
+
+class TimedFSMStorage(BaseStorage):
+    """Хранилище FSM с замером времени; Dispatcher принимает только BaseStorage"""
+    
+    def __init__(self, storage: BaseStorage, histogram: Histogram):
+        self.storage = storage
+        self._timed = TimedProxy(storage, histogram)
+    
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._timed.set_state(key, state)
+    
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return await self._timed.get_state(key)
+    
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        await self._timed.set_data(key, data)
+    
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return await self._timed.get_data(key)
+    
+    async def update_data(self, key: StorageKey, data: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._timed.update_data(key, data)
+    
+    async def get_value(self, storage_key: StorageKey, dict_key: str, default: Optional[Any] = None) -> Optional[Any]:
+        return await self._timed.get_value(storage_key, dict_key, default)
+    
+    async def close(self) -> None:
+        await self.storage.close()
+    
+    def __getattr__(self, name: str) -> Any:
+        # Дополнительные методы хранилища (get_answers, set_answer) тоже с замером
+        return getattr(self._timed, name)
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Внешний middleware апдейтов: число апдейтов в обработке и полное время"""
+    
+    def __init__(self, metrics: BotMetrics):
+        self.metrics = metrics
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        series = self.metrics.updates.labels(event.event_type)
+        self.metrics.in_flight.inc()
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            series.observe(time.perf_counter() - started)
+            self.metrics.in_flight.dec()
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Внутренний middleware: время конкретного хендлера"""
+    
+    # Хендлеры из RoutingTable вызываются через общий _dispatch, поэтому имя берется
+    # из найденного маршрута, а метка route - кнопка меню или префикс callback_data
+    # (их конечное число). По ней видно, какой тест дает хвост задержек.
+    
+    def __init__(self, metrics: BotMetrics, separator: str = "_"):
+        self.metrics = metrics
+        self.separator = separator
+    
+    def labels(self, event: TelegramObject, data: Dict[str, Any]) -> Tuple[str, str]:
+        route = data.get('route')
+        handler = route.handler if route is not None else data.get('handler')
+        name = getattr(getattr(handler, 'callback', None), '__name__', 'unknown')
+        if route is None:
+            return name, ""
+        if isinstance(event, CallbackQuery) and event.data:
+            return name, event.data.partition(self.separator)[0] + self.separator
+        if isinstance(event, Message) and event.text:
+            return name, event.text
+        return name, ""
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        labels = self.labels(event, data)
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.metrics.handler_errors.labels(*labels).inc()
+            raise
+        finally:
+            self.metrics.handlers.labels(*labels).observe(time.perf_counter() - started)
+
+class ApiMetricsMiddleware(BaseRequestMiddleware):
+    """Middleware сессии бота: время запросов к Bot API и ошибки"""
+    
+    def __init__(self, metrics: BotMetrics):
+        self.metrics = metrics
+    
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: methods.TelegramMethod) -> Any:
+        name = type(method).__name__
+        started = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            self.metrics.api_errors.labels(name, type(e).__name__).inc()
+            raise
+        finally:
+            self.metrics.api.labels(name).observe(time.perf_counter() - started)
+
+def install_metrics(dispatcher: Dispatcher, bot: Bot, metrics: BotMetrics, separator: str = "_") -> None:
+    """Подключение middleware метрик к диспетчеру и сессии бота"""
+    dispatcher.update.outer_middleware(UpdateMetricsMiddleware(metrics))
+    handler_metrics = HandlerMetricsMiddleware(metrics, separator)
+    dispatcher.message.middleware(handler_metrics)
+    dispatcher.callback_query.middleware(handler_metrics)
+    # Регистрируется после планировщика отправки, поэтому меряет только сам запрос
+    bot.session.middleware(ApiMetricsMiddleware(metrics))
+
+async def start_metrics_server(metrics: BotMetrics, config: MetricsConfig, port: Optional[int] = None) -> web.AppRunner:
+    """Локальный HTTP-эндпоинт с метриками для Prometheus"""
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=metrics.render(), headers={'Content-Type': CONTENT_TYPE})
+    
+    app = web.Application()
+    app.router.add_get(config.path, handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, config.host, config.port if port is None else port).start()
+    except OSError:
+        await runner.cleanup()
+        raise
+    return runner
+
+# Метрики процесса; в каждом воркере шардирования свои
+metrics = BotMetrics()
\ No newline at end of file
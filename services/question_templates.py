@@ -0,0 +1,104 @@
+# services/question_templates.py
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from aiogram.types import InlineKeyboardMarkup
+
+from keyboards.boyko_keyboard import get_boyko_keyboard
+from keyboards.heck_hess_keyboard import get_heck_hess_keyboard
+from keyboards.maslach_keyboard import get_maslach_keyboard
+from keyboards.quick_keyboard import get_quick_keyboard
+from keyboards.registry import Markup, keyboards
+from models.questions import get_catalog
+
+@dataclass(frozen=True, slots=True)
+class QuestionMessage:
+    """Готовое сообщение с вопросом: текст, клавиатура и режим разметки"""
+    text: str
+    reply_markup: Markup
+    parse_mode: Optional[str] = None
+
+# Разделитель номера вопроса в callback_data: "maslach_3:5" - ответ 3 на вопрос 5
+QUESTION_TAG = ":"
+
+def tag_markup(markup: Markup, name: str, question_id: int) -> Markup:
+    """Копия клавиатуры, кнопки которой несут номер вопроса (для отсева устаревших нажатий)"""
+    if not isinstance(markup, InlineKeyboardMarkup):
+        return markup
+    rows = [
+        [
+            button.model_copy(update={'callback_data': f"{button.callback_data}{QUESTION_TAG}{question_id}"})
+            for button in row
+        ]
+        for row in markup.inline_keyboard
+    ]
+    return keyboards.register(f"{name}.q{question_id}", InlineKeyboardMarkup(inline_keyboard=rows))
+
+@dataclass(frozen=True, slots=True)
+class QuestionTemplate:
+    """Шаблон сообщения с вопросом: {number}, {total} и {text} подставляются при сборке"""
+    text: str
+    keyboard: Callable[[], Markup]
+    parse_mode: Optional[str] = None
+    
+    def compile(self, test_type: str) -> Tuple[QuestionMessage, ...]:
+        catalog = get_catalog(test_type)
+        markup = self.keyboard()
+        return tuple(
+            QuestionMessage(
+                self.text.format(number=question.id, total=catalog.count, text=question.text),
+                tag_markup(markup, test_type, question.id),
+                self.parse_mode
+            )
+            for question in catalog.questions
+        )
+
+QUESTION_TEMPLATES: Dict[str, QuestionTemplate] = {
+    'maslach': QuestionTemplate(
+        "📊 **Опросник Маслач**\n\n"
+        "Вопрос {number} из {total}\n\n"
+        "{text}\n\n",
+        get_maslach_keyboard,
+        "Markdown"
+    ),
+    'quick': QuestionTemplate(
+        "⚡ **Быстрый тест на выгорание для ИТ-специалистов**\n\n"
+        "Вопрос {number} из {total}\n\n"
+        "{text}\n\n"
+        "Оцените от 0 до 4, где:\n"
+        "0 - никогда\n"
+        "1 - редко\n"
+        "2 - иногда\n"
+        "3 - часто\n"
+        "4 - всегда",
+        get_quick_keyboard
+    ),
+    'boyko': QuestionTemplate(
+        "💻 **Тест Бойко для ИТ-специалистов**\n\n"
+        "Вопрос {number} из {total}\n\n"
+        "**{text}**",
+        get_boyko_keyboard,
+        "Markdown"
+    ),
+    'heck_hess': QuestionTemplate(
+        "🏥 **Тест Хека-Хесса для ИТ-специалистов**\n\n"
+        "Вопрос {number} из {total}\n\n"
+        "**{text}**\n\n"
+        "Оцените от 0 до 3, где:\n"
+        "0 - нет/никогда\n"
+        "1 - иногда\n"
+        "2 - часто\n"
+        "3 - постоянно/всегда",
+        get_heck_hess_keyboard,
+        "Markdown"
+    ),
+}
+
+# Все сообщения с вопросами собираются один раз при импорте
+QUESTION_MESSAGES: Dict[str, Tuple[QuestionMessage, ...]] = {
+    test_type: template.compile(test_type) for test_type, template in QUESTION_TEMPLATES.items()
+}
+
+def question_message(test_type: str, question_id: int) -> QuestionMessage:
+    """Готовое сообщение для вопроса question_id (нумерация с 1)"""
+    return QUESTION_MESSAGES[test_type][question_id - 1]
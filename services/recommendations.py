@@ -1,24 +1,41 @@
 # services/recommendations.py
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Dict, List, Any
 
+from config import metrics_config
+
+# Текст рекомендаций зависит от небольшого набора дискретных значений: уровней
+# шкал, фазы-индикатора и диапазона общего балла. Публичные функции сводят
+# результат к такой сигнатуре, а готовый текст берется из lru_cache (размер с
+# запасом покрывает все комбинации), так что
+# экран результата после первого показа каждой комбинации - поиск в словаре.
+# Сигнатура не зависит от таблиц порогов, поэтому горячая перезагрузка норм
+# кэш не инвалидирует.
+
+# Границы диапазонов общего процента теста Бойко: <25, <50, <75, остальное
+BOYKO_BANDS = (25, 50, 75)
+
 def get_boyko_recommendations(scores: Dict) -> str:
     """Рекомендации по результатам теста Бойко для ИТ"""
-    total_percentage = scores.get('total_percentage', 0)
-    indicator_phase = scores.get('indicator_phase', 'фаза1')
-    
+    band = bisect_right(BOYKO_BANDS, scores.get('total_percentage', 0))
+    return _boyko_recommendations(band, scores.get('indicator_phase', 'фаза1'))
+
+@lru_cache(maxsize=128)
+def _boyko_recommendations(band: int, indicator_phase: str) -> str:
     recommendations = []
     
-    if total_percentage < 25:
+    if band == 0:
         recommendations.append("🎯 **Профилактика для ИТ-специалистов:**")
         recommendations.append("• Поддерживайте текущий режим работы")
         recommendations.append("• Продолжайте профессиональное развитие")
         recommendations.append("• Участвуйте в ИТ-сообществах")
-    elif total_percentage < 50:
+    elif band == 1:
         recommendations.append("⚠️ **Средний уровень - рекомендации:**")
         recommendations.append("• Установите четкие границы рабочего времени")
         recommendations.append("• Делайте регулярные перерывы от экрана")
         recommendations.append("• Практикуйте техники mindfulness")
-    elif total_percentage < 75:
+    elif band == 2:
         recommendations.append("🚨 **Высокий уровень - срочные меры:**")
         recommendations.append("• Обсудите нагрузку с руководителем")
         recommendations.append("• Рассмотрите возможность отпуска")
@@ -46,10 +63,14 @@ def get_maslach_recommendations(results: Dict[str, Any]) -> str:
     """Рекомендации по результатам теста Маслач для ИТ"""
     interpretation = results.get('interpretation', {})
     
-    ee_level = interpretation.get('EE', {}).get('level', 'низкий')
-    dp_level = interpretation.get('DP', {}).get('level', 'низкий')
-    pa_level = interpretation.get('PA', {}).get('level', 'низкий')
-    
+    return _maslach_recommendations(
+        interpretation.get('EE', {}).get('level', 'низкий'),
+        interpretation.get('DP', {}).get('level', 'низкий'),
+        interpretation.get('PA', {}).get('level', 'низкий')
+    )
+
+@lru_cache(maxsize=128)
+def _maslach_recommendations(ee_level: str, dp_level: str, pa_level: str) -> str:
     recommendations = []
     
     # Рекомендации по эмоциональному истощению (EE)
@@ -96,9 +117,10 @@ def get_maslach_recommendations(results: Dict[str, Any]) -> str:
 
 def get_heck_hess_recommendations(results: Dict[str, Any]) -> str:
     """Рекомендации по результатам теста Хека-Хесса для ИТ"""
-    total_score = results.get('total_score', 0)
-    burnout_risk = results.get('burnout_risk', 'низкий')
-    
+    return _heck_hess_recommendations(results.get('burnout_risk', 'низкий'), results.get('total_score', 0) > 12)
+
+@lru_cache(maxsize=128)
+def _heck_hess_recommendations(burnout_risk: str, it_specific: bool) -> str:
     recommendations = []
     
     if burnout_risk == 'низкий':
@@ -122,7 +144,7 @@ def get_heck_hess_recommendations(results: Dict[str, Any]) -> str:
         recommendations.append("• Обсудите смену роли или проекта")
     
     # Специфичные для ИТ рекомендации
-    if total_score > 12:
+    if it_specific:
         recommendations.append("\n💻 **Для ИТ-специалистов:**")
         recommendations.append("• Установите 'цифровой детокс' на выходных")
         recommendations.append("• Используйте техники тайм-менеджмента (Pomodoro)")
@@ -133,9 +155,10 @@ def get_heck_hess_recommendations(results: Dict[str, Any]) -> str:
 
 def get_quick_test_recommendations(scores: Dict[str, Any]) -> str:
     """Рекомендации по результатам быстрого теста для ИТ"""
-    level = scores.get('level', 'низкий')
-    total = scores.get('total', 0)
-    
+    return _quick_test_recommendations(scores.get('level', 'низкий'), scores.get('total', 0) > 15)
+
+@lru_cache(maxsize=128)
+def _quick_test_recommendations(level: str, it_specific: bool) -> str:
     recommendations = []
     
     if level == 'низкий':
@@ -160,7 +183,7 @@ def get_quick_test_recommendations(scores: Dict[str, Any]) -> str:
         recommendations.append("• Обсудите смену роли или проекта")
     
     # Специфичные для ИТ
-    if total > 15:
+    if it_specific:
         recommendations.append("\n💡 **Для ИТ-специалистов:**")
         recommendations.append("• Практикуйте правило 20-20-20 для глаз")
         recommendations.append("• Используйте эргономичную мебель")
@@ -169,74 +192,112 @@ def get_quick_test_recommendations(scores: Dict[str, Any]) -> str:
     
     return "\n".join(recommendations)
 
+# Общие списки не зависят от результата и собираются один раз
+GENERAL_IT_RECOMMENDATIONS = (
+    "💻 **Для разработчиков:**",
+    "• Используйте автоформатеры и линтеры для снижения когнитивной нагрузки",
+    "• Практикуйте парное программирование для снижения стресса",
+    "• Участвуйте в open-source проектах для мотивации",
+    "",
+    "🔄 **Процессные рекомендации:**",
+    "• Внедрите CI/CD для уменьшения стресса от деплоев",
+    "• Используйте agile-методологии с разумными спринтами",
+    "• Проводите регулярные ретроспективы",
+    "",
+    "🏃 **Физическое здоровье:**",
+    "• Используйте эргономичную мебель и оборудование",
+    "• Делайте упражнения для глаз и осанки",
+    "• Практикуйте регулярные физические активности",
+    "",
+    "🧘 **Ментальное здоровье:**",
+    "• Установите границы между работой и личной жизнью",
+    "• Практикуйте медитацию и mindfulness",
+    "• Обращайтесь за помощью при необходимости"
+)
+
 def get_general_it_recommendations() -> List[str]:
     """Общие рекомендации для ИТ-специалистов"""
-    return [
-        "💻 **Для разработчиков:**",
-        "• Используйте автоформатеры и линтеры для снижения когнитивной нагрузки",
-        "• Практикуйте парное программирование для снижения стресса",
-        "• Участвуйте в open-source проектах для мотивации",
-        "",
-        "🔄 **Процессные рекомендации:**",
-        "• Внедрите CI/CD для уменьшения стресса от деплоев",
-        "• Используйте agile-методологии с разумными спринтами",
-        "• Проводите регулярные ретроспективы",
-        "",
-        "🏃 **Физическое здоровье:**",
-        "• Используйте эргономичную мебель и оборудование",
-        "• Делайте упражнения для глаз и осанки",
-        "• Практикуйте регулярные физические активности",
-        "",
-        "🧘 **Ментальное здоровье:**",
-        "• Установите границы между работой и личной жизнью",
-        "• Практикуйте медитацию и mindfulness",
-        "• Обращайтесь за помощью при необходимости"
-    ]
+    return list(GENERAL_IT_RECOMMENDATIONS)
 # services/recommendations.py - добавьте эту функцию
 
+GENERAL_PREVENTION_TIPS = (
+    "🔧 **Технические советы:**",
+    "• Автоматизируйте рутинные задачи (CI/CD, деплой, тестирование)",
+    "• Используйте линтеры и автоформатеры для снижения когнитивной нагрузки",
+    "• Внедрите систему контроля версий и код-ревью",
+    "• Создайте удобное рабочее окружение (IDE, терминал, инструменты)",
+    "",
+    "⏰ **Тайм-менеджмент:**",
+    "• Практикуйте технику Pomodoro (25 минут работы, 5 минут отдыха)",
+    "• Планируйте задачи на день/неделю",
+    "• Устанавливайте реалистичные дедлайны",
+    "• Используйте Time blocking для фокусировки",
+    "",
+    "💻 **Рабочие процессы:**",
+    "• Регулярно делайте перерывы от экрана (правило 20-20-20)",
+    "• Создайте эргономичное рабочее место",
+    "• Используйте темные темы для IDE и приложений",
+    "• Настройте мониторы для комфортной работы",
+    "",
+    "🧠 **Ментальное здоровье:**",
+    "• Установите границы между работой и личной жизнью",
+    "• Практикуйте медитацию и mindfulness",
+    "• Регулярно занимайтесь спортом",
+    "• Спите 7-8 часов в сутки",
+    "",
+    "👥 **Социальные аспекты:**",
+    "• Участвуйте в командных активностях",
+    "• Находите ментора или становитесь ментором",
+    "• Участвуйте в ИТ-сообществах и конференциях",
+    "• Обсуждайте проблемы с коллегами и руководством",
+    "",
+    "🎯 **Профессиональное развитие:**",
+    "• Регулярно изучайте новые технологии",
+    "• Работайте над пет-проектами для вдохновения",
+    "• Читайте профессиональную литературу",
+    "• Посещайте курсы и воркшопы",
+    "",
+    "⚡ **Быстрые советы на каждый день:**",
+    "1. Начинайте день с самого сложного задачи",
+    "2. Делайте короткие перерывы каждые 45-60 минут",
+    "3. Пейте достаточно воды",
+    "4. Проветривайте помещение",
+    "5. Заканчивайте рабочий день в одно и то же время"
+)
+
 def get_general_prevention_tips() -> List[str]:
     """Общие советы по профилактике выгорания для ИТ-специалистов"""
-    return [
-        "🔧 **Технические советы:**",
-        "• Автоматизируйте рутинные задачи (CI/CD, деплой, тестирование)",
-        "• Используйте линтеры и автоформатеры для снижения когнитивной нагрузки",
-        "• Внедрите систему контроля версий и код-ревью",
-        "• Создайте удобное рабочее окружение (IDE, терминал, инструменты)",
-        "",
-        "⏰ **Тайм-менеджмент:**",
-        "• Практикуйте технику Pomodoro (25 минут работы, 5 минут отдыха)",
-        "• Планируйте задачи на день/неделю",
-        "• Устанавливайте реалистичные дедлайны",
-        "• Используйте Time blocking для фокусировки",
-        "",
-        "💻 **Рабочие процессы:**",
-        "• Регулярно делайте перерывы от экрана (правило 20-20-20)",
-        "• Создайте эргономичное рабочее место",
-        "• Используйте темные темы для IDE и приложений",
-        "• Настройте мониторы для комфортной работы",
-        "",
-        "🧠 **Ментальное здоровье:**",
-        "• Установите границы между работой и личной жизнью",
-        "• Практикуйте медитацию и mindfulness",
-        "• Регулярно занимайтесь спортом",
-        "• Спите 7-8 часов в сутки",
-        "",
-        "👥 **Социальные аспекты:**",
-        "• Участвуйте в командных активностях",
-        "• Находите ментора или становитесь ментором",
-        "• Участвуйте в ИТ-сообществах и конференциях",
-        "• Обсуждайте проблемы с коллегами и руководством",
-        "",
-        "🎯 **Профессиональное развитие:**",
-        "• Регулярно изучайте новые технологии",
-        "• Работайте над пет-проектами для вдохновения",
-        "• Читайте профессиональную литературу",
-        "• Посещайте курсы и воркшопы",
-        "",
-        "⚡ **Быстрые советы на каждый день:**",
-        "1. Начинайте день с самого сложного задачи",
-        "2. Делайте короткие перерывы каждые 45-60 минут",
-        "3. Пейте достаточно воды",
-        "4. Проветривайте помещение",
-        "5. Заканчивайте рабочий день в одно и то же время"
-    ]
\ No newline at end of file
+    return list(GENERAL_PREVENTION_TIPS)
+
+@lru_cache(maxsize=128)
+def get_general_prevention_text(limit: int) -> str:
+    """Первые limit советов по профилактике одним текстом"""
+    return "\n".join(GENERAL_PREVENTION_TIPS[:limit])
+
+# Кэшируемые функции по именам для статистики и метрик
+_CACHED = {
+    'boyko': _boyko_recommendations,
+    'maslach': _maslach_recommendations,
+    'heck_hess': _heck_hess_recommendations,
+    'quick': _quick_test_recommendations,
+    'prevention_tips': get_general_prevention_text,
+}
+
+def recommendation_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Попадания, промахи и размер кэша по каждой функции рекомендаций"""
+    stats = {}
+    for name, func in _CACHED.items():
+        info = func.cache_info()
+        stats[name] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+    return stats
+
+if metrics_config.enabled:
+    from services.metrics import metrics
+    metrics.registry.collected(
+        "bot_recommendation_cache_total", "Обращения к кэшу рекомендаций", ["function", "result"], "counter",
+        lambda: {
+            (name, result): stats[key]
+            for name, stats in recommendation_cache_stats().items()
+            for result, key in (("hit", 'hits'), ("miss", 'misses'))
+        }
+    )
\ No newline at end of file
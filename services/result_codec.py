@@ -0,0 +1,107 @@
+# services/result_codec.py
+import base64
+import json
+import struct
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from models.answers import AnswerVector
+from models.questions import get_catalog
+from services.test_calculator import TestCalculator
+
+RESULT_VERSION = 1
+
+# Заголовок упакованной записи: версия формата, код теста, число ответов.
+# Дальше идут байты ответов (AnswerVector) и баллы шкал, по uint16 на шкалу.
+_HEADER = struct.Struct('<BBB')
+
+@dataclass(frozen=True)
+class ResultSchema:
+    """Какие баллы теста хранятся и как из них строится результат для показа"""
+    test_type: str
+    code: int  # код теста в заголовке записи, после выпуска не меняется
+    scores_of: Callable[[Dict], Dict[str, int]]  # сохраняемый результат -> баллы шкал
+    interpret: Callable[[Dict[str, int]], Dict]  # баллы шкал -> результат без test_type и timestamp
+    scales: Tuple[str, ...] = field(init=False)
+    layout: struct.Struct = field(init=False)
+    
+    def __post_init__(self):
+        # Порядок шкал в записи - порядок шкал каталога
+        scales = get_catalog(self.test_type).scales
+        object.__setattr__(self, 'scales', scales)
+        object.__setattr__(self, 'layout', struct.Struct(f'<{len(scales)}H'))
+
+def _maslach(scores: Dict[str, int]) -> Dict:
+    result = TestCalculator.interpret_maslach(scores)
+    return {'scores': result['scores'], 'interpretation': result['interpretation']}
+
+def _boyko(phases: Dict[str, int]) -> Dict:
+    result = TestCalculator.interpret_boyko(phases)
+    return {'scores': result, 'phases': result['phases'], 'percentages': result['percentages']}
+
+def _heck_hess_scores(data: Dict) -> Dict[str, int]:
+    return {scale: value['score'] for scale, value in data['scores']['scales'].items()}
+
+RESULT_SCHEMAS: Dict[str, ResultSchema] = {
+    schema.test_type: schema for schema in (
+        ResultSchema('maslach', 1, lambda data: data['scores'], _maslach),
+        ResultSchema('quick', 2, lambda data: {'total': data['scores']['scores']['total']},
+                     lambda scores: {'scores': TestCalculator.interpret_quick(scores)}),
+        ResultSchema('boyko', 3, lambda data: data['phases'], _boyko),
+        ResultSchema('heck_hess', 4, _heck_hess_scores,
+                     lambda scales: {'scores': TestCalculator.interpret_heck_hess(scales)}),
+    )
+}
+_SCHEMAS_BY_CODE = {schema.code: schema for schema in RESULT_SCHEMAS.values()}
+
+def make_result(test_type: str, scores: Dict[str, int], answers: Optional[AnswerVector] = None) -> Dict:
+    """Результат теста из баллов шкал: так он сохраняется и так же восстанавливается при чтении"""
+    result = {'test_type': test_type}
+    result.update(RESULT_SCHEMAS[test_type].interpret(scores))
+    if answers is not None:
+        result['answers'] = answers.to_bytes()
+    return result
+
+def pack_result(test_data: Dict) -> bytes:
+    """Компактная запись результата (timestamp хранится отдельно)"""
+    schema = RESULT_SCHEMAS.get(test_data.get('test_type'))
+    if schema is None:
+        # Тест без схемы сохраняется целиком в JSON
+        rest = {key: value for key, value in test_data.items() if key != 'timestamp'}
+        return json.dumps(rest, ensure_ascii=False, separators=(',', ':')).encode()
+    answers = bytes(test_data.get('answers', b''))
+    scores = schema.scores_of(test_data)
+    return (
+        _HEADER.pack(RESULT_VERSION, schema.code, len(answers))
+        + answers
+        + schema.layout.pack(*(scores[scale] for scale in schema.scales))
+    )
+
+def unpack_result(payload: bytes, timestamp: Optional[str] = None) -> Dict:
+    """Полный результат из записи: интерпретация строится по каталогу и порогам"""
+    if payload[:1] == b'{':
+        # JSON: тест без схемы или запись, сохраненная до упакованного формата
+        result = json.loads(payload)
+    else:
+        version, code, count = _HEADER.unpack_from(payload)
+        if version != RESULT_VERSION:
+            raise ValueError(f"Неизвестная версия записи результата: {version}")
+        schema = _SCHEMAS_BY_CODE[code]
+        values = schema.layout.unpack_from(payload, _HEADER.size + count)
+        result = make_result(schema.test_type, dict(zip(schema.scales, values)))
+        if count:
+            result['answers'] = payload[_HEADER.size:_HEADER.size + count]
+    if timestamp is not None:
+        result['timestamp'] = timestamp
+    return result
+
+def result_to_text(payload: bytes) -> str:
+    """Запись для текстовой колонки БД: JSON как есть, упакованная - в base64"""
+    if payload[:1] == b'{':
+        return payload.decode()
+    return base64.b64encode(payload).decode('ascii')
+
+def result_from_text(text: str) -> bytes:
+    if text.startswith('{'):
+        return text.encode()
+    return base64.b64decode(text)
\ No newline at end of file
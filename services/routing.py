@@ -0,0 +1,83 @@
+# services/routing.py
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Union
+
+from aiogram import Router, types
+from aiogram.dispatcher.event.handler import CallableObject
+from aiogram.fsm.state import State
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """Хендлер маршрута и состояние FSM, в котором он активен (None - в любом)"""
+    handler: CallableObject
+    state: Optional[str] = None
+    
+    def accepts(self, raw_state: Optional[str]) -> bool:
+        return self.state is None or self.state == raw_state
+
+def _state_name(state: Union[str, State, None]) -> Optional[str]:
+    return state.state if isinstance(state, State) else state
+
+class RoutingTable:
+    """Маршрутизация по точному тексту кнопки меню и префиксу callback_data"""
+    
+    # Вместо цепочки lambda-фильтров, которые aiogram проверяет по очереди для
+    # каждого апдейта, в диспетчере стоит по одному хендлеру на тип события,
+    # а нужный обработчик находится одним поиском в словаре.
+    
+    def __init__(self, separator: str = "_"):
+        self.separator = separator
+        self._messages: Dict[str, Route] = {}
+        self._callbacks: Dict[str, Route] = {}
+    
+    def _add(self, table: Dict[str, Route], key: str, handler: Callable, state: Union[str, State, None]) -> None:
+        if key in table:
+            raise ValueError(f"Маршрут уже зарегистрирован: {key!r}")
+        table[key] = Route(CallableObject(handler), _state_name(state))
+    
+    def message(self, text: str, state: Union[str, State, None] = None) -> Callable:
+        """Регистрация хендлера сообщения с точным текстом (кнопки меню)"""
+        def decorator(handler: Callable) -> Callable:
+            self._add(self._messages, text, handler, state)
+            return handler
+        return decorator
+    
+    def callback(self, prefix: str, state: Union[str, State, None] = None) -> Callable:
+        """Регистрация хендлера callback_data вида "<префикс><separator>..." """
+        if not prefix.endswith(self.separator):
+            raise ValueError(f"Префикс должен заканчиваться на {self.separator!r}: {prefix!r}")
+        
+        def decorator(handler: Callable) -> Callable:
+            self._add(self._callbacks, prefix, handler, state)
+            return handler
+        return decorator
+    
+    def resolve_message(self, text: Optional[str]) -> Optional[Route]:
+        return self._messages.get(text) if text else None
+    
+    def resolve_callback(self, data: Optional[str]) -> Optional[Route]:
+        if not data:
+            return None
+        head, separator, _ = data.partition(self.separator)
+        return self._callbacks.get(head + separator) if separator else None
+    
+    def _match_message(self, message: types.Message, raw_state: Optional[str] = None) -> Union[bool, Dict[str, Any]]:
+        route = self.resolve_message(message.text)
+        if route is None or not route.accepts(raw_state):
+            return False
+        return {'route': route}
+    
+    def _match_callback(self, callback: types.CallbackQuery, raw_state: Optional[str] = None) -> Union[bool, Dict[str, Any]]:
+        route = self.resolve_callback(callback.data)
+        if route is None or not route.accepts(raw_state):
+            return False
+        return {'route': route}
+    
+    @staticmethod
+    async def _dispatch(event: types.TelegramObject, route: Route, **data: Any) -> Any:
+        return await route.handler.call(event, **data)
+    
+    def install(self, router: Router) -> None:
+        """Один хендлер на сообщения и один на callback-запросы"""
+        router.message.register(self._dispatch, self._match_message)
+        router.callback_query.register(self._dispatch, self._match_callback)
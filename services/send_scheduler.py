@@ -0,0 +1,229 @@
+# services/send_scheduler.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from aiogram import Bot, methods
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+
+from config import RateLimitConfig
+
+logger = logging.getLogger(__name__)
+
+class Lane(IntEnum):
+    """Полосы приоритета: меньше значение - раньше получает токен"""
+    INTERACTIVE = 0  # ответы на нажатия и смена вопроса
+    DEFAULT = 1
+    BULK = 2  # массовые и фоновые отправки
+
+# Методы, которые не расходуют лимиты отправки сообщений
+UNLIMITED_METHODS = (
+    methods.GetUpdates,
+    methods.GetMe,
+    methods.SetWebhook,
+    methods.DeleteWebhook,
+    methods.GetWebhookInfo,
+)
+
+# Лимит Telegram на чат - про отправку новых сообщений: правки и ответы на нажатия
+# ведро чата не расходуют (только общее), пока Telegram не ответит на них 429
+INTERACTIVE_METHODS = (
+    methods.AnswerCallbackQuery,
+    methods.EditMessageText,
+    methods.EditMessageReplyMarkup,
+)
+
+_lane: ContextVar[Optional[Lane]] = ContextVar("send_lane", default=None)
+
+@contextmanager
+def send_lane(lane: Lane) -> Iterator[None]:
+    """Все запросы внутри блока идут в указанной полосе (например, BULK для рассылок)"""
+    token = _lane.set(lane)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+class TokenBucket:
+    """Ведро токенов с очередью ожидающих по приоритету"""
+    
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+    
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    @property
+    def idle(self) -> bool:
+        """Ведро полное и никто не ждет - его можно удалить без потери лимита"""
+        now = self._clock()
+        self._refill(now)
+        return not self._waiters and self._tokens >= self.capacity and now >= self._blocked_until
+    
+    def resize(self, rate: float, capacity: float) -> None:
+        """Новые скорость и емкость; накопленные токены не больше новой емкости"""
+        self._refill(self._clock())
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = min(self._tokens, capacity)
+    
+    async def acquire(self, priority: int = Lane.DEFAULT) -> None:
+        now = self._clock()
+        self._refill(now)
+        if not self._waiters and self._tokens >= 1 and now >= self._blocked_until:
+            self._tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._schedule()
+        await future
+    
+    def block(self, seconds: float) -> None:
+        """Пауза после 429 от Telegram: токены не выдаются seconds секунд"""
+        now = self._clock()
+        self._blocked_until = max(self._blocked_until, now + seconds)
+        self._tokens = 0
+        self._updated = now
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        self._schedule()
+    
+    def _schedule(self) -> None:
+        if self._wakeup is not None or not self._waiters:
+            return
+        now = self._clock()
+        delay = max((1 - self._tokens) / self.rate, self._blocked_until - now, 0)
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._release)
+    
+    def _release(self) -> None:
+        self._wakeup = None
+        now = self._clock()
+        self._refill(now)
+        while self._waiters and self._tokens >= 1 and now >= self._blocked_until:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+class SendScheduler(BaseRequestMiddleware):
+    """Планировщик исходящих запросов к Bot API: лимиты на чат и общий, повтор после 429"""
+    
+    # Подключается как middleware сессии бота, поэтому через него проходят
+    # все message.answer/edit_text/callback.answer без изменений в хендлерах.
+    
+    def __init__(
+        self,
+        global_rate: float = 25.0,
+        global_burst: float = 5.0,
+        chat_rate: float = 1.0,
+        chat_burst: float = 3.0,
+        group_rate: float = 20 / 60,
+        max_retries: int = 3,
+        workers: int = 1,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self._clock = clock
+        self._global_rate = global_rate
+        self._global_burst = global_burst
+        self._global = TokenBucket(global_rate, global_burst, clock)
+        self.set_workers(workers)
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._group_rate = group_rate
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._max_retries = max_retries
+        self.sent = 0
+        self.retries = 0
+        self.queued = 0
+    
+    @classmethod
+    def from_config(cls, config: RateLimitConfig, workers: int = 1) -> "SendScheduler":
+        return cls(
+            global_rate=config.global_rate,
+            global_burst=config.global_burst,
+            chat_rate=config.chat_rate,
+            chat_burst=config.chat_burst,
+            group_rate=config.group_rate,
+            max_retries=config.max_retries,
+            workers=workers
+        )
+    
+    def set_workers(self, workers: int) -> None:
+        """Общий лимит бота делится поровну между workers процессами шардирования"""
+        # Ведро процесса не видит отправок соседних воркеров, поэтому каждому - своя доля.
+        # Ведро меньше одного токена не выдало бы ни одного
+        self._global.resize(self._global_rate / workers, max(1.0, self._global_burst / workers))
+    
+    @staticmethod
+    def lane_for(method: methods.TelegramMethod) -> Optional[Lane]:
+        """Полоса запроса или None, если запрос не ограничивается"""
+        if isinstance(method, UNLIMITED_METHODS):
+            return None
+        lane = _lane.get()
+        if lane is not None:
+            return lane
+        if isinstance(method, INTERACTIVE_METHODS):
+            return Lane.INTERACTIVE
+        return Lane.DEFAULT
+    
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= 10000:
+                # Полные ведра неактивных чатов ничего не ограничивают
+                self._chats = {key: value for key, value in self._chats.items() if not value.idle}
+            # В группах Telegram разрешает около 20 сообщений в минуту
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            bucket = TokenBucket(self._group_rate if is_group else self._chat_rate, self._chat_burst, self._clock)
+            self._chats[chat_id] = bucket
+        return bucket
+    
+    async def __call__(self, make_request: NextRequestMiddlewareType, bot: Bot, method: methods.TelegramMethod) -> Any:
+        lane = self.lane_for(method)
+        if lane is None:
+            return await make_request(bot, method)
+        
+        chat_id = getattr(method, "chat_id", None)
+        chat_bucket = self._chat_bucket(chat_id) if chat_id is not None else None
+        exempt = isinstance(method, INTERACTIVE_METHODS)
+        for attempt in range(self._max_retries + 1):
+            self.queued += 1
+            try:
+                if chat_bucket is not None and not (exempt and attempt == 0):
+                    await chat_bucket.acquire(lane)
+                await self._global.acquire(lane)
+            finally:
+                self.queued -= 1
+            try:
+                result = await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                if attempt == self._max_retries:
+                    raise
+                self.retries += 1
+                logger.warning("429 на %s, повтор через %s с", type(method).__name__, e.retry_after)
+                (chat_bucket or self._global).block(e.retry_after)
+                continue
+            self.sent += 1
+            return result
+    
+    def stats(self) -> Dict[str, int]:
+        return {'sent': self.sent, 'retries': self.retries, 'queued': self.queued, 'chats': len(self._chats)}
@@ -0,0 +1,82 @@
+# services/session.py
+from typing import Any, Optional
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import PRODUCTION, TelegramAPIServer
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiohttp import ClientTimeout, FormData
+
+from config import BotConfig
+from keyboards.registry import keyboards
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def orjson_dumps(value: Any) -> str:
+    return orjson.dumps(value).decode()
+
+class BotSession(AiohttpSession):
+    """Сессия Bot API, которая отправляет клавиатуры из реестра готовым JSON"""
+    
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: Optional[float] = 15.0,
+        dns_cache_ttl: Optional[int] = 3600,
+        connect_timeout: Optional[float] = None,
+        **kwargs: Any
+    ):
+        super().__init__(limit=limit, **kwargs)
+        self._connector_init["limit_per_host"] = limit_per_host
+        self._connector_init["ttl_dns_cache"] = dns_cache_ttl
+        if keepalive_timeout is None:
+            self._connector_init["force_close"] = True
+        else:
+            self._connector_init["keepalive_timeout"] = keepalive_timeout
+        self.connect_timeout = connect_timeout
+    
+    async def make_request(self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None) -> TelegramType:
+        if self.connect_timeout is not None:
+            # Отдельный предел на установку соединения, чтобы не ждать весь request_timeout
+            timeout = ClientTimeout(total=self.timeout if timeout is None else timeout, connect=self.connect_timeout)
+        return await super().make_request(bot, method, timeout)
+    
+    def build_form_data(self, bot: Bot, method: TelegramMethod) -> FormData:
+        markup_json = keyboards.serialized(getattr(method, "reply_markup", None))
+        if markup_json is None:
+            return super().build_form_data(bot, method)
+        
+        form = FormData(quote_fields=False)
+        files = {}
+        for key, value in method.model_dump(warnings=False, exclude={"reply_markup"}).items():
+            value = self.prepare_value(value, bot=bot, files=files)
+            if not value:
+                continue
+            form.add_field(key, value)
+        form.add_field("reply_markup", markup_json)
+        for key, value in files.items():
+            form.add_field(key, value.read(bot), filename=value.filename or key)
+        return form
+
+def create_bot_session(config: BotConfig, api: Optional[TelegramAPIServer] = None) -> BotSession:
+    """Сессия Bot API с пулом соединений и таймаутами из конфигурации"""
+    if api is None:
+        api = TelegramAPIServer.from_base(config.api_url) if config.api_url else PRODUCTION
+    json_kwargs = {}
+    if config.fast_json and orjson is not None:
+        json_kwargs = {'json_loads': orjson.loads, 'json_dumps': orjson_dumps}
+    return BotSession(
+        api=api,
+        limit=config.pool_limit,
+        limit_per_host=config.pool_limit_per_host,
+        keepalive_timeout=config.keepalive_timeout,
+        dns_cache_ttl=config.dns_cache_ttl,
+        connect_timeout=config.connect_timeout,
+        timeout=config.request_timeout,
+        **json_kwargs
+    )
\ No newline at end of file
@@ -0,0 +1,303 @@
+# services/sharding.py
+import asyncio
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+
+from config import ShardingConfig, WebhookConfig
+
+logger = logging.getLogger(__name__)
+
+# Счетчики воркера в общей памяти: каждый воркер пишет только в свои ячейки
+METRIC_FIELDS = ('processed', 'failed', 'busy_ms')
+STOP = None
+
+def update_chat_id(update: Mapping[str, Any]) -> int:
+    """chat_id апдейта (для апдейтов без чата - id пользователя, иначе 0)"""
+    for key, event in update.items():
+        if key == 'update_id' or not isinstance(event, dict):
+            continue
+        chat = event.get('chat') or (event.get('message') or {}).get('chat')
+        if chat:
+            return chat['id']
+        user = event.get('from') or event.get('user')
+        if user:
+            return user['id']
+    return 0
+
+def shard_for(update: Mapping[str, Any], shards: int) -> int:
+    """Номер воркера: все апдейты одного чата попадают в один процесс"""
+    return update_chat_id(update) % shards
+
+def run_worker(
+    shard: int,
+    workers: int,
+    updates: "multiprocessing.Queue",
+    counters: Any,
+    worker_init: Optional[Callable[[], None]],
+    max_concurrent: int
+) -> None:
+    """Точка входа процесса-воркера"""
+    # Остановкой управляет супервизор через STOP в очереди
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if worker_init is not None:
+        worker_init()
+    asyncio.run(_worker_loop(shard, workers, updates, counters, max_concurrent))
+
+async def _worker_loop(shard: int, workers: int, updates: "multiprocessing.Queue", counters: Any, max_concurrent: int) -> None:
+    import main  # noqa: F401 - регистрирует хендлеры в диспетчере
+    from bot_setup import bot, dp, scheduler
+    from config import metrics_config
+    from services.metrics import metrics, start_metrics_server
+    from services.storage import storage
+    
+    # Лимит Telegram - на бота целиком, а у каждого воркера свое ведро
+    if scheduler is not None:
+        scheduler.set_workers(workers)
+    
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(max_concurrent)
+    tasks = set()
+    base = shard * len(METRIC_FIELDS)
+    
+    async def handle(update: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        try:
+            await dp.feed_raw_update(bot, update)
+            counters[base] += 1
+        except Exception:
+            counters[base + 1] += 1
+            logger.exception("Воркер %s: ошибка обработки апдейта %s", shard, update.get('update_id'))
+        finally:
+            counters[base + 2] += int((time.perf_counter() - started) * 1000)
+            slots.release()
+    
+    # У каждого воркера свои метрики на отдельном порту
+    metrics_runner = None
+    if metrics_config.enabled:
+        try:
+            metrics_runner = await start_metrics_server(metrics, metrics_config, port=metrics_config.port + 1 + shard)
+        except OSError as e:
+            logger.warning("Воркер %s: эндпоинт метрик не запущен: %s", shard, e)
+    
+    logger.info("Воркер %s запущен", shard)
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        while True:
+            update = await loop.run_in_executor(reader, updates.get)
+            if update is STOP:
+                break
+            await slots.acquire()
+            task = asyncio.create_task(handle(update))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    
+    # Плавная остановка: дообработать начатое и сбросить отложенные записи
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    await storage.close()
+    await dp.storage.close()
+    await bot.session.close()
+    if metrics_runner is not None:
+        await metrics_runner.cleanup()
+    logger.info("Воркер %s остановлен", shard)
+
+class ShardSupervisor:
+    """Запускает N процессов-воркеров и раздает им апдейты по хешу chat_id"""
+    
+    # Очереди принадлежат супервизору и переживают перезапуск воркера:
+    # апдейты, пришедшие во время рестарта, дождутся нового процесса.
+    
+    def __init__(
+        self,
+        workers: int,
+        worker_init: Optional[Callable[[], None]] = None,
+        max_concurrent: int = 100,
+        queue_size: int = 10000,
+        restart_timeout: float = 30.0
+    ):
+        if workers < 1:
+            raise ValueError("Нужен хотя бы один воркер")
+        self._ctx = multiprocessing.get_context("spawn")
+        self.workers = workers
+        self._worker_init = worker_init
+        self._max_concurrent = max_concurrent
+        self._restart_timeout = restart_timeout
+        self._queues = [self._ctx.Queue(queue_size) for _ in range(workers)]
+        self._counters = self._ctx.Array('q', workers * len(METRIC_FIELDS), lock=False)
+        self._processes: List[Optional[multiprocessing.Process]] = [None] * workers
+        self._restarts = [0] * workers
+        self._restarting = set()
+        self._stopping = False
+    
+    @classmethod
+    def from_config(cls, config: ShardingConfig, worker_init: Optional[Callable[[], None]] = None) -> "ShardSupervisor":
+        return cls(
+            config.workers,
+            worker_init=worker_init,
+            max_concurrent=config.max_concurrent,
+            queue_size=config.queue_size,
+            restart_timeout=config.restart_timeout
+        )
+    
+    def _spawn(self, shard: int) -> None:
+        process = self._ctx.Process(
+            target=run_worker,
+            args=(shard, self.workers, self._queues[shard], self._counters, self._worker_init, self._max_concurrent),
+            name=f"bot-worker-{shard}"
+        )
+        process.start()
+        self._processes[shard] = process
+    
+    def start(self) -> None:
+        for shard in range(self.workers):
+            self._spawn(shard)
+    
+    async def dispatch(self, update: Dict[str, Any]) -> int:
+        """Передача апдейта воркеру его чата (ждет, если очередь воркера заполнена)"""
+        shard = shard_for(update, self.workers)
+        try:
+            self._queues[shard].put_nowait(update)
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, self._queues[shard].put, update)
+        return shard
+    
+    async def _stop_worker(self, shard: int) -> None:
+        process = self._processes[shard]
+        if process is None:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._queues[shard].put, STOP)
+        await loop.run_in_executor(None, process.join, self._restart_timeout)
+        if process.is_alive():
+            logger.warning("Воркер %s не остановился за %s с, завершаем принудительно", shard, self._restart_timeout)
+            process.terminate()
+            process.join()
+        self._processes[shard] = None
+    
+    async def restart(self, shard: int) -> None:
+        """Плавный перезапуск воркера: начатые апдейты дообрабатываются, новые ждут в очереди"""
+        self._restarting.add(shard)
+        try:
+            await self._stop_worker(shard)
+            self._spawn(shard)
+            self._restarts[shard] += 1
+        finally:
+            self._restarting.discard(shard)
+    
+    async def rolling_restart(self) -> None:
+        """Поочередный перезапуск всех воркеров (остальные продолжают работать)"""
+        for shard in range(self.workers):
+            await self.restart(shard)
+        logger.info("Все воркеры перезапущены")
+    
+    async def stop(self) -> None:
+        self._stopping = True
+        await asyncio.gather(*(self._stop_worker(shard) for shard in range(self.workers)))
+    
+    async def monitor(self, interval: float = 1.0, metrics_interval: Optional[float] = None) -> None:
+        """Поднимает упавшие воркеры и периодически пишет метрики в лог"""
+        last_report = time.monotonic()
+        while not self._stopping:
+            for shard, process in enumerate(self._processes):
+                if shard in self._restarting or process is None or process.is_alive():
+                    continue
+                logger.error("Воркер %s завершился с кодом %s, перезапуск", shard, process.exitcode)
+                self._spawn(shard)
+                self._restarts[shard] += 1
+            if metrics_interval and time.monotonic() - last_report >= metrics_interval:
+                last_report = time.monotonic()
+                for worker in self.stats():
+                    logger.info("Метрики воркера: %s", worker)
+            await asyncio.sleep(interval)
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        """Метрики по воркерам"""
+        result = []
+        for shard, process in enumerate(self._processes):
+            base = shard * len(METRIC_FIELDS)
+            worker = {
+                'shard': shard,
+                'pid': process.pid if process else None,
+                'alive': bool(process and process.is_alive()),
+                'restarts': self._restarts[shard],
+                'queued': self._queues[shard].qsize(),
+            }
+            for offset, field in enumerate(METRIC_FIELDS):
+                worker[field] = self._counters[base + offset]
+            result.append(worker)
+        return result
+    
+    @property
+    def processed(self) -> int:
+        return sum(self._counters[shard * len(METRIC_FIELDS)] for shard in range(self.workers))
+
+class ShardedRequestHandler(SimpleRequestHandler):
+    """Вебхук супервизора: апдейт сразу уходит в очередь воркера"""
+    
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, supervisor: ShardSupervisor, secret_token: Optional[str] = None):
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token)
+        self.supervisor = supervisor
+    
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        try:
+            update = await request.json(loads=bot.session.json_loads)
+        except ValueError:
+            return web.Response(body="Bad Request", status=400)
+        await self.supervisor.dispatch(update)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {'workers': self.supervisor.stats()}
+
+async def poll_updates(supervisor: ShardSupervisor, dispatcher: Dispatcher, bot: Bot, timeout: int = 30) -> None:
+    """Long polling в супервизоре с раздачей апдейтов воркерам"""
+    offset = None
+    allowed_updates = dispatcher.resolve_used_update_types()
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=timeout, allowed_updates=allowed_updates)
+        except Exception:
+            logger.exception("Ошибка получения апдейтов")
+            await asyncio.sleep(1)
+            continue
+        for update in updates:
+            await supervisor.dispatch(update.model_dump(mode="json", by_alias=True, exclude_none=True))
+            offset = update.update_id + 1
+
+async def run_sharded(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    config: ShardingConfig,
+    webhook: WebhookConfig
+) -> None:
+    """Режим супервизора: прием апдейтов здесь, обработка в процессах-воркерах"""
+    from services.webhook import run_webhook
+    
+    supervisor = ShardSupervisor.from_config(config)
+    supervisor.start()
+    loop = asyncio.get_running_loop()
+    # SIGHUP - поочередный перезапуск воркеров без остановки приема апдейтов
+    loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(supervisor.rolling_restart()))
+    monitor = asyncio.create_task(supervisor.monitor(metrics_interval=config.metrics_interval))
+    try:
+        if webhook.enabled:
+            handler = ShardedRequestHandler(dispatcher, bot, supervisor, secret_token=webhook.secret)
+            await run_webhook(dispatcher, bot, webhook, handler=handler)
+        else:
+            await poll_updates(supervisor, dispatcher, bot)
+    finally:
+        loop.remove_signal_handler(signal.SIGHUP)
+        monitor.cancel()
+        await supervisor.stop()
@@ -0,0 +1,377 @@
+# services/sql_storage.py
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from queue import Queue, Empty
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from config import DatabaseConfig
+from models.history import HistoryPage, parse_history_cursor
+from services.result_codec import pack_result, result_from_text, result_to_text, unpack_result
+from services.statistics import UserStatistics
+from services.storage import IStorage
+
+try:
+    import psycopg
+except ImportError:
+    psycopg = None
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+class SQLiteDialect:
+    """Диалект SQLite (локальный файл вместо PostgreSQL)"""
+    name = "sqlite"
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS test_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id BIGINT NOT NULL,
+            test_type TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            data TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_test_results_chat_ts ON test_results (chat_id, timestamp)",
+        "CREATE TABLE IF NOT EXISTS user_statistics (chat_id BIGINT PRIMARY KEY, data TEXT NOT NULL)",
+    )
+    # SQLite блокирует базу на запись целиком, отдельная блокировка строки не нужна
+    LOCK_ROW = ""
+    # Ошибки, после которых соединение не возвращается в пул
+    CONNECTION_ERRORS = (sqlite3.InterfaceError, sqlite3.OperationalError)
+    
+    def __init__(self, path: str):
+        self.path = path
+    
+    def connect(self) -> Any:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Скомпилированные запросы кэшируются соединением (prepared statements)
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+    
+    def sql(self, query: str) -> str:
+        return query
+    
+    def execute(self, cursor: Any, query: str, params: tuple = ()) -> Any:
+        return cursor.execute(query, params)
+    
+    def executemany(self, cursor: Any, query: str, rows: List[tuple]) -> Any:
+        return cursor.executemany(query, rows)
+
+class PostgresDialect:
+    """Диалект PostgreSQL (драйвер psycopg 3)"""
+    name = "postgresql"
+    
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS test_results (
+            id BIGSERIAL PRIMARY KEY,
+            chat_id BIGINT NOT NULL,
+            test_type TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            data TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_test_results_chat_ts ON test_results (chat_id, timestamp)",
+        "CREATE TABLE IF NOT EXISTS user_statistics (chat_id BIGINT PRIMARY KEY, data TEXT NOT NULL)",
+    )
+    LOCK_ROW = " FOR UPDATE"
+    # Обрыв соединения, перезапуск сервера
+    CONNECTION_ERRORS = (psycopg.InterfaceError, psycopg.OperationalError) if psycopg else ()
+    
+    def __init__(self, dsn: str):
+        if psycopg is None:
+            raise RuntimeError("Для PostgreSQL установите пакет psycopg: pip install psycopg")
+        self.dsn = dsn
+    
+    def connect(self) -> Any:
+        return psycopg.connect(self.dsn)
+    
+    def sql(self, query: str) -> str:
+        return query.replace("?", "%s")
+    
+    def execute(self, cursor: Any, query: str, params: tuple = ()) -> Any:
+        # prepare=True - серверные prepared statements
+        return cursor.execute(query, params, prepare=True)
+    
+    def executemany(self, cursor: Any, query: str, rows: List[tuple]) -> Any:
+        return cursor.executemany(query, rows)
+
+class ConnectionPool:
+    """Пул DB-API соединений: запросы выполняются в потоках, event loop не блокируется"""
+    
+    def __init__(self, connect: Callable[[], Any], size: int = 5,
+                 connection_errors: Tuple[type, ...] = ()):
+        self._connect = connect
+        self._connection_errors = connection_errors
+        self._size = size
+        self._idle: Queue = Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="sql-pool")
+    
+    def _acquire(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except Empty:
+            pass
+        with self._lock:
+            if self._created < self._size:
+                # Слот занимается только удачным подключением: пока база недоступна,
+                # ошибки не исчерпывают пул
+                conn = self._connect()
+                self._created += 1
+                return conn
+        return self._idle.get()
+    
+    def _discard(self, conn: Any) -> None:
+        # Слот освобождается: следующий запрос откроет новое соединение
+        with self._lock:
+            self._created -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+    
+    def _rollback(self, conn: Any) -> bool:
+        try:
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.warning(f"Откат не удался, соединение закрыто: {e}")
+            return False
+    
+    def _run(self, func: Callable[[Any], T]) -> T:
+        conn = self._acquire()
+        healthy = False
+        try:
+            result = func(conn)
+            conn.commit()
+            healthy = True
+            return result
+        except self._connection_errors:
+            # Мертвое соединение не возвращается в пул
+            raise
+        except Exception:
+            healthy = self._rollback(conn)
+            raise
+        finally:
+            if healthy:
+                self._idle.put(conn)
+            else:
+                self._discard(conn)
+    
+    async def run(self, func: Callable[[Any], T]) -> T:
+        """Выполнение функции func(conn) в транзакции на свободном соединении"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, func)
+    
+    async def close(self) -> None:
+        await asyncio.to_thread(self._executor.shutdown, True)
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except Empty:
+                break
+
+class SQLStorage(IStorage):
+    """Постоянное хранилище результатов в SQL (PostgreSQL или SQLite)"""
+    
+    INSERT_RESULT = "INSERT INTO test_results (chat_id, test_type, timestamp, data) VALUES (?, ?, ?, ?)"
+    SELECT_HISTORY = (
+        "SELECT timestamp, data FROM test_results WHERE chat_id = ? "
+        "ORDER BY timestamp DESC, id DESC LIMIT ?"
+    )
+    # Страницы истории - keyset по (timestamp, id) в индексе (chat_id, timestamp), без OFFSET
+    SELECT_PAGE = (
+        "SELECT id, timestamp, data FROM test_results WHERE chat_id = ? "
+        "ORDER BY timestamp DESC, id DESC LIMIT ?"
+    )
+    SELECT_OLDER = (
+        "SELECT id, timestamp, data FROM test_results WHERE chat_id = ? AND (timestamp, id) < (?, ?) "
+        "ORDER BY timestamp DESC, id DESC LIMIT ?"
+    )
+    SELECT_NEWER = (
+        "SELECT id, timestamp, data FROM test_results WHERE chat_id = ? AND (timestamp, id) > (?, ?) "
+        "ORDER BY timestamp ASC, id ASC LIMIT ?"
+    )
+    # Выгрузка всех результатов пачками по первичному ключу
+    SELECT_EXPORT = "SELECT id, chat_id, timestamp, data FROM test_results WHERE id > ? ORDER BY id LIMIT ?"
+    SELECT_STATS = "SELECT data FROM user_statistics WHERE chat_id = ?"
+    # Строка агрегата создается до блокировки: FOR UPDATE по отсутствующей строке
+    # ничего не блокирует, и два первых сохранения чата затерли бы друг друга
+    CLAIM_STATS = "INSERT INTO user_statistics (chat_id, data) VALUES (?, ?) ON CONFLICT (chat_id) DO NOTHING"
+    UPSERT_STATS = (
+        "INSERT INTO user_statistics (chat_id, data) VALUES (?, ?) "
+        "ON CONFLICT (chat_id) DO UPDATE SET data = excluded.data"
+    )
+    
+    def __init__(self, dialect: Any, pool_size: int = 5):
+        self._dialect = dialect
+        self._pool = ConnectionPool(dialect.connect, size=pool_size, connection_errors=dialect.CONNECTION_ERRORS)
+        self._schema_ready = False
+        self._schema_lock = asyncio.Lock()
+    
+    @classmethod
+    def from_config(cls, config: DatabaseConfig) -> "SQLStorage":
+        """Создание хранилища по настройкам DatabaseConfig"""
+        if config.backend == "sqlite":
+            return cls(SQLiteDialect(config.sqlite_path), pool_size=config.pool_size)
+        if config.backend == "postgresql":
+            if config.dsn is None:
+                raise ValueError("Для PostgreSQL не заполнены параметры подключения")
+            return cls(PostgresDialect(config.dsn), pool_size=config.pool_size)
+        raise ValueError(f"Неизвестный тип хранилища: {config.backend}")
+    
+    async def _ensure_schema(self) -> None:
+        if self._schema_ready:
+            return
+        async with self._schema_lock:
+            if self._schema_ready:
+                return
+            
+            def create(conn: Any) -> None:
+                cursor = conn.cursor()
+                for statement in self._dialect.SCHEMA:
+                    cursor.execute(statement)
+            
+            await self._pool.run(create)
+            self._schema_ready = True
+    
+    def _update_statistics(self, cursor: Any, items: List[Tuple[int, Dict]]) -> None:
+        """Инкрементальное обновление агрегатов в той же транзакции, что и вставка"""
+        by_chat: Dict[int, List[Dict]] = {}
+        for chat_id, test_data in items:
+            by_chat.setdefault(chat_id, []).append(test_data)
+        
+        claim = self._dialect.sql(self.CLAIM_STATS)
+        select = self._dialect.sql(self.SELECT_STATS) + self._dialect.LOCK_ROW
+        upsert = self._dialect.sql(self.UPSERT_STATS)
+        empty = json.dumps(UserStatistics().to_state(), ensure_ascii=False)
+        for chat_id, results in by_chat.items():
+            self._dialect.execute(cursor, claim, (chat_id, empty))
+            row = self._dialect.execute(cursor, select, (chat_id,)).fetchone()
+            stats = UserStatistics.from_state(json.loads(row[0])) if row else UserStatistics()
+            for test_data in results:
+                stats.apply(test_data)
+            self._dialect.execute(cursor, upsert, (chat_id, json.dumps(stats.to_state(), ensure_ascii=False)))
+    
+    @staticmethod
+    def _to_row(chat_id: int, test_data: Dict) -> tuple:
+        test_data.setdefault('timestamp', datetime.now().isoformat())
+        return (
+            chat_id,
+            test_data.get('test_type', 'unknown'),
+            test_data['timestamp'],
+            result_to_text(pack_result(test_data)),
+        )
+    
+    async def save_test_result(self, chat_id: int, test_data: Dict) -> None:
+        """Сохранение результата теста"""
+        await self._ensure_schema()
+        row = self._to_row(chat_id, test_data)
+        query = self._dialect.sql(self.INSERT_RESULT)
+        
+        def insert(conn: Any) -> None:
+            cursor = conn.cursor()
+            self._dialect.execute(cursor, query, row)
+            self._update_statistics(cursor, [(chat_id, test_data)])
+        
+        await self._pool.run(insert)
+    
+    async def save_test_results(self, items: List[Tuple[int, Dict]]) -> None:
+        """Пакетное сохранение результатов одной транзакцией"""
+        await self._ensure_schema()
+        rows = [self._to_row(chat_id, test_data) for chat_id, test_data in items]
+        query = self._dialect.sql(self.INSERT_RESULT)
+        
+        def insert_many(conn: Any) -> None:
+            cursor = conn.cursor()
+            self._dialect.executemany(cursor, query, rows)
+            self._update_statistics(cursor, items)
+        
+        await self._pool.run(insert_many)
+    
+    async def get_user_history(self, chat_id: int, limit: int = 10) -> List[Dict]:
+        """Получение истории тестов (от старых к новым, как в MemoryStorage)"""
+        await self._ensure_schema()
+        query = self._dialect.sql(self.SELECT_HISTORY)
+        
+        def select(conn: Any) -> List[Dict]:
+            cursor = self._dialect.execute(conn.cursor(), query, (chat_id, limit))
+            return [unpack_result(result_from_text(data), timestamp) for timestamp, data in cursor.fetchall()]
+        
+        rows = await self._pool.run(select)
+        rows.reverse()
+        return rows
+    
+    async def get_history_page(
+        self,
+        chat_id: int,
+        limit: int,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> HistoryPage:
+        """Страница истории по курсору (на одну запись больше, чтобы знать про следующую)"""
+        await self._ensure_schema()
+        if after is not None:
+            query, params = self.SELECT_NEWER, (chat_id, *parse_history_cursor(after, newer=True), limit + 1)
+        elif before is not None:
+            query, params = self.SELECT_OLDER, (chat_id, *parse_history_cursor(before), limit + 1)
+        else:
+            query, params = self.SELECT_PAGE, (chat_id, limit + 1)
+        query = self._dialect.sql(query)
+        
+        def select(conn: Any) -> List[Tuple[int, Dict]]:
+            cursor = self._dialect.execute(conn.cursor(), query, params)
+            return [(key, unpack_result(result_from_text(data), timestamp)) for key, timestamp, data in cursor.fetchall()]
+        
+        rows = await self._pool.run(select)
+        return HistoryPage.from_window(rows, limit, before, after)
+    
+    async def get_statistics(self, chat_id: int) -> Optional[Dict]:
+        """Получение статистики (готовый агрегат, без пересчета истории)"""
+        state = await self.get_statistics_state(chat_id)
+        return UserStatistics.from_state(state).to_dict() if state is not None else None
+    
+    async def get_statistics_state(self, chat_id: int) -> Optional[Dict]:
+        await self._ensure_schema()
+        query = self._dialect.sql(self.SELECT_STATS)
+        
+        def select(conn: Any) -> Optional[Dict]:
+            row = self._dialect.execute(conn.cursor(), query, (chat_id,)).fetchone()
+            return json.loads(row[0]) if row else None
+        
+        return await self._pool.run(select)
+    
+    async def iter_results(self, after: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[Tuple[str, int, Dict]]:
+        """Все результаты по возрастанию id; в памяти одновременно одна пачка"""
+        await self._ensure_schema()
+        query = self._dialect.sql(self.SELECT_EXPORT)
+        last_id = int(after) if after is not None else 0
+        
+        while True:
+            def select(conn: Any, last_id: int = last_id) -> List[tuple]:
+                return self._dialect.execute(conn.cursor(), query, (last_id, batch_size)).fetchall()
+            
+            rows = await self._pool.run(select)
+            for row_id, chat_id, timestamp, data in rows:
+                yield str(row_id), chat_id, unpack_result(result_from_text(data), timestamp)
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1][0]
+    
+    async def close(self) -> None:
+        await self._pool.close()
@@ -0,0 +1,91 @@
+# services/statistics.py
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+TREND_WINDOW = 5  # сколько последних значений шкалы хранить для тренда
+
+# Извлечение числовых шкал из сохраняемого результата по типу теста
+SCALE_EXTRACTORS: Dict[str, Callable[[Dict], Dict[str, float]]] = {
+    'maslach': lambda data: {scale: data.get('scores', {}).get(scale, 0) for scale in ('EE', 'DP', 'PA')},
+    'quick': lambda data: {'total': data.get('scores', {}).get('scores', {}).get('total', 0)},
+    'boyko': lambda data: {'total_percentage': data.get('scores', {}).get('total_percentage', 0)},
+    'heck_hess': lambda data: {'total_score': data.get('scores', {}).get('total_score', 0)},
+}
+
+def _trend(window: Deque[float]) -> str:
+    if len(window) < 2:
+        return 'недостаточно данных'
+    last, prev = window[-1], window[-2]
+    return 'улучшение' if last < prev else 'ухудшение' if last > prev else 'стабильно'
+
+class UserStatistics:
+    """Агрегат статистики пользователя, обновляется за O(1) при сохранении результата"""
+    __slots__ = ('total_tests', 'last_test_date', 'test_types', 'last_dates', 'windows')
+    
+    def __init__(self):
+        self.total_tests = 0
+        self.last_test_date: Optional[str] = None
+        self.test_types: Dict[str, int] = {}
+        self.last_dates: Dict[str, str] = {}
+        self.windows: Dict[str, Dict[str, Deque[float]]] = {}
+    
+    def apply(self, test_data: Dict) -> None:
+        """Учет нового результата теста"""
+        test_type = test_data.get('test_type', 'unknown')
+        timestamp = test_data.get('timestamp')
+        
+        self.total_tests += 1
+        self.last_test_date = timestamp
+        self.test_types[test_type] = self.test_types.get(test_type, 0) + 1
+        self.last_dates[test_type] = timestamp
+        
+        extractor = SCALE_EXTRACTORS.get(test_type)
+        if extractor is None:
+            return
+        scales = self.windows.setdefault(test_type, {})
+        for scale, value in extractor(test_data).items():
+            window = scales.get(scale)
+            if window is None:
+                window = scales[scale] = deque(maxlen=TREND_WINDOW)
+            window.append(value)
+    
+    def to_dict(self) -> Dict:
+        """Представление для хендлеров (формат get_statistics)"""
+        maslach_ee = self.windows.get('maslach', {}).get('EE', ())
+        return {
+            'total_tests': self.total_tests,
+            'last_test_date': self.last_test_date,
+            'test_types': dict(self.test_types),
+            'last_dates': dict(self.last_dates),
+            'trend': _trend(maslach_ee),
+            'trends': {
+                test_type: {scale: _trend(window) for scale, window in scales.items()}
+                for test_type, scales in self.windows.items()
+            }
+        }
+    
+    def to_state(self) -> Dict:
+        """Сериализуемое состояние агрегата (для SQL-хранилища)"""
+        return {
+            'total_tests': self.total_tests,
+            'last_test_date': self.last_test_date,
+            'test_types': self.test_types,
+            'last_dates': self.last_dates,
+            'windows': {
+                test_type: {scale: list(window) for scale, window in scales.items()}
+                for test_type, scales in self.windows.items()
+            }
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict) -> 'UserStatistics':
+        stats = cls()
+        stats.total_tests = state.get('total_tests', 0)
+        stats.last_test_date = state.get('last_test_date')
+        stats.test_types = dict(state.get('test_types', {}))
+        stats.last_dates = dict(state.get('last_dates', {}))
+        stats.windows = {
+            test_type: {scale: deque(values, maxlen=TREND_WINDOW) for scale, values in scales.items()}
+            for test_type, scales in state.get('windows', {}).items()
+        }
+        return stats
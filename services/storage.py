@@ -1,10 +1,21 @@
 # services/storage.py
+import asyncio
+import heapq
+import logging
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime
 
+from config import DatabaseConfig, WriteBehindConfig, db_config, metrics_config, write_behind_config
+from models.history import HistoryPage, HistoryRecord, HistoryRing, parse_history_cursor
+from services.result_codec import pack_result, unpack_result
+from services.statistics import UserStatistics
+
+logger = logging.getLogger(__name__)
+
 class IStorage(ABC):
-    """Интерфейс для хранилища данных (для будущей PostgreSQL)"""
+    """Интерфейс для хранилища данных"""
     
     @abstractmethod
     async def save_test_result(self, chat_id: int, test_data: Dict) -> None:
@@ -14,55 +25,260 @@ class IStorage(ABC):
     async def get_user_history(self, chat_id: int, limit: int = 10) -> List[Dict]:
         pass
     
+    @abstractmethod
+    async def get_history_page(
+        self,
+        chat_id: int,
+        limit: int,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> HistoryPage:
+        """Страница истории по курсору: before - записи старше курсора, after - новее, без курсоров - последние"""
+        pass
+    
     @abstractmethod
     async def get_statistics(self, chat_id: int) -> Optional[Dict]:
         pass
+    
+    async def get_statistics_state(self, chat_id: int) -> Optional[Dict]:
+        """Состояние агрегата статистики (UserStatistics.to_state) или None"""
+        return None
+    
+    @abstractmethod
+    def iter_results(self, after: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[Tuple[str, int, Dict]]:
+        """Все результаты в порядке ключа: (курсор, chat_id, результат); after - курсор, после которого продолжить"""
+        pass
+    
+    async def save_test_results(self, items: List[Tuple[int, Dict]]) -> None:
+        """Пакетное сохранение результатов [(chat_id, test_data), ...]"""
+        for chat_id, test_data in items:
+            await self.save_test_result(chat_id, test_data)
+    
+    async def close(self) -> None:
+        """Освобождение ресурсов хранилища"""
+        pass
+
+class _ChatHistory:
+    """Данные одного чата в памяти: кольцо последних результатов и агрегат статистики"""
+    __slots__ = ('ring', 'stats', 'nbytes')
+    
+    def __init__(self, capacity: int, stats: Optional[UserStatistics] = None):
+        self.ring: HistoryRing[HistoryRecord] = HistoryRing(capacity)
+        self.stats = stats or UserStatistics()
+        self.nbytes = CHAT_OVERHEAD + self.ring.nbytes
+    
+    def add(self, record: HistoryRecord) -> int:
+        """Добавление записи; возвращает изменение занятой памяти"""
+        evicted = self.ring.append(record)
+        delta = record.nbytes - (evicted.nbytes if evicted is not None else 0)
+        self.nbytes += delta
+        return delta
+
+def _record(test_data: Dict, seq: int = 0) -> HistoryRecord:
+    return HistoryRecord(test_data.get('test_type', 'unknown'), test_data['timestamp'], pack_result(test_data), seq)
+
+def _chat_results(chat_id: int, ring: HistoryRing, last: int, high: int) -> Iterator[Tuple[int, int, HistoryRecord]]:
+    """Записи чата с last < seq <= high по возрастанию seq, кольцо не копируется"""
+    # Следующая запись ищется в кольце заново после каждой выданной: сохранения
+    # во время выгрузки не ломают обход, вытесненная за это время запись пропускается
+    while True:
+        record = min((r for r in ring.unordered() if last < r.seq <= high), key=lambda r: r.seq, default=None)
+        if record is None:
+            return
+        last = record.seq
+        yield record.seq, chat_id, record
+
+# Оценка памяти на чат без записей: слоты, агрегат статистики и запись в словаре чатов
+CHAT_OVERHEAD = 1024
 
 class MemoryStorage(IStorage):
-    """Временное хранилище в памяти (заменится на PostgreSQL)"""
+    """Хранилище в памяти (данные теряются при перезапуске)"""
+    
+    # История чата - кольцевой буфер компактных записей, добавление без копирования
+    # списка. Если задан persistent, хранилище работает уровнем кэша над ним:
+    # результаты записываются и туда, чаты упорядочены по последнему обращению, при
+    # превышении memory_budget давно неактивные вытесняются и поднимаются из
+    # persistent при следующем обращении. Без persistent вытеснять некуда: история
+    # не удаляется, превышение бюджета только видно в memory_report и в логе.
     
-    def __init__(self):
-        self._storage: Dict[int, List[Dict]] = {}
+    def __init__(
+        self,
+        capacity: int = 20,
+        memory_budget: Optional[int] = None,
+        persistent: Optional[IStorage] = None
+    ):
+        self.capacity = capacity
+        self.memory_budget = memory_budget
+        self._persistent = persistent
+        self._chats: "OrderedDict[int, _ChatHistory]" = OrderedDict()
+        self._nbytes = 0
+        self._seq = 0  # номер последнего сохранения
+        self.evicted = 0
+        self._over_budget = False
+    
+    async def _load(self, chat_id: int) -> Optional[_ChatHistory]:
+        """Подъем вытесненного чата из постоянного хранилища"""
+        history = await self._persistent.get_user_history(chat_id, self.capacity)
+        state = await self._persistent.get_statistics_state(chat_id)
+        if not history and state is None:
+            return None
+        chat = _ChatHistory(self.capacity, UserStatistics.from_state(state) if state is not None else None)
+        for test_data in history:
+            chat.add(_record(test_data))
+            if state is None:
+                chat.stats.apply(test_data)
+        return chat
+    
+    async def _chat(self, chat_id: int, create: bool = False) -> Optional[_ChatHistory]:
+        chat = self._chats.get(chat_id)
+        if chat is not None:
+            self._chats.move_to_end(chat_id)
+            return chat
+        if self._persistent is not None:
+            chat = await self._load(chat_id)
+        if chat is None and create:
+            chat = _ChatHistory(self.capacity)
+        if chat is not None:
+            self._chats[chat_id] = chat
+            self._nbytes += chat.nbytes
+            self._evict(keep=chat_id)
+        return chat
+    
+    def _evict(self, keep: int) -> None:
+        """Вытеснение давно неактивных чатов, пока память больше бюджета"""
+        if self.memory_budget is None:
+            return
+        if self._persistent is None:
+            if self._nbytes > self.memory_budget and not self._over_budget:
+                logger.warning("История в памяти (%d байт) превысила бюджет %d байт, а вытеснять некуда: "
+                               "подключите SQL-хранилище", self._nbytes, self.memory_budget)
+            self._over_budget = self._nbytes > self.memory_budget
+            return
+        while self._nbytes > self.memory_budget and len(self._chats) > 1:
+            chat_id, chat = next(iter(self._chats.items()))
+            if chat_id == keep:
+                self._chats.move_to_end(chat_id)
+                continue
+            del self._chats[chat_id]
+            self._nbytes -= chat.nbytes
+            self.evicted += 1
     
     async def save_test_result(self, chat_id: int, test_data: Dict) -> None:
         """Сохранение результата теста"""
-        if chat_id not in self._storage:
-            self._storage[chat_id] = []
-        
-        test_data['timestamp'] = datetime.now().isoformat()
-        self._storage[chat_id].append(test_data)
-        
-        # Ограничиваем историю
-        if len(self._storage[chat_id]) > 20:
-            self._storage[chat_id] = self._storage[chat_id][-20:]
+        test_data.setdefault('timestamp', datetime.now().isoformat())
+        chat = await self._chat(chat_id, create=True)
+        # Статистика обновляется сразу, чтобы get_statistics был чистым чтением
+        chat.stats.apply(test_data)
+        self._seq += 1
+        self._nbytes += chat.add(_record(test_data, self._seq))
+        if self._persistent is not None:
+            await self._persistent.save_test_result(chat_id, test_data)
+        self._evict(keep=chat_id)
     
     async def get_user_history(self, chat_id: int, limit: int = 10) -> List[Dict]:
         """Получение истории тестов"""
-        if chat_id in self._storage:
-            return self._storage[chat_id][-limit:]
-        return []
+        if limit > self.capacity and self._persistent is not None:
+            return await self._persistent.get_user_history(chat_id, limit)
+        chat = await self._chat(chat_id)
+        if chat is None:
+            return []
+        return [unpack_result(record.payload, record.timestamp) for record in chat.ring.latest(limit)]
+    
+    async def get_history_page(
+        self,
+        chat_id: int,
+        limit: int,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> HistoryPage:
+        """Страница истории из кольца чата; поверх постоянного хранилища - из него"""
+        # Ключ курсора в SQL - id строки, а у записей кольца - номер сохранения в
+        # процессе, поэтому курсоры одного хранилища другому не передаются
+        if self._persistent is not None:
+            return await self._persistent.get_history_page(chat_id, limit, before, after)
+        chat = await self._chat(chat_id)
+        if chat is None:
+            return HistoryPage()
+        records = sorted(chat.ring, key=lambda record: (record.timestamp, record.seq))
+        if after is not None:
+            bound = parse_history_cursor(after, newer=True)
+            window = [record for record in records if (record.timestamp, record.seq) > bound][:limit + 1]
+        else:
+            records.reverse()
+            bound = parse_history_cursor(before) if before is not None else None
+            window = [record for record in records if bound is None or (record.timestamp, record.seq) < bound][:limit + 1]
+        rows = [(record.seq, unpack_result(record.payload, record.timestamp)) for record in window]
+        return HistoryPage.from_window(rows, limit, before, after)
     
     async def get_statistics(self, chat_id: int) -> Optional[Dict]:
         """Получение статистики"""
-        history = await self.get_user_history(chat_id)
-        if not history:
-            return None
+        chat = await self._chat(chat_id)
+        return chat.stats.to_dict() if chat is not None else None
+    
+    async def get_statistics_state(self, chat_id: int) -> Optional[Dict]:
+        chat = await self._chat(chat_id)
+        return chat.stats.to_state() if chat is not None else None
+    
+    async def iter_results(self, after: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[Tuple[str, int, Dict]]:
+        """Все результаты; поверх постоянного хранилища - из него, там полная история"""
+        if self._persistent is not None:
+            async for item in self._persistent.iter_results(after, batch_size):
+                yield item
+            return
         
-        stats = {
-            'total_tests': len(history),
-            'last_test_date': history[-1]['timestamp'],
-            'test_types': {},
-            'trend': 'недостаточно данных'
+        # Курсор - номер сохранения, как id в SQL: результат любого чата,
+        # сохраненный после выгрузки, попадет в следующую выгрузку с этим курсором.
+        # Чаты сливаются по номеру, в памяти - по одной текущей записи на чат.
+        # Выгрузка ограничена номером на момент начала: иначе курсор обогнал бы
+        # сохранение в уже пройденном чате
+        last = int(after) if after is not None else 0
+        high = self._seq
+        chats = [_chat_results(chat_id, chat.ring, last, high) for chat_id, chat in self._chats.items()]
+        for done, (seq, chat_id, record) in enumerate(heapq.merge(*chats), 1):
+            yield str(seq), chat_id, unpack_result(record.payload, record.timestamp)
+            if done % batch_size == 0:
+                # Большая выгрузка не должна надолго занимать event loop
+                await asyncio.sleep(0)
+    
+    def memory_usage(self, chat_id: int) -> int:
+        """Оценка памяти, занятой историей чата, в байтах (0 - чата нет в памяти)"""
+        chat = self._chats.get(chat_id)
+        return chat.nbytes if chat is not None else 0
+    
+    def memory_report(self) -> Dict[str, Any]:
+        """Общая память истории и состояние бюджета"""
+        return {
+            'chats': len(self._chats),
+            'records': sum(len(chat.ring) for chat in self._chats.values()),
+            'bytes': self._nbytes,
+            'budget': self.memory_budget,
+            'over_budget': self.memory_budget is not None and self._nbytes > self.memory_budget,
+            'evicted': self.evicted,
         }
-        
-        # Анализ тренда
-        maslach_tests = [h for h in history if h.get('test_type') == 'maslach']
-        if len(maslach_tests) >= 2:
-            last_ee = maslach_tests[-1].get('scores', {}).get('EE', 0)
-            prev_ee = maslach_tests[-2].get('scores', {}).get('EE', 0)
-            stats['trend'] = 'улучшение' if last_ee < prev_ee else 'ухудшение' if last_ee > prev_ee else 'стабильно'
-        
-        return stats
+    
+    async def close(self) -> None:
+        if self._persistent is not None:
+            await self._persistent.close()
+
+def create_storage(config: DatabaseConfig, write_behind: Optional[WriteBehindConfig] = None) -> IStorage:
+    """Выбор реализации хранилища по конфигурации"""
+    if config.backend == "memory":
+        backend = MemoryStorage(config.history_limit, config.memory_budget)
+    else:
+        from services.sql_storage import SQLStorage
+        backend = SQLStorage.from_config(config)
+    
+    if write_behind is not None and write_behind.enabled:
+        from services.write_behind import WriteBehindStorage
+        backend = WriteBehindStorage.from_config(backend, write_behind)
+    
+    # История активных чатов в памяти поверх БД, давно неактивные - только в БД
+    if config.backend != "memory" and config.memory_tier:
+        return MemoryStorage(config.history_limit, config.memory_budget, persistent=backend)
+    return backend
 
 # Создаем экземпляр хранилища
-storage = MemoryStorage()
\ No newline at end of file
+storage = create_storage(db_config, write_behind_config)
+if metrics_config.enabled:
+    from services.metrics import TimedProxy, metrics
+    storage = TimedProxy(storage, metrics.storage)
\ No newline at end of file
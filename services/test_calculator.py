@@ -1,23 +1,41 @@
 # services/test_calculator.py
+import logging
 from typing import Dict, List, Any
-from models.questions import MaslachQuestions, BoykoTestQuestions, HeckHessTestQuestions
+from models.questions import MaslachQuestions, BoykoTestQuestions, HeckHessTestQuestions, get_catalog
+from services.thresholds import thresholds
+
+logger = logging.getLogger(__name__)
 
 class TestCalculator:
     """Сервис для расчета результатов тестов для ИТ-специалистов"""
     
+    # Расчет каждого теста разделен на два шага: баллы шкал из ответов (*_scores)
+    # и интерпретация из баллов (interpret_*). Хранилище держит только баллы,
+    # интерпретация строится заново при чтении (services/result_codec.py).
+    
     @staticmethod
     def calculate_maslach(answers: Dict[int, int]) -> Dict[str, Any]:
         """Расчет результатов опросника Маслач для ИТ"""
+        return TestCalculator.interpret_maslach(TestCalculator.maslach_scores(answers))
+    
+    @staticmethod
+    def maslach_scores(answers: Dict[int, int]) -> Dict[str, int]:
+        """Баллы шкал опросника Маслач"""
         scores = {"EE": 0, "DP": 0, "PA": 0}
+        catalog = get_catalog(MaslachQuestions.TEST_TYPE)
         
         for q_id, answer in answers.items():
-            question = MaslachQuestions.get_question(q_id)
+            question = catalog.get(q_id)
             if question.reversed:
                 adjusted_answer = 6 - answer  # Шкала от 1 до 5
             else:
                 adjusted_answer = answer
             scores[question.scale] += adjusted_answer
-        
+        return scores
+    
+    @staticmethod
+    def interpret_maslach(scores: Dict[str, int]) -> Dict[str, Any]:
+        """Интерпретация баллов опросника Маслач"""
         # Нормировка баллов для ИТ
         ee_level = TestCalculator._interpret_ee_score(scores["EE"])
         dp_level = TestCalculator._interpret_dp_score(scores["DP"])
@@ -38,21 +56,15 @@ class TestCalculator:
     
     @staticmethod
     def _interpret_ee_score(score: int) -> str:
-        if score < 12: return "низкий"
-        elif score < 19: return "средний"
-        else: return "высокий"
+        return thresholds.level('maslach', 'EE', score)
     
     @staticmethod
     def _interpret_dp_score(score: int) -> str:
-        if score < 5: return "низкий"
-        elif score < 10: return "средний"
-        else: return "высокий"
+        return thresholds.level('maslach', 'DP', score)
     
     @staticmethod
     def _interpret_pa_score(score: int) -> str:
-        if score > 25: return "низкий"
-        elif score > 18: return "средний"
-        else: return "высокий"
+        return thresholds.level('maslach', 'PA', score)
     
     @staticmethod
     def _get_overall_level(ee: str, dp: str, pa: str) -> str:
@@ -65,14 +77,19 @@ class TestCalculator:
     @staticmethod
     def calculate_boyko_test(answers: Dict[int, str]) -> Dict[str, Any]:
         """Расчет результатов теста Бойко для ИТ-специалистов"""
+        return TestCalculator.interpret_boyko(TestCalculator.boyko_scores(answers))
+    
+    @staticmethod
+    def boyko_scores(answers: Dict[int, str]) -> Dict[str, int]:
+        """Баллы по фазам теста Бойко"""
         
         # Инициализируем словари для всех фаз
         phases_scores = {"фаза1": 0, "фаза2": 0, "фаза3": 0, "фаза4": 0}
-        phase_questions_count = BoykoTestQuestions.get_questions_count_by_phase()
+        catalog = get_catalog(BoykoTestQuestions.TEST_TYPE)
         
         for q_id, answer in answers.items():
             try:
-                question = BoykoTestQuestions.get_question(q_id)
+                question = catalog.get(q_id)
                 phase = question.scale
                 
                 # Подсчет баллов с учетом специфики ИТ
@@ -83,12 +100,19 @@ class TestCalculator:
                 # Нет = 0 баллов
                     
             except Exception as e:
-                print(f"Ошибка при обработке вопроса {q_id}: {e}")
+                logger.warning("Ошибка при обработке вопроса %s теста Бойко: %s", q_id, e)
                 continue
+        return phases_scores
+    
+    @staticmethod
+    def interpret_boyko(phases_scores: Dict[str, int]) -> Dict[str, Any]:
+        """Интерпретация баллов теста Бойко по фазам"""
+        catalog = get_catalog(BoykoTestQuestions.TEST_TYPE)
+        phase_questions_count = dict(catalog.scale_counts)
         
         # Процентное соотношение по фазам
         percentages = {}
-        max_possible_scores = {phase: count * 2 for phase, count in phase_questions_count.items()}
+        max_possible_scores = dict(catalog.max_scores)
         
         for phase in phases_scores:
             max_score = max_possible_scores.get(phase, 1)
@@ -103,15 +127,10 @@ class TestCalculator:
         
         # Оценка уровня выгорания по доминирующей фазе
         phase_levels = {}
+        phase_table = thresholds.get('boyko', 'phase')
         for phase, percentage in percentages.items():
-            if percentage < 25:
-                phase_levels[phase] = {"level": "низкий", "emoji": "🟢"}
-            elif percentage < 50:
-                phase_levels[phase] = {"level": "умеренный", "emoji": "🟡"}
-            elif percentage < 75:
-                phase_levels[phase] = {"level": "высокий", "emoji": "🟠"}
-            else:
-                phase_levels[phase] = {"level": "критический", "emoji": "🔴"}
+            level, emoji = phase_table.lookup(percentage)
+            phase_levels[phase] = {"level": level, "emoji": emoji}
         
         # Общая оценка (средний процент по всем фазам)
         active_phases = [p for p in percentages.values() if p > 0]
@@ -121,22 +140,7 @@ class TestCalculator:
             total_percentage = 0
         
         # Определение общего уровня выгорания для ИТ-специалиста
-        if total_percentage < 25:
-            overall = "Низкий уровень выгорания. Вы хорошо справляетесь с рабочими нагрузками."
-            color = "🟢"
-            risk = "низкий"
-        elif total_percentage < 50:
-            overall = "Умеренный уровень выгорания. Рекомендуется профилактика."
-            color = "🟡"
-            risk = "умеренный"
-        elif total_percentage < 75:
-            overall = "Высокий уровень выгорания. Требуется вмешательство и изменения в рабочем процессе."
-            color = "🟠"
-            risk = "высокий"
-        else:
-            overall = "Критический уровень выгорания. Необходимы срочные меры и возможен перерыв в работе."
-            color = "🔴"
-            risk = "критический"
+        risk, overall, color = thresholds.lookup('boyko', 'total', total_percentage)
         
         # Фаза-индикатор (самая проблемная)
         indicator_phase = max(percentages.items(), key=lambda x: x[1])[0] if percentages else "фаза1"
@@ -160,6 +164,11 @@ class TestCalculator:
     @staticmethod
     def calculate_heck_hess_test(answers: Dict[int, int]) -> Dict[str, Any]:
         """Расчет результатов теста Хека-Хесса для ИТ-специалистов"""
+        return TestCalculator.interpret_heck_hess(TestCalculator.heck_hess_scores(answers))
+    
+    @staticmethod
+    def heck_hess_scores(answers: Dict[int, int]) -> Dict[str, int]:
+        """Баллы шкал теста Хека-Хесса"""
         
         # Инициализация счетчиков по шкалам
         scales = {
@@ -168,63 +177,42 @@ class TestCalculator:
             'anxiety': 0
         }
         
+        catalog = get_catalog(HeckHessTestQuestions.TEST_TYPE)
+        
         # Подсчет баллов по шкалам (ответы от 0 до 3)
         for q_id, answer in answers.items():
-            question = HeckHessTestQuestions.get_question(q_id)
+            question = catalog.get(q_id)
             if question.scale in scales:
                 scales[question.scale] += answer
+        return scales
+    
+    @staticmethod
+    def interpret_heck_hess(scales: Dict[str, int]) -> Dict[str, Any]:
+        """Интерпретация баллов теста Хека-Хесса"""
+        catalog = get_catalog(HeckHessTestQuestions.TEST_TYPE)
         
         # Общий балл
         total_score = sum(scales.values())
         
         # Интерпретация по общему баллу
-        if total_score <= 7:
-            overall_level, interpretation = "норма", "Отсутствие значимых признаков депрессии"
-            color = "🟢"
-        elif total_score <= 12:
-            overall_level, interpretation = "субдепрессия", "Легкие депрессивные симптомы"
-            color = "🟡"
-        elif total_score <= 18:
-            overall_level, interpretation = "умеренная депрессия", "Средняя выраженность симптомов"
-            color = "🟠"
-        elif total_score <= 24:
-            overall_level, interpretation = "выраженная депрессия", "Требуется консультация специалиста"
-            color = "🔴"
-        else:
-            overall_level, interpretation = "тяжелая депрессия", "Необходима срочная помощь"
-            color = "🔴"
+        overall_level, interpretation, color = thresholds.lookup('heck_hess', 'total', total_score)
         
         # Анализ по шкалам
         scale_results = {}
-        scoring_info = HeckHessTestQuestions.get_scoring_info()
         
         for scale, score in scales.items():
-            info = scoring_info.get(scale, {})
             # Определение уровня для каждой шкалы
-            if score <= info.get('low', [0, 0, ""])[1]:
-                level, level_description = "низкий", info.get('low', [0, 0, ""])[2]
-            elif score <= info.get('moderate', [0, 0, ""])[1]:
-                level, level_description = "умеренный", info.get('moderate', [0, 0, ""])[2]
-            elif score <= info.get('high', [0, 0, ""])[1]:
-                level, level_description = "высокий", info.get('high', [0, 0, ""])[2]
-            else:
-                level, level_description = "критический", info.get('severe', [0, 0, ""])[2]
+            level, level_description = thresholds.lookup('heck_hess', scale, score)
             
             scale_results[scale] = {
                 'score': score,
                 'level': level,
                 'description': level_description,
-                'max_score': 36 if scale == 'depression' else 32 if scale == 'burnout' else 34
+                'max_score': catalog.max_scores[scale]
             }
         
         # Оценка риска выгорания для ИТ
-        burnout_risk = "низкий"
-        if scale_results['burnout']['score'] > 16:
-            burnout_risk = "повышенный"
-        if scale_results['burnout']['score'] > 24:
-            burnout_risk = "высокий"
-        if scale_results['burnout']['score'] > 32:
-            burnout_risk = "критический"
+        burnout_risk = thresholds.level('heck_hess', 'burnout_risk', scale_results['burnout']['score'])
         
         # Рекомендации для ИТ-специалистов
         recommendations = []
@@ -254,24 +242,26 @@ class TestCalculator:
                 'выраженная депрессия': (19, 24),
                 'тяжелая депрессия': (25, 63)
             },
-            'max_total_score': 63,
-            'questions_count': len(HeckHessTestQuestions.get_all()),
+            'max_total_score': sum(catalog.max_scores.values()),
+            'questions_count': catalog.count,
             'it_specific': True
         }
     
     @staticmethod
     def calculate_quick_test(answers: List[int]) -> Dict[str, Any]:
         """Расчет результатов быстрого теста для ИТ"""
-        total = sum(answers)
-        
-        if total <= 10:
-            level, risk, color = "низкий", "Низкий риск выгорания в ИТ", "🟢"
-        elif total <= 20:
-            level, risk, color = "умеренный", "Средний риск, рекомендуется профилактика", "🟡"
-        elif total <= 30:
-            level, risk, color = "высокий", "Высокий риск, требуются изменения", "🟠"
-        else:
-            level, risk, color = "критический", "Критический риск, срочные меры", "🔴"
+        return TestCalculator.interpret_quick(TestCalculator.quick_scores(answers))
+    
+    @staticmethod
+    def quick_scores(answers: List[int]) -> Dict[str, int]:
+        """Баллы быстрого теста (одна шкала)"""
+        return {'total': sum(answers)}
+    
+    @staticmethod
+    def interpret_quick(scores: Dict[str, int]) -> Dict[str, Any]:
+        """Интерпретация баллов быстрого теста"""
+        total = scores['total']
+        level, risk, color = thresholds.lookup('quick', 'total', total)
         
         # Рекомендации для ИТ
         recommendations = []
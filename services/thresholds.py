@@ -0,0 +1,157 @@
+# services/thresholds.py
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Tuple
+
+from models.questions import HeckHessTestQuestions
+
+LEVELS_4 = ("низкий", "умеренный", "высокий", "критический")
+
+def _heck_hess_scale_norms() -> Dict[str, Dict]:
+    """Нормы шкал Хека-Хесса из get_scoring_info (границы - верхние значения интервалов)"""
+    norms = {}
+    for scale, info in HeckHessTestQuestions.get_scoring_info().items():
+        bands = [info['low'], info['moderate'], info['high'], info['severe']]
+        norms[scale] = {
+            'bounds': [band[1] for band in bands[:-1]],
+            'labels': [[level, band[2]] for level, band in zip(LEVELS_4, bands)],
+            'inclusive': True
+        }
+    return norms
+
+# Декларативные нормы: bounds - отсортированные границы, labels - на одну метку больше.
+# inclusive=True: граница относится к нижнему уровню (score <= bound), иначе score < bound.
+# Метка - строка уровня или список [уровень, доп. поля...].
+DEFAULT_NORMS: Dict[str, Dict[str, Dict]] = {
+    'maslach': {
+        'EE': {'bounds': [12, 19], 'labels': ["низкий", "средний", "высокий"]},
+        'DP': {'bounds': [5, 10], 'labels': ["низкий", "средний", "высокий"]},
+        # Для редукции достижений больше баллов - лучше
+        'PA': {'bounds': [19, 26], 'labels': ["высокий", "средний", "низкий"]},
+    },
+    'boyko': {
+        'phase': {
+            'bounds': [25, 50, 75],
+            'labels': [["низкий", "🟢"], ["умеренный", "🟡"], ["высокий", "🟠"], ["критический", "🔴"]]
+        },
+        'total': {
+            'bounds': [25, 50, 75],
+            'labels': [
+                ["низкий", "Низкий уровень выгорания. Вы хорошо справляетесь с рабочими нагрузками.", "🟢"],
+                ["умеренный", "Умеренный уровень выгорания. Рекомендуется профилактика.", "🟡"],
+                ["высокий", "Высокий уровень выгорания. Требуется вмешательство и изменения в рабочем процессе.", "🟠"],
+                ["критический", "Критический уровень выгорания. Необходимы срочные меры и возможен перерыв в работе.", "🔴"]
+            ]
+        },
+    },
+    'heck_hess': {
+        'total': {
+            'bounds': [7, 12, 18, 24],
+            'labels': [
+                ["норма", "Отсутствие значимых признаков депрессии", "🟢"],
+                ["субдепрессия", "Легкие депрессивные симптомы", "🟡"],
+                ["умеренная депрессия", "Средняя выраженность симптомов", "🟠"],
+                ["выраженная депрессия", "Требуется консультация специалиста", "🔴"],
+                ["тяжелая депрессия", "Необходима срочная помощь", "🔴"]
+            ],
+            'inclusive': True
+        },
+        'burnout_risk': {
+            'bounds': [16, 24, 32],
+            'labels': ["низкий", "повышенный", "высокий", "критический"],
+            'inclusive': True
+        },
+        **_heck_hess_scale_norms(),
+    },
+    'quick': {
+        'total': {
+            'bounds': [10, 20, 30],
+            'labels': [
+                ["низкий", "Низкий риск выгорания в ИТ", "🟢"],
+                ["умеренный", "Средний риск, рекомендуется профилактика", "🟡"],
+                ["высокий", "Высокий риск, требуются изменения", "🟠"],
+                ["критический", "Критический риск, срочные меры", "🔴"]
+            ],
+            'inclusive': True
+        },
+    },
+}
+
+@dataclass(frozen=True)
+class ThresholdTable:
+    """Скомпилированная таблица порогов одной шкалы"""
+    bounds: Tuple[float, ...]
+    labels: Tuple[Tuple[Any, ...], ...]
+    inclusive: bool = False
+    
+    @classmethod
+    def compile(cls, spec: Mapping[str, Any]) -> 'ThresholdTable':
+        bounds = tuple(spec['bounds'])
+        labels = tuple(
+            tuple(label) if isinstance(label, (list, tuple)) else (label,)
+            for label in spec['labels']
+        )
+        if list(bounds) != sorted(bounds):
+            raise ValueError(f"Границы должны быть отсортированы: {bounds}")
+        if len(labels) != len(bounds) + 1:
+            raise ValueError(f"Нужно {len(bounds) + 1} меток для {len(bounds)} границ")
+        return cls(bounds, labels, bool(spec.get('inclusive', False)))
+    
+    @property
+    def side(self) -> str:
+        """Сторона для bisect / numpy.searchsorted"""
+        return 'left' if self.inclusive else 'right'
+    
+    @property
+    def levels(self) -> Tuple[str, ...]:
+        return tuple(label[0] for label in self.labels)
+    
+    def index(self, score: float) -> int:
+        if self.inclusive:
+            return bisect_left(self.bounds, score)
+        return bisect_right(self.bounds, score)
+    
+    def lookup(self, score: float) -> Tuple[Any, ...]:
+        """Метка интервала: (уровень, доп. поля...)"""
+        return self.labels[self.index(score)]
+    
+    def level(self, score: float) -> str:
+        return self.labels[self.index(score)][0]
+
+class ThresholdRegistry:
+    """Реестр норм по тестам и шкалам с горячей перезагрузкой"""
+    
+    def __init__(self, norms: Mapping[str, Mapping[str, Mapping]] = DEFAULT_NORMS):
+        self._tables: Dict[Tuple[str, str], ThresholdTable] = self._compile(norms)
+    
+    @staticmethod
+    def _compile(norms: Mapping[str, Mapping[str, Mapping]]) -> Dict[Tuple[str, str], ThresholdTable]:
+        return {
+            (test_type, scale): ThresholdTable.compile(spec)
+            for test_type, scales in norms.items()
+            for scale, spec in scales.items()
+        }
+    
+    def get(self, test_type: str, scale: str) -> ThresholdTable:
+        return self._tables[(test_type, scale)]
+    
+    def lookup(self, test_type: str, scale: str, score: float) -> Tuple[Any, ...]:
+        return self._tables[(test_type, scale)].lookup(score)
+    
+    def level(self, test_type: str, scale: str, score: float) -> str:
+        return self._tables[(test_type, scale)].level(score)
+    
+    def load(self, norms: Mapping[str, Mapping[str, Mapping]]) -> int:
+        """Замена норм без перезапуска: все таблицы проверяются до подмены, остальные сохраняются"""
+        compiled = self._compile(norms)
+        self._tables = {**self._tables, **compiled}
+        return len(compiled)
+    
+    def load_file(self, path: str) -> int:
+        """Загрузка норм из JSON-файла в формате DEFAULT_NORMS"""
+        with open(path, encoding="utf-8") as f:
+            return self.load(json.load(f))
+
+# Общий реестр для одиночного и пакетного расчета
+thresholds = ThresholdRegistry()
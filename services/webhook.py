@@ -0,0 +1,131 @@
+# services/webhook.py
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from config import WebhookConfig
+
+logger = logging.getLogger(__name__)
+
+class BoundedRequestHandler(SimpleRequestHandler):
+    """Обработчик вебхука с ограничением числа одновременно обрабатываемых апдейтов"""
+    
+    # Telegram получает ответ сразу после постановки апдейта в обработку.
+    # Когда все слоты заняты, ответ задерживается - так Telegram сам
+    # притормаживает доставку, а процесс не копит неограниченно задачи.
+    
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        bot: Bot,
+        secret_token: Optional[str] = None,
+        max_concurrent: int = 100,
+        **data: Any
+    ):
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token, **data)
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+        self.processed = 0
+        self.failed = 0
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._background_feed_update_tasks)
+    
+    async def _background_feed_update(self, bot: Bot, update: Dict[str, Any]) -> None:
+        try:
+            result = await self.dispatcher.feed_raw_update(bot=bot, update=update, **self.data)
+            if isinstance(result, TelegramMethod):
+                await self.dispatcher.silent_call_request(bot=bot, result=result)
+            self.processed += 1
+        except Exception:
+            self.failed += 1
+            logger.exception("Ошибка обработки апдейта %s", update.get("update_id"))
+        finally:
+            self._slots.release()
+    
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        try:
+            update = await request.json(loads=bot.session.json_loads)
+        except ValueError:
+            return web.Response(body="Bad Request", status=400)
+        
+        await self._slots.acquire()
+        task = asyncio.create_task(self._background_feed_update(bot=bot, update=update))
+        self._background_feed_update_tasks.add(task)
+        task.add_done_callback(self._background_feed_update_tasks.discard)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+    
+    async def close(self) -> None:
+        """Дожидается начатых апдейтов и закрывает сессию бота"""
+        if self._background_feed_update_tasks:
+            await asyncio.gather(*self._background_feed_update_tasks, return_exceptions=True)
+        await super().close()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'in_flight': self.in_flight,
+            'max_concurrent': self.max_concurrent,
+            'processed': self.processed,
+            'failed': self.failed,
+        }
+
+def create_webhook_app(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    config: WebhookConfig,
+    handler: Optional[SimpleRequestHandler] = None
+) -> web.Application:
+    """aiohttp-приложение с маршрутом вебхука и проверкой здоровья"""
+    app = web.Application()
+    if handler is None:
+        handler = BoundedRequestHandler(
+            dispatcher,
+            bot,
+            secret_token=config.secret,
+            max_concurrent=config.max_concurrent
+        )
+    handler.register(app, path=config.path)
+    app["webhook_handler"] = handler
+    
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok', **handler.stats()})
+    
+    app.router.add_get(config.health_path, health)
+    
+    if config.base_url:
+        async def on_startup(*args: Any, **kwargs: Any) -> None:
+            await bot.set_webhook(
+                url=config.base_url.rstrip("/") + config.path,
+                secret_token=config.secret,
+                max_connections=min(config.max_concurrent, 100),
+                allowed_updates=dispatcher.resolve_used_update_types()
+            )
+        
+        dispatcher.startup.register(on_startup)
+    
+    setup_application(app, dispatcher, bot=bot)
+    return app
+
+async def run_webhook(
+    dispatcher: Dispatcher,
+    bot: Bot,
+    config: WebhookConfig,
+    handler: Optional[SimpleRequestHandler] = None
+) -> None:
+    """Запуск HTTP-сервера вебхука до отмены задачи"""
+    app = create_webhook_app(dispatcher, bot, config, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, host=config.host, port=config.port)
+    await site.start()
+    logger.info("Вебхук слушает %s:%s%s", config.host, config.port, config.path)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
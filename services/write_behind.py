@@ -0,0 +1,385 @@
+# services/write_behind.py
+import asyncio
+import glob
+import itertools
+import json
+import logging
+import os
+import struct
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from config import WriteBehindConfig, metrics_config
+from models.history import HistoryPage
+from services.result_codec import pack_result, result_from_text, result_to_text, unpack_result
+from services.storage import IStorage
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Забранный на повторную отправку spill-файл, который не удален и не возвращен за
+# это время, остался от упавшего процесса, и его забирает следующая отправка
+ORPHAN_REPLAY_AGE = 600.0
+
+# Пауза перед повтором пачки, которую не удалось записать ни в хранилище, ни в
+# spill-файл (диск заполнен, нет прав): удваивается до максимума
+SPILL_RETRY_DELAY = 1.0
+SPILL_RETRY_MAX_DELAY = 30.0
+
+# Счетчики процесса для метрик: неудачные записи spill-файла и результаты,
+# удерживаемые в памяти до повтора
+spill_stats = {'errors': 0, 'held': 0}
+
+class WriteBehindStorage(IStorage):
+    """Отложенная пакетная запись результатов поверх основного хранилища"""
+    
+    # Хендлер только кладет результат в ограниченную очередь, а фоновая задача
+    # сбрасывает его пачками по размеру или по таймеру. Если хранилище недоступно,
+    # пачка дописывается в spill-файл и отправляется повторно позже.
+    # Чтение чата ждет только записи результатов этого чата: если они еще в
+    # очереди, пачка уходит сразу, не дожидаясь таймера.
+    
+    def __init__(
+        self,
+        backend: IStorage,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        max_pending: int = 1000,
+        spill_path: Optional[str] = None
+    ):
+        self._backend = backend
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._spill_path = spill_path
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending_chats: Dict[int, int] = {}  # chat_id -> результатов в очереди и в текущей пачке
+        self._written: Optional[asyncio.Condition] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._urgent = 0  # читателей, ждущих записи своего чата
+        self._claims = itertools.count()
+        self._has_spill = bool(spill_path and (os.path.exists(spill_path) or self._replay_files()))
+    
+    @classmethod
+    def from_config(cls, backend: IStorage, config: WriteBehindConfig) -> "WriteBehindStorage":
+        return cls(
+            backend,
+            batch_size=config.batch_size,
+            flush_interval=config.flush_interval,
+            max_pending=config.max_pending,
+            spill_path=config.spill_path
+        )
+    
+    @property
+    def pending(self) -> int:
+        """Количество результатов, ожидающих записи"""
+        return self._queue.qsize() if self._queue is not None else 0
+    
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self._max_pending)
+                self._written = asyncio.Condition()
+                self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+    
+    async def save_test_result(self, chat_id: int, test_data: Dict) -> None:
+        """Постановка результата в очередь (ждет только при переполнении очереди)"""
+        test_data.setdefault('timestamp', datetime.now().isoformat())
+        self._ensure_started()
+        self._pending_chats[chat_id] = self._pending_chats.get(chat_id, 0) + 1
+        try:
+            await self._queue.put((chat_id, test_data))
+        except BaseException:
+            self._release([(chat_id, test_data)])
+            raise
+    
+    async def get_user_history(self, chat_id: int, limit: int = 10) -> List[Dict]:
+        await self._settle(chat_id)
+        return await self._backend.get_user_history(chat_id, limit)
+    
+    async def get_history_page(
+        self,
+        chat_id: int,
+        limit: int,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> HistoryPage:
+        await self._settle(chat_id)
+        return await self._backend.get_history_page(chat_id, limit, before, after)
+    
+    async def get_statistics(self, chat_id: int) -> Optional[Dict]:
+        await self._settle(chat_id)
+        return await self._backend.get_statistics(chat_id)
+    
+    async def get_statistics_state(self, chat_id: int) -> Optional[Dict]:
+        await self._settle(chat_id)
+        return await self._backend.get_statistics_state(chat_id)
+    
+    async def iter_results(self, after: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[Tuple[str, int, Dict]]:
+        await self.flush()
+        async for item in self._backend.iter_results(after, batch_size):
+            yield item
+    
+    async def _settle(self, chat_id: int) -> None:
+        """Ожидание записи принятых результатов одного чата"""
+        task = self._task
+        if chat_id not in self._pending_chats or task is None or task.done():
+            return
+        self._urgent += 1
+        self._wakeup.set()
+        try:
+            async with self._written:
+                await self._written.wait_for(lambda: chat_id not in self._pending_chats or task.done())
+        finally:
+            self._urgent -= 1
+    
+    def _release(self, batch: List[Tuple[int, Dict]]) -> None:
+        for chat_id, _ in batch:
+            left = self._pending_chats.get(chat_id, 0) - 1
+            if left > 0:
+                self._pending_chats[chat_id] = left
+            else:
+                self._pending_chats.pop(chat_id, None)
+    
+    async def flush(self) -> None:
+        """Ожидание записи всех принятых результатов"""
+        if self._queue is not None and self._task is not None and not self._task.done():
+            await self._queue.join()
+    
+    async def close(self) -> None:
+        """Корректная остановка: дописываем очередь и закрываем хранилище"""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            async with self._written:
+                self._written.notify_all()
+            self._task = None
+        if self._has_spill:
+            await self._replay_spill()
+        await self._backend.close()
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._has_spill:
+            try:
+                await self._replay_spill()
+            except Exception:
+                # Spill-файл подождет следующей пачки, очередь важнее
+                logger.exception("Не удалось прочитать spill-файл")
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._flush_interval
+            while len(batch) < self._batch_size and not self._wakeup.is_set():
+                item = await self._next_item(deadline - loop.time())
+                if item is None:
+                    break
+                batch.append(item)
+            # Уже лежащие в очереди результаты уходят этой же пачкой
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if not self._urgent:
+                self._wakeup.clear()
+            
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                self._release(batch)
+                async with self._written:
+                    self._written.notify_all()
+    
+    async def _next_item(self, timeout: float) -> Optional[Tuple[int, Dict]]:
+        """Следующий результат очереди; None - вышло время или читатель ждет запись"""
+        if timeout <= 0:
+            return None
+        get = asyncio.ensure_future(self._queue.get())
+        wakeup = asyncio.ensure_future(self._wakeup.wait())
+        try:
+            await asyncio.wait((get, wakeup), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            wakeup.cancel()
+            if not get.done():
+                get.cancel()
+                # Отмененный get оставляет результат в очереди
+                await asyncio.wait((get,))
+        return None if get.cancelled() else get.result()
+    
+    async def _write(self, batch: List[Tuple[int, Dict]]) -> None:
+        delay = SPILL_RETRY_DELAY
+        while True:
+            try:
+                await self._backend.save_test_results(batch)
+                break
+            except Exception as e:
+                logger.error("Хранилище недоступно, %d результатов записывается в spill-файл: %s", len(batch), e)
+            try:
+                await self._spill(batch)
+                return
+            except OSError as e:
+                # Пачка остается в памяти: задача записи не падает, повтор с паузой
+                spill_stats['errors'] += 1
+                logger.error("Не удалось записать spill-файл, повтор через %.1f с: %s", delay, e)
+            spill_stats['held'] += len(batch)
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                spill_stats['held'] -= len(batch)
+            delay = min(delay * 2, SPILL_RETRY_MAX_DELAY)
+        
+        if self._has_spill:
+            try:
+                await self._replay_spill()
+            except Exception:
+                logger.exception("Не удалось прочитать spill-файл")
+    
+    async def _spill(self, batch: List[Tuple[int, Dict]]) -> None:
+        if not self._spill_path:
+            logger.error("Spill-файл не настроен, %d результатов потеряно", len(batch))
+            return
+        
+        # Результат пишется упакованной записью: в словаре есть байты ответов
+        lines = "".join(
+            json.dumps([chat_id, data['timestamp'], result_to_text(pack_result(data))], ensure_ascii=False) + "\n"
+            for chat_id, data in batch
+        )
+        await asyncio.to_thread(self._append_spill, lines)
+        self._has_spill = True
+    
+    def _append_spill(self, lines: str) -> None:
+        directory = os.path.dirname(self._spill_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._spill_lock(), open(self._spill_path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _replay_files(self) -> List[str]:
+        return glob.glob(glob.escape(self._spill_path) + ".*.replay")
+    
+    def _claim_spill(self) -> List[str]:
+        """Spill-файлы, переименованные для повторной отправки этим процессом"""
+        # Воркеры шардирования пишут в один spill-файл. Атомарный os.replace
+        # забирает его целиком: новые пачки пойдут в свежий файл, и никто не
+        # удалит результаты, которых не прочитал
+        now = time.time()
+        candidates = [self._spill_path]
+        for path in self._replay_files():
+            try:
+                if now - os.path.getmtime(path) > ORPHAN_REPLAY_AGE:
+                    candidates.append(path)
+            except FileNotFoundError:
+                pass
+        claimed = []
+        for path in candidates:
+            target = f"{self._spill_path}.{os.getpid()}-{next(self._claims)}.replay"
+            try:
+                with self._spill_lock():
+                    os.replace(path, target)
+            except FileNotFoundError:
+                continue  # уже забран другим процессом
+            claimed.append(target)
+        return claimed
+    
+    @contextmanager
+    def _spill_lock(self) -> Iterator[None]:
+        """Блокировка spill-файла между процессами: дозапись и забор не пересекаются"""
+        if fcntl is None:
+            # Без fcntl (Windows) в spill-файл пишет один процесс
+            yield
+            return
+        directory = os.path.dirname(self._spill_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self._spill_path}.lock", "a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+    
+    def _restore_spill(self, path: str) -> None:
+        """Возврат забранного файла под общее имя (дописывается к новым пачкам)"""
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines = f.read()
+        if lines:
+            self._append_spill(lines if lines.endswith("\n") else lines + "\n")
+        os.remove(path)
+    
+    def _read_spill(self, path: str) -> List[Tuple[int, Dict]]:
+        batch = []
+        good = []
+        bad = []
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                    if len(row) == 2:
+                        # Строка spill-файла в старом формате: [chat_id, результат]
+                        batch.append((row[0], row[1]))
+                    else:
+                        chat_id, timestamp, record = row
+                        batch.append((chat_id, unpack_result(result_from_text(record), timestamp)))
+                    good.append(line)
+                except (ValueError, TypeError, KeyError, struct.error):
+                    # Недописанная при падении или испорченная строка
+                    bad.append(line if line.endswith("\n") else line + "\n")
+        if bad:
+            logger.warning("В spill-файле %d испорченных строк, они перенесены в %s.bad", len(bad), self._spill_path)
+            with open(f"{self._spill_path}.bad", "a", encoding="utf-8") as f:
+                f.writelines(bad)
+            # В забранном файле остаются только целые строки: он может вернуться в общий
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(good)
+        return batch
+    
+    async def _replay_spill(self) -> None:
+        """Повторная отправка результатов из spill-файла"""
+        claimed = await asyncio.to_thread(self._claim_spill)
+        for index, path in enumerate(claimed):
+            batch = await asyncio.to_thread(self._read_spill, path)
+            if batch:
+                try:
+                    await self._backend.save_test_results(batch)
+                except Exception as e:
+                    logger.warning("Повторная запись из spill-файла не удалась: %s", e)
+                    for rest in claimed[index:]:
+                        await asyncio.to_thread(self._restore_spill, rest)
+                    self._has_spill = True
+                    return
+                logger.info("Из spill-файла восстановлено %d результатов", len(batch))
+            
+            # Доставка "как минимум один раз": при падении между записью и удалением возможны дубли
+            try:
+                await asyncio.to_thread(os.remove, path)
+            except FileNotFoundError:
+                pass
+        # Пока шла отправка, в spill-файл могли дописать этот или другой процесс
+        self._has_spill = os.path.exists(self._spill_path)
+
+if metrics_config.enabled:
+    from services.metrics import metrics
+    metrics.registry.collected(
+        "bot_spill_errors_total", "Неудачные записи spill-файла", [], "counter",
+        lambda: {(): spill_stats['errors']}
+    )
+    metrics.registry.collected(
+        "bot_spill_held_results", "Результаты в памяти до повтора записи spill-файла", [], "gauge",
+        lambda: {(): spill_stats['held']}
+    )